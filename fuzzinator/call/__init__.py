@@ -8,10 +8,14 @@
 from .callable_decorator import CallableDecorator
 from .non_issue import NonIssue
 from .anonymize_decorator import AnonymizeDecorator
+from .batch_subprocess_call import BatchSubprocessCall
+from .core_dump_backtrace_decorator import CoreDumpBacktraceDecorator
 from .exit_code_filter import ExitCodeFilter
 from .file_reader_decorator import FileReaderDecorator
 from .file_writer_decorator import FileWriterDecorator
+from .forkserver_call import ForkserverCall
 from .gdb_backtrace_decorator import GdbBacktraceDecorator
+from .in_process_call import InProcessCall
 from .lldb_backtrace_decorator import LldbBacktraceDecorator
 from .platform_info_decorator import PlatformInfoDecorator
 from .regex_filter import RegexFilter
@@ -22,11 +26,15 @@ from .unique_id_decorator import UniqueIdDecorator
 
 __all__ = [
     'AnonymizeDecorator',
+    'BatchSubprocessCall',
     'CallableDecorator',
+    'CoreDumpBacktraceDecorator',
     'ExitCodeFilter',
     'FileReaderDecorator',
     'FileWriterDecorator',
+    'ForkserverCall',
     'GdbBacktraceDecorator',
+    'InProcessCall',
     'LldbBacktraceDecorator',
     'NonIssue',
     'PlatformInfoDecorator',
@@ -41,6 +41,8 @@ class AnonymizeDecorator(CallableDecorator):
             properties=["stdout", "stderr"]
     """
 
+    issue_filter = True
+
     def decorator(self, old_text, new_text=None, properties=None, **kwargs):
         def wrapper(fn):
             def filter(*args, **kwargs):
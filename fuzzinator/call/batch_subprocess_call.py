@@ -0,0 +1,207 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+
+from .. import Controller
+from ..spawner import command_template, popen
+from . import NonIssue
+from .output_capture import CapturePolicy
+
+logger = logging.getLogger(__name__)
+
+
+class BatchSubprocessCall(object):
+    """
+    Subprocess invocation-based call of a SUT that can take multiple test
+    files in a single run. Tests are written to files and the SUT is started
+    only once for a whole batch of tests (see :meth:`call_batch`). If the SUT
+    fails on a batch, the batch is bisected (i.e., its halves are re-run
+    recursively) until the failures are attributed to individual tests.
+
+    **Mandatory parameter of the SUT call:**
+
+      - ``command``: string to pass to the child shell as a command to run.
+        An argument ``{tests}`` is expanded to the paths of the test files
+        (as separate arguments), while all occurrences of ``{filelist}`` are
+        replaced by the path of a file that lists the paths of the test files
+        (one per line).
+
+    **Optional parameters of the SUT call:**
+
+      - ``cwd``: if not ``None``, change working directory before the command
+        invocation.
+      - ``env``: if not ``None``, a dictionary of variable names-values to
+        update the environment with.
+      - ``no_exit_code``: makes possible to force issue creation regardless of
+        the exit code (every test is run on its own then).
+      - ``timeout``: run subprocess with timeout per test (a run of a batch of
+        *N* tests has *N* times the timeout).
+      - ``test_dir``: directory to write the test files to (all occurrences of
+        ``{uid}`` are replaced by an identifier unique to the call, a
+        temporary directory by default).
+      - ``suffix``: extension of the test files (empty by default).
+      - ``capture_limit``, ``capture_dir``, ``capture_compress``: limit the
+        captured output (see :func:`fuzzinator.call.SubprocessCall`).
+
+    **Result of the SUT call:**
+
+      - If the child process exits with 0 exit code, no issue is returned for
+        the tests of the run.
+      - Otherwise, an issue with ``'exit_code'``, ``'stdout'``, and
+        ``'stderr'`` properties is returned for every failing test, as
+        produced by a run of the SUT on that single test.
+
+    **Example configuration snippet:**
+
+        .. code-block:: ini
+
+            [sut.foo]
+            call=fuzzinator.call.BatchSubprocessCall
+
+            [sut.foo.call.init]
+            command=./bin/foo --check {tests}
+            cwd=/home/alice/foo
+            env={"BAR": "1"}
+            suffix=.js
+
+            [fuzz.foo-with-random]
+            sut=foo
+            fuzzer=fuzzinator.fuzzer.RandomContent
+            batch=inf
+            sut_batch=50
+    """
+
+    def __init__(self, command, cwd=None, env=None, no_exit_code=None, timeout=None, test_dir=None, suffix='',
+                 capture_limit=None, capture_dir=None, capture_compress=None, **kwargs):
+        self.command = command
+        self.cwd = cwd or os.getcwd()
+        self.env = env
+        self.no_exit_code = no_exit_code in [1, '1', True, 'True', 'true']
+        self.timeout = int(timeout) if timeout else None
+        self.test_dir = test_dir.format(uid='{pid}-{id}'.format(pid=os.getpid(), id=id(self))) if test_dir else None
+        self.suffix = suffix
+        self.capture = CapturePolicy.from_config(capture_limit, capture_dir, capture_compress)
+        self.tmp_dir = None
+
+    def __enter__(self):
+        if self.test_dir:
+            os.makedirs(self.test_dir, exist_ok=True)
+        else:
+            self.tmp_dir = tempfile.mkdtemp(prefix='fuzzinator-batch-')
+        return self
+
+    def __exit__(self, *exc):
+        if self.tmp_dir:
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+            self.tmp_dir = None
+        return False
+
+    def __call__(self, test, **kwargs):
+        return self.call_batch(tests=[test], **kwargs)[0]
+
+    def call_batch(self, tests, **kwargs):
+        """
+        Run the SUT on a batch of tests.
+
+        :param list tests: the tests to run the SUT on.
+        :return: list of the issues (or ``None`` or
+            :class:`fuzzinator.call.NonIssue` objects) of the tests in the
+            order of ``tests``.
+        """
+        test_dir = self.test_dir or self.tmp_dir
+        owns_dir = test_dir is None
+        if owns_dir:
+            test_dir = tempfile.mkdtemp(prefix='fuzzinator-batch-')
+
+        try:
+            paths = []
+            for i, test in enumerate(tests):
+                path = os.path.join(test_dir, 'test-{i}{suffix}'.format(i=i, suffix=self.suffix))
+                with open(path, 'w' if not isinstance(test, bytes) else 'wb') as f:
+                    f.write(test)
+                paths.append(path)
+
+            issues = [None] * len(tests)
+            if self.no_exit_code:
+                for i, path in enumerate(paths):
+                    issues[i] = self._run([path], test_dir)
+            else:
+                self._bisect(paths, 0, len(paths), issues, test_dir)
+
+            for path in paths + [os.path.join(test_dir, 'filelist')]:
+                if os.path.exists(path):
+                    os.remove(path)
+        finally:
+            if owns_dir:
+                shutil.rmtree(test_dir, ignore_errors=True)
+
+        return issues
+
+    def _bisect(self, paths, start, end, issues, test_dir):
+        issue = self._run(paths[start:end], test_dir)
+        if end - start == 1:
+            issues[start] = issue
+            return
+
+        # The output of a batch is not attributed to any test.
+        CapturePolicy.discard(issue)
+        if issue:
+            middle = (start + end) // 2
+            self._bisect(paths, start, middle, issues, test_dir)
+            self._bisect(paths, middle, end, issues, test_dir)
+            if not any(issues[start:end]):
+                logger.debug('%s failed on a batch of %d tests but on none of them individually.', self.command, end - start)
+
+    def _run(self, paths, test_dir):
+        filelist = os.path.join(test_dir, 'filelist')
+        if '{filelist}' in self.command:
+            with open(filelist, 'w') as f:
+                f.write(''.join(path + '\n' for path in paths))
+
+        args = []
+        for arg in command_template(self.command).args:
+            if arg == '{tests}':
+                args.extend(paths)
+            else:
+                args.append(arg.format(filelist=filelist) if '{filelist}' in arg else arg)
+
+        timeout = self.timeout * len(paths) if self.timeout else None
+        try:
+            proc = popen(args,
+                         cwd=self.cwd,
+                         env=self.env,
+                         stdout=subprocess.PIPE,
+                         stderr=subprocess.PIPE)
+            if self.capture:
+                stdout, stderr, files = self.capture.communicate(proc, timeout=timeout)
+            else:
+                stdout, stderr = proc.communicate(timeout=timeout)
+                files = {}
+            logger.debug('%s\n%s', stdout.decode('utf-8', errors='ignore'), stderr.decode('utf-8', errors='ignore'))
+        except subprocess.TimeoutExpired:
+            logger.debug('Timeout expired in the SUT\'s subprocess runner.')
+            Controller.kill_process_tree(proc.pid)
+            proc.wait()
+            # A batch that timed out is bisected to find the failures of the
+            # tests other than the hanging one(s).
+            return {'timeout': True} if len(paths) > 1 else None
+
+        issue = {
+            'exit_code': proc.returncode,
+            'stdout': stdout,
+            'stderr': stderr,
+            **files,
+        }
+        if self.no_exit_code or proc.returncode != 0:
+            return issue
+        CapturePolicy.discard(issue)
+        return NonIssue(issue)
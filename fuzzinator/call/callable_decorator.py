@@ -9,6 +9,28 @@ from inspect import isclass, isroutine
 
 
 class CallableDecorator(object):
+    """
+    Base class of decorators of SUT calls and fuzzers.
+
+    Fuzzers and SUT calls may also implement batch protocols, i.e., have a
+    ``generate_batch`` callable that returns a list of tests at once, a
+    ``call_batch`` callable that runs the SUT on a list of tests and returns
+    the list of their issues, or an ``async_call`` coroutine function that
+    runs the SUT on a test concurrently with others (see
+    :class:`fuzzinator.job.FuzzJob`). Decorators that can deal with these
+    have to override :meth:`batch_decorator`, decorators that only
+    post-process the issues returned by SUT calls can set
+    :attr:`issue_filter` to decorate ``call_batch`` and ``async_call`` issue
+    by issue. Otherwise, the batch protocols are hidden
+    on decorated callables (by setting them to ``None``) to ensure that all
+    tests go through :meth:`decorator`.
+    """
+
+    #: Whether the decorator only post-processes the issues returned by the
+    #: decorated SUT call (and does not alter its input).
+    issue_filter = False
+
+    batch_names = ['generate_batch', 'call_batch', 'async_call']
 
     def __init__(self, *args, **kwargs):
         self.decorator_args = args
@@ -20,13 +42,54 @@ class CallableDecorator(object):
             return fn
         return wrapper
 
+    # To be overridden by descendants that can decorate the batch protocols.
+    # Must return a function that decorates generate_batch, call_batch, or
+    # async_call (as selected by batch_name).
+    def batch_decorator(self, *args, batch_name, **kwargs):
+        if not self.issue_filter:
+            return None
+
+        decorator = self.decorator(*args, **kwargs)
+        if batch_name == 'call_batch':
+            def wrapper(fn):
+                def filter(*args, tests, **kwargs):
+                    issues = fn(*args, tests=tests, **kwargs)
+                    return [decorator(lambda *args, **kwargs: issue)(test=test, **kwargs) for test, issue in zip(tests, issues)]
+
+                return filter
+            return wrapper
+
+        if batch_name == 'async_call':
+            def wrapper(fn):
+                async def filter(*args, **kwargs):
+                    issue = await fn(*args, **kwargs)
+                    return decorator(lambda *args, **kwargs: issue)(*args, **kwargs)
+
+                return filter
+            return wrapper
+        return None
+
+    def _decorate_batch(self, callable, decorated, batch_name):
+        batch_fn = getattr(callable, batch_name)
+        wrapper = self.batch_decorator(*self.decorator_args, batch_name=batch_name, **self.decorator_kwargs) if batch_fn else None
+        setattr(decorated, batch_name, wrapper(batch_fn) if wrapper else None)
+
     def __call__(self, callable):
         if isclass(callable):
             class Inherited(callable):
                 @self.decorator(*self.decorator_args, **self.decorator_kwargs)
                 def __call__(self, *args, **kwargs):
                     return callable.__call__(self, *args, **kwargs)
+
+            for batch_name in self.batch_names:
+                if hasattr(callable, batch_name):
+                    self._decorate_batch(callable, Inherited, batch_name)
             return Inherited
 
         if isroutine(callable):
-            return self.decorator(*self.decorator_args, **self.decorator_kwargs)(callable)
+            decorated = self.decorator(*self.decorator_args, **self.decorator_kwargs)(callable)
+            if decorated is not callable:
+                for batch_name in self.batch_names:
+                    if hasattr(callable, batch_name):
+                        self._decorate_batch(callable, decorated, batch_name)
+            return decorated
@@ -0,0 +1,243 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import errno
+import logging
+import os
+import shutil
+import struct
+import tempfile
+import time
+
+from ..spawner import command_template, core_dumps, environ, executable
+from . import CallableDecorator
+
+logger = logging.getLogger(__name__)
+
+# Command lines of the debuggers to print the backtrace from a core dump with.
+debugger_commands = {
+    'gdb': ['gdb', '-nx', '-batch', '-ex', 'set width unlimited', '-ex', 'set pagination off', '-ex', 'bt', '{executable}', '{core}'],
+    'lldb': ['lldb', '--no-lldbinit', '--batch', '--core', '{core}', '{executable}', '-o', 'bt'],
+}
+
+
+def core_location(cwd=None):
+    """
+    Determine where the kernel writes the core dumps to (based on
+    ``/proc/sys/kernel/core_pattern``).
+
+    :param str cwd: working directory of the crashing process (relative
+        patterns are interpreted relative to it).
+    :return: tuple of the directory and the file name prefix of the core
+        dumps, or ``(None, None)`` if core dumps are piped to a program
+        (e.g., to systemd-coredump or apport).
+    """
+    try:
+        with open('/proc/sys/kernel/core_pattern') as f:
+            pattern = f.read().strip() or 'core'
+    except OSError:
+        pattern = 'core'
+
+    if pattern.startswith('|'):
+        return None, None
+
+    core_dir, core_name = os.path.split(pattern)
+    return os.path.join(cwd or os.getcwd(), core_dir), core_name.split('%')[0]
+
+
+def is_core_file(path):
+    """
+    Check whether a file is an ELF core dump (i.e., an ELF file of type
+    ``ET_CORE``).
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(18)
+    except OSError:
+        return False
+
+    # e_ident starts with the magic number, its 6th byte is the endianness of
+    # the file, and e_ident is followed by the 2-byte e_type.
+    if len(header) < 18 or header[:4] != b'\x7fELF' or header[5] not in (1, 2):
+        return False
+    return struct.unpack('<H' if header[5] == 1 else '>H', header[16:18])[0] == 4
+
+
+def remove_core(path):
+    """
+    Remove a core dump (if it still exists).
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class CoreDumpBacktraceDecorator(CallableDecorator):
+    """
+    Decorator for subprocess-based SUT calls to extend issues with
+    ``'backtrace'`` property from the core dump of the crashed SUT.
+
+    Unlike :class:`fuzzinator.call.GdbBacktraceDecorator` and
+    :class:`fuzzinator.call.LldbBacktraceDecorator`, the decorator does not
+    re-run the SUT under a debugger. It enables core dumps for the original
+    run of the SUT (by raising the soft limit of the core file size of the
+    SUT to the hard limit, see :func:`fuzzinator.spawner.core_dumps`) and
+    moves the core dump to a directory of its own. Only the SUT calls that
+    start the SUT via :mod:`fuzzinator.spawner` (i.e.,
+    :func:`fuzzinator.call.SubprocessCall` and
+    :func:`fuzzinator.call.StdinSubprocessCall`) are supported. Only ELF
+    core dumps (i.e., ELF files of type ``ET_CORE``) are considered, other
+    files in the core dump directory are never touched. The issue gets a transient ``'core_dump'``
+    property, which is processed by the job that found the issue: the core
+    dump is symbolized offline, in a background thread, and only if the
+    ``'id'`` of the issue is new. (So, ``'id'`` cannot be based on the
+    backtrace, see :class:`fuzzinator.call.UniqueIdDecorator`.) The core dumps
+    of known issues are simply removed. The backtrace is added to the issue
+    in the database once the debugger has finished.
+
+    The decorator must be the last one applied to the SUT call, so that the
+    core dumps of issues filtered out by other decorators are removed, too.
+    The batch protocols of the decorated SUT call are hidden, since core
+    dumps of concurrent runs of the SUT could not be told apart.
+
+    .. note::
+
+       Core dumps must not be piped to a program by the kernel (i.e.,
+       ``/proc/sys/kernel/core_pattern`` must not start with ``|``, as it
+       does by default with systemd-coredump or apport), unless ``core_dir``
+       points to the directory where the program stores the uncompressed
+       core dumps. The core dumps found in ``core_dir`` after a run of the
+       SUT are attributed to that run, so jobs running at the same time
+       should not share the directory. A relative pattern (e.g., ``sysctl
+       kernel.core_pattern=core.%p``) makes the SUT write its core dumps to
+       its working directory, which gives a core dump directory of its own
+       to every job with a different working directory.
+
+    **Mandatory parameter of the decorator:**
+
+      - ``command``: the command of the SUT (only its first argument, i.e.,
+        the path of the executable, is used to symbolize the core dumps).
+
+    **Optional parameters of the decorator:**
+
+      - ``cwd``: the working directory of the SUT.
+      - ``env``: if not ``None``, a dictionary of variable names-values to
+        update the environment with (for the debugger).
+      - ``debugger``: ``gdb`` or ``lldb`` (``gdb`` by default).
+      - ``core_dir``: the directory where the kernel writes the core dumps
+        to (determined from the kernel's core pattern by default).
+      - ``dump_dir``: directory to move the core dumps to until they are
+        symbolized (all occurrences of ``{uid}`` are replaced by an
+        identifier unique to the call, a temporary directory by default).
+      - ``timeout``: timeout of symbolizing a core dump (in seconds).
+
+    **Example configuration snippet:**
+
+        .. code-block:: ini
+
+            [sut.foo]
+            call=fuzzinator.call.SubprocessCall
+            call.decorate(0)=fuzzinator.call.RegexFilter
+            call.decorate(1)=fuzzinator.call.UniqueIdDecorator
+            call.decorate(2)=fuzzinator.call.CoreDumpBacktraceDecorator
+
+            [sut.foo.call]
+            command=./bin/foo {test}
+            cwd=/home/alice/foo
+
+            [sut.foo.call.decorate(0)]
+            stderr=["(?P<msg>Assertion `.*' failed)"]
+
+            [sut.foo.call.decorate(1)]
+            properties=["msg"]
+
+            [sut.foo.call.decorate(2)]
+            command=${sut.foo.call:command}
+            cwd=${sut.foo.call:cwd}
+            timeout=60
+    """
+
+    def decorator(self, command, cwd=None, env=None, debugger=None, core_dir=None, dump_dir=None, timeout=None, **kwargs):
+        cwd = cwd or os.getcwd()
+        argv = command_template(command).argv(test='')
+        program = executable(argv, environ(env)) or os.path.join(cwd, argv[0])
+        symbolize_command = [arg.format(executable=program, core='{core}') for arg in debugger_commands[debugger or 'gdb']]
+
+        if core_dir:
+            core_prefix = ''
+        else:
+            core_dir, core_prefix = core_location(cwd)
+            if core_dir is None:
+                logger.warning('Core dumps are piped to a program, %s cannot collect them (set core_dir).', self.__class__.__name__)
+
+        dump_dirs = [dump_dir.format(uid='{pid}-{id}'.format(pid=os.getpid(), id=id(self)))] if dump_dir else []
+
+        def find_cores(since):
+            cores = []
+            try:
+                for entry in os.scandir(core_dir):
+                    if entry.name.startswith(core_prefix) and entry.is_file(follow_symlinks=False) and entry.stat().st_mtime >= since and is_core_file(entry.path):
+                        cores.append((entry.stat().st_mtime, entry.path))
+            except OSError:
+                pass
+            return [path for _, path in sorted(cores)]
+
+        def claim(core):
+            # The dump directory is created only when the first core dump is
+            # found.
+            if not dump_dirs:
+                dump_dirs.append(tempfile.mkdtemp(prefix='fuzzinator-cores-'))
+            os.makedirs(dump_dirs[0], exist_ok=True)
+            path = os.path.join(dump_dirs[0], 'core-{time}-{name}'.format(time=time.time(), name=os.path.basename(core)))
+            try:
+                os.rename(core, path)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    return None
+                shutil.move(core, path)
+            return path
+
+        def wrapper(fn):
+            # Core dumps handed over to the previous issue but not claimed by
+            # a job (e.g., because the issue was dropped by a reducer).
+            unclaimed = []
+
+            def filter(*args, **kwargs):
+                for path in unclaimed:
+                    remove_core(path)
+                unclaimed.clear()
+
+                if core_dir is None:
+                    return fn(*args, **kwargs)
+
+                # The file system may timestamp files with a coarse clock.
+                since = time.time() - 0.1
+                with core_dumps():
+                    issue = fn(*args, **kwargs)
+
+                if issue is None:
+                    return issue
+
+                cores = find_cores(since)
+                if not issue:
+                    for core in cores:
+                        remove_core(core)
+                    return issue
+
+                # If there are multiple core dumps (e.g., the SUT forked), the
+                # last one is assumed to belong to the crash.
+                for core in cores[:-1]:
+                    remove_core(core)
+                path = claim(cores[-1]) if cores else None
+                if path:
+                    issue['core_dump'] = dict(path=path, command=symbolize_command, cwd=cwd, env=env, timeout=timeout)
+                    unclaimed.append(path)
+                return issue
+
+            return filter
+        return wrapper
@@ -9,6 +9,7 @@ import json
 
 from . import CallableDecorator
 from . import NonIssue
+from .output_capture import CapturePolicy
 
 
 class ExitCodeFilter(CallableDecorator):
@@ -21,7 +22,9 @@ class ExitCodeFilter(CallableDecorator):
       - ``exit_codes``: if ``issue['exit_code']`` is not in the array of
         ``exit_codes``, the issue is filtered out.
 
-    The issues that are not filtered out are not changed in any way.
+    The issues that are not filtered out are not changed in any way. (The
+    spill files of filtered out issues are removed, see ``capture_dir`` at
+    :func:`fuzzinator.call.SubprocessCall`.)
 
     **Example configuration snippet:**
 
@@ -38,6 +41,8 @@ class ExitCodeFilter(CallableDecorator):
             exit_codes=[139]
     """
 
+    issue_filter = True
+
     def decorator(self, exit_codes, **kwargs):
         def wrapper(fn):
             def filter(*args, **kwargs):
@@ -45,7 +50,10 @@ class ExitCodeFilter(CallableDecorator):
                 if not issue:
                     return issue
 
-                return issue if issue['exit_code'] in json.loads(exit_codes) else NonIssue(issue)
+                if issue['exit_code'] not in json.loads(exit_codes):
+                    CapturePolicy.discard(issue)
+                    return NonIssue(issue)
+                return issue
 
             return filter
         return wrapper
@@ -7,6 +7,8 @@
 
 import os
 
+from itertools import count
+
 from . import CallableDecorator
 
 
@@ -25,6 +27,13 @@ class FileWriterDecorator(CallableDecorator):
     ``'filename'`` property containing the name of the generated file (although
     the file itself is removed).
 
+    The unique string distinguishes every test written by the decorator, even
+    if the decorated SUT call is instantiated several times (e.g., by
+    different jobs of the same process). The decorator supports the
+    ``async_call`` protocol of SUT calls, too (see
+    :class:`fuzzinator.job.FuzzJob`), in which case the unique string also
+    distinguishes the concurrently running tests.
+
     **Example configuration snippet:**
 
         .. code-block:: ini
@@ -41,21 +50,27 @@ class FileWriterDecorator(CallableDecorator):
             filename=${fuzzinator:work_dir}/test-{uid}.txt
     """
 
+    def _write(self, filename, uid, kwargs):
+        file_content = kwargs['test']
+        file_path = filename.format(uid=uid)
+        if 'filename' in kwargs:
+            # Ensure that the test case will be saved to the directory defined by the
+            # config file and its name will be what is expected by the kwargs.
+            file_path = os.path.join(os.path.dirname(file_path), kwargs['filename'])
+
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w' if not isinstance(file_content, bytes) else 'wb') as f:
+            f.write(file_content)
+
+        kwargs['test'] = file_path
+        return file_path
+
     def decorator(self, filename, **kwargs):
+        counter = count()
+
         def wrapper(fn):
             def writer(*args, **kwargs):
-                file_content = kwargs['test']
-                file_path = filename.format(uid='{pid}-{id}'.format(pid=os.getpid(), id=id(self)))
-                if 'filename' in kwargs:
-                    # Ensure that the test case will be saved to the directory defined by the
-                    # config file and its name will be what is expected by the kwargs.
-                    file_path = os.path.join(os.path.dirname(file_path), kwargs['filename'])
-
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                with open(file_path, 'w' if not isinstance(file_content, bytes) else 'wb') as f:
-                    f.write(file_content)
-
-                kwargs['test'] = file_path
+                file_path = self._write(filename, '{pid}-{id}-{count}'.format(pid=os.getpid(), id=id(self), count=next(counter)), kwargs)
                 issue = fn(*args, **kwargs)
                 if issue is not None:
                     issue['filename'] = os.path.basename(file_path)
@@ -65,3 +80,24 @@ class FileWriterDecorator(CallableDecorator):
 
             return writer
         return wrapper
+
+    def batch_decorator(self, filename, batch_name, **kwargs):
+        if batch_name != 'async_call':
+            return None
+
+        counter = count()
+
+        def wrapper(fn):
+            async def writer(*args, **kwargs):
+                # Concurrent calls need distinct files.
+                file_path = self._write(filename, '{pid}-{id}-{count}'.format(pid=os.getpid(), id=id(self), count=next(counter)), kwargs)
+                try:
+                    issue = await fn(*args, **kwargs)
+                finally:
+                    os.remove(file_path)
+                if issue is not None:
+                    issue['filename'] = os.path.basename(file_path)
+                return issue
+
+            return writer
+        return wrapper
@@ -0,0 +1,376 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import hashlib
+import json
+import logging
+import os
+import pkgutil
+import select
+import shlex
+import shutil
+import signal
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+from .. import Controller
+from ..spawner import command_template, environ, popen
+from . import NonIssue
+from .output_capture import CapturePolicy
+
+logger = logging.getLogger(__name__)
+
+
+class ForkserverCall(object):
+    """
+    Fork server-based call of a SUT. The SUT is started only once and it
+    forks a new, already initialized child process for every test, following
+    the protocol of AFL's fork server: the SUT reads 4-byte commands from file
+    descriptor 198 and reports the pid and the wait status of every child
+    (and a 4-byte hello message at startup) on file descriptor 199. SUTs
+    compiled with AFL instrumentation (``afl-gcc``, ``afl-clang-fast``, etc.)
+    implement the protocol out of the box (the classic protocol without
+    option negotiation). This spares the startup costs of the SUT (e.g.,
+    dynamic linking, JIT warmup) that would be paid for every test by
+    :func:`fuzzinator.call.SubprocessCall`.
+
+    Arbitrary (uninstrumented) SUTs can be run with the fork server shim of
+    Fuzzinator: if ``shim`` is enabled, a small shared library is preloaded
+    into the SUT (with ``LD_PRELOAD``), which implements the protocol in a
+    constructor, i.e., after the dynamic linking and the initialization of the
+    shared libraries of the SUT but before its ``main``. So, every test is run
+    in a child forked from a process that has already been linked. The shim
+    is compiled from its C source with ``$CC`` (``cc`` by default) on first
+    use. It works with dynamically linked ELF executables only (e.g., on
+    Linux), and the SUT must not depend on state (e.g., pids, threads, random
+    seeds) set up before ``main``. Without the shim, the fork server fails to
+    start for SUTs that do not implement the protocol themselves.
+
+    The test is written to a file before every run, which is passed to the SUT
+    on its command line or on its standard input. The standard output and
+    error streams of the children are collected in files, too.
+
+    .. note::
+
+       Not available on Windows.
+
+    **Mandatory parameter of the SUT call:**
+
+      - ``command``: string to pass to the child shell as a command to run
+        (all occurrences of ``{test}`` in the string are replaced by the path
+        of the test file; if there are none, the test is passed on the
+        standard input).
+
+    **Optional parameters of the SUT call:**
+
+      - ``cwd``: if not ``None``, change working directory before the command
+        invocation.
+      - ``env``: if not ``None``, a dictionary of variable names-values to
+        update the environment with.
+      - ``no_exit_code``: makes possible to force issue creation regardless of
+        the exit code.
+      - ``shim``: if true, preload the fork server shim into the SUT (for SUTs
+        that do not implement the fork server protocol themselves).
+      - ``timeout``: timeout of a single run of the SUT (in seconds). The
+        child is killed if the timeout expires.
+      - ``init_timeout``: timeout of the startup of the fork server (in
+        seconds, 10 by default).
+      - ``test_file``: path of the file to write the test to (all occurrences
+        of ``{uid}`` are replaced by an identifier unique to the call, a file
+        in a temporary directory by default).
+      - ``capture_limit``, ``capture_dir``, ``capture_compress``: limit the
+        captured output (see :func:`fuzzinator.call.SubprocessCall`).
+
+    **Result of the SUT call:**
+
+      - If the child process exits with 0 exit code, no issue is returned.
+      - Otherwise, an issue with ``'exit_code'``, ``'stdout'``, and
+        ``'stderr'`` properties is returned (the exit code is the negative
+        signal number if the child was terminated by a signal, e.g., it
+        crashed).
+
+    **Example configuration snippet:**
+
+        .. code-block:: ini
+
+            [sut.foo]
+            call=fuzzinator.call.ForkserverCall
+
+            [sut.foo.call.init]
+            # assuming that bin/foo is compiled with afl-clang-fast
+            command=./bin/foo {test}
+            cwd=/home/alice/foo
+            timeout=1
+
+            [sut.bar]
+            call=fuzzinator.call.ForkserverCall
+
+            [sut.bar.call.init]
+            # assuming that bin/bar is an ordinary dynamically linked executable
+            command=./bin/bar {test}
+            cwd=/home/alice/bar
+            shim=True
+    """
+
+    control_fd = 198
+    status_fd = 199
+
+    # Script of the wrapper that sets up the descriptors of the fork server.
+    # Its arguments are two pairs of an inherited descriptor and the
+    # descriptor to move it to, followed by the command of the SUT.
+    exec_wrapper = '; '.join([
+        'import os, sys',
+        'fds = [(int(sys.argv[i]), int(sys.argv[i + 1])) for i in (1, 3)]',
+        '[os.dup2(fd, target) for fd, target in fds]',
+        '[os.close(fd) for fd, _ in fds if fd not in [target for _, target in fds]]',
+        'os.execvp(sys.argv[5], sys.argv[5:])',
+    ])
+
+    # Path of the compiled fork server shim (built on first use).
+    _shim_path = None
+
+    def __init__(self, command, cwd=None, env=None, no_exit_code=None, timeout=None, init_timeout=None, test_file=None,
+                 shim=None, capture_limit=None, capture_dir=None, capture_compress=None, **kwargs):
+        self.command = command
+        self.cwd = cwd or os.getcwd()
+        self.env = env
+        self.no_exit_code = no_exit_code in [1, '1', True, 'True', 'true']
+        self.timeout = float(timeout) if timeout else None
+        self.init_timeout = float(init_timeout) if init_timeout else 10
+        self.test_file = test_file.format(uid='{pid}-{id}'.format(pid=os.getpid(), id=id(self))) if test_file else None
+        self.shim = shim in [1, '1', True, 'True', 'true']
+        self.capture = CapturePolicy.from_config(capture_limit, capture_dir, capture_compress)
+
+        self.proc = None
+        self.tmp_dir = None
+        self._control = None
+        self._status = None
+        self._files = dict()
+        self._timed_out = False
+
+        self.execs = 0
+        self.exec_time = 0.0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        if self.execs:
+            logger.debug('%s executed %d tests (%.1f exec/s).', self.command, self.execs, self.exec_per_sec)
+        return False
+
+    @property
+    def alive(self):
+        """
+        Whether the fork server is still running (if it is not, it is
+        restarted by the next call or context entry).
+        """
+        return self.proc is not None and self.proc.poll() is None
+
+    @property
+    def exec_per_sec(self):
+        """
+        Number of tests executed per second (measured from sending the test
+        to the fork server until receiving the exit status of the child).
+        """
+        return self.execs / self.exec_time if self.exec_time else 0.0
+
+    @classmethod
+    def build_shim(cls):
+        """
+        Compile the fork server shim (unless it has been compiled already) and
+        return the path of the shared library. The library is cached in the
+        temporary directory of the system, named after the hash of its source
+        and the compiler.
+        """
+        if cls._shim_path and os.path.exists(cls._shim_path):
+            return cls._shim_path
+
+        source = pkgutil.get_data(__package__, os.path.join('resources', 'forkserver_shim.c'))
+        cc = os.environ.get('CC', 'cc')
+        digest = hashlib.md5(source + cc.encode('utf-8')).hexdigest()[:9]
+        shim_path = os.path.join(tempfile.gettempdir(), 'fuzzinator-forkserver-shim-{digest}.so'.format(digest=digest))
+
+        if not os.path.exists(shim_path):
+            build_dir = tempfile.mkdtemp(prefix='fuzzinator-forkserver-shim-')
+            try:
+                source_path = os.path.join(build_dir, 'forkserver_shim.c')
+                with open(source_path, 'wb') as f:
+                    f.write(source)
+                build_path = os.path.join(build_dir, 'forkserver_shim.so')
+                subprocess.run(shlex.split(cc) + ['-shared', '-fPIC', '-O2', '-o', build_path, source_path],
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT, check=True)
+                # Concurrent builds (e.g., by parallel jobs) must not see a
+                # partially written library.
+                os.replace(build_path, shim_path)
+            finally:
+                shutil.rmtree(build_dir, ignore_errors=True)
+
+        cls._shim_path = shim_path
+        return shim_path
+
+    def start(self):
+        self.stop()
+
+        env = self.env
+        if self.shim:
+            try:
+                shim_path = self.build_shim()
+            except (OSError, subprocess.CalledProcessError) as e:
+                logger.warning('Failed to build the fork server shim: %s', getattr(e, 'output', b'').decode('utf-8', errors='ignore') or e)
+                return
+            preload = (environ(env) or os.environ).get('LD_PRELOAD')
+            env = json.dumps(dict(json.loads(env) if env else {}, LD_PRELOAD=' '.join(filter(None, [shim_path, preload]))))
+
+        if not self.test_file:
+            self.tmp_dir = tempfile.mkdtemp(prefix='fuzzinator-forkserver-')
+        test_file = self.test_file or os.path.join(self.tmp_dir, 'test')
+        os.makedirs(os.path.dirname(test_file), exist_ok=True)
+
+        # The children inherit the open file descriptions of these files from
+        # the fork server, so rewinding and truncating them in this process
+        # resets them for the next child.
+        self._files = {
+            'test': os.open(test_file, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600),
+            'stdout': tempfile.TemporaryFile(),
+            'stderr': tempfile.TemporaryFile(),
+        }
+
+        control_read, self._control = os.pipe()
+        self._status, status_write = os.pipe()
+
+        # The pipe ends are passed to a wrapper, which moves them to their
+        # well-known descriptors and executes the SUT. (A preexec_fn could do
+        # the same without a wrapper, but it is not safe to run in the child
+        # if this process has other threads, e.g., a fuzzer prefetcher.)
+        use_stdin = '{test}' not in self.command
+        self.proc = popen([sys.executable, '-I', '-S', '-c', self.exec_wrapper,
+                           str(control_read), str(self.control_fd), str(status_write), str(self.status_fd)]
+                          + command_template(self.command).argv(test=test_file),
+                          cwd=self.cwd,
+                          env=env,
+                          stdin=self._files['test'] if use_stdin else subprocess.DEVNULL,
+                          stdout=self._files['stdout'],
+                          stderr=self._files['stderr'],
+                          pass_fds=(control_read, status_write))
+        os.close(control_read)
+        os.close(status_write)
+        self._timed_out = False
+
+        if self._read_status(self.init_timeout) is None:
+            logger.warning('Fork server of %s failed to start.', self.command)
+            self.stop()
+
+    def stop(self):
+        if self.proc:
+            if self.proc.poll() is None:
+                Controller.kill_process_tree(self.proc.pid)
+            self.proc.wait()
+            self.proc = None
+
+        for fd in [self._control, self._status]:
+            if fd is not None:
+                os.close(fd)
+        self._control = self._status = None
+
+        if 'test' in self._files:
+            os.close(self._files.pop('test'))
+        for stream in self._files.values():
+            stream.close()
+        self._files = dict()
+
+        if self.tmp_dir:
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+            self.tmp_dir = None
+
+    def _read_status(self, timeout):
+        if not select.select([self._status], [], [], timeout)[0]:
+            return None
+        data = b''
+        while len(data) < 4:
+            chunk = os.read(self._status, 4 - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return struct.unpack('I', data)[0]
+
+    def __call__(self, test, **kwargs):
+        if not self.alive:
+            self.start()
+            if not self.alive:
+                return None
+
+        test_fd = self._files['test']
+        os.ftruncate(test_fd, 0)
+        os.lseek(test_fd, 0, os.SEEK_SET)
+        os.write(test_fd, test if isinstance(test, bytes) else test.encode('utf-8', errors='ignore'))
+        os.lseek(test_fd, 0, os.SEEK_SET)
+        for stream in ['stdout', 'stderr']:
+            self._files[stream].seek(0)
+            self._files[stream].truncate()
+
+        start_time = time.time()
+        try:
+            os.write(self._control, struct.pack('I', int(self._timed_out)))
+            pid = self._read_status(self.init_timeout)
+            if pid is None:
+                raise OSError('fork server did not report the pid of the child')
+
+            self._timed_out = False
+            status = self._read_status(self.timeout)
+            if status is None:
+                logger.debug('Timeout expired in the SUT\'s fork server.')
+                self._timed_out = True
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except OSError:
+                    pass
+                if self._read_status(self.init_timeout) is None:
+                    raise OSError('fork server did not report the status of the killed child')
+                return None
+        except OSError as e:
+            logger.debug('Fork server of %s died.', self.command, exc_info=e)
+            self.stop()
+            return None
+        finally:
+            self.execs += 1
+            self.exec_time += time.time() - start_time
+
+        streams = dict()
+        files = dict()
+        if self.capture:
+            captures = dict()
+            for stream in ['stdout', 'stderr']:
+                self._files[stream].seek(0)
+                captures[stream] = self.capture.capture(stream)
+                while True:
+                    chunk = self._files[stream].read(self.capture.chunk_size)
+                    if not chunk:
+                        break
+                    captures[stream].write(chunk)
+            streams['stdout'], streams['stderr'], files = self.capture.result(captures)
+        else:
+            for stream in ['stdout', 'stderr']:
+                self._files[stream].seek(0)
+                streams[stream] = self._files[stream].read()
+        logger.debug('%s\n%s', streams['stdout'].decode('utf-8', errors='ignore'), streams['stderr'].decode('utf-8', errors='ignore'))
+
+        issue = {
+            'exit_code': -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status),
+            'stdout': streams['stdout'],
+            'stderr': streams['stderr'],
+            **files,
+        }
+        if self.no_exit_code or issue['exit_code'] != 0:
+            return issue
+        CapturePolicy.discard(issue)
+        return NonIssue(issue)
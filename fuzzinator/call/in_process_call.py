@@ -0,0 +1,175 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import logging
+import os
+import signal
+import traceback
+
+from multiprocessing import Pipe, Process
+
+from .. import Controller
+from ..config import import_entity
+
+logger = logging.getLogger(__name__)
+
+
+class InProcessCall(object):
+    """
+    Call of a SUT that is available as a Python function. The function is
+    imported only once and it is called directly with every test, which
+    spares the interpreter startup (and the import of the SUT) that
+    :func:`fuzzinator.call.SubprocessCall` would pay for every test.
+
+    Uncaught exceptions of the function are turned into issues. To protect
+    fuzzinator from hard crashes (e.g., of native extensions), hangs, and
+    memory leaks of the SUT, the function can be called in a sacrificial
+    subprocess instead, which is forked from the current process (i.e., with
+    the function already imported) and recycled after a given number of tests
+    or when it crashes.
+
+    **Mandatory parameter of the SUT call:**
+
+      - ``target``: fully qualified name of the function to call with the
+        test as its only argument.
+
+    **Optional parameters of the SUT call:**
+
+      - ``subprocess``: if it's true then the function is called in a
+        sacrificial subprocess (boolean value, False by default).
+      - ``recycle``: number of tests after which the sacrificial subprocess is
+        replaced by a new one (integer number, 1000 by default, 0 means never).
+      - ``timeout``: timeout of calling the function in the sacrificial
+        subprocess (in seconds). The subprocess is killed (and replaced) if the
+        timeout expires.
+      - ``id_frames``: number of the innermost frames of the traceback to
+        build the ``id`` of the issues from (integer number, 1 by default).
+
+    **Result of the SUT call:**
+
+      - If the function returns, no issue is returned.
+      - If the function raises an exception, an issue with ``'exception'``
+        (the name of the exception type), ``'message'``, ``'traceback'``,
+        and ``'id'`` (composed of the exception type and the innermost frames
+        of the traceback) properties is returned.
+      - If the sacrificial subprocess terminates during the call, an issue
+        with ``'exit_code'`` and ``'id'`` properties is returned.
+
+    **Example configuration snippet:**
+
+        .. code-block:: ini
+
+            [sut.foo]
+            call=fuzzinator.call.InProcessCall
+
+            [sut.foo.call.init]
+            # assuming that foo.parse(src) can be imported and throws on errors
+            target=foo.parse
+            subprocess=True
+            recycle=500
+            timeout=5
+    """
+
+    def __init__(self, target, subprocess=None, recycle=None, timeout=None, id_frames=None, **kwargs):
+        self.target = import_entity(target)
+        self.subprocess = subprocess in [1, '1', True, 'True', 'true']
+        self.recycle = int(recycle) if recycle else 1000
+        self.timeout = float(timeout) if timeout else None
+        self.id_frames = int(id_frames) if id_frames else 1
+
+        self.proc = None
+        self.conn = None
+        self.proc_tests = 0
+
+    def __enter__(self):
+        if self.subprocess:
+            self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    @property
+    def alive(self):
+        """
+        Whether the sacrificial subprocess (if any) is still running (if it is
+        not, it is restarted by the next call or context entry).
+        """
+        return not self.subprocess or (self.proc is not None and self.proc.is_alive())
+
+    def start(self):
+        self.stop()
+        self.conn, child_conn = Pipe()
+        self.proc = Process(target=self._serve, args=(child_conn,), daemon=True)
+        self.proc.start()
+        child_conn.close()
+        self.proc_tests = 0
+
+    def stop(self):
+        if self.proc:
+            if self.proc.is_alive():
+                Controller.kill_process_tree(self.proc.pid)
+            self.proc.join()
+            self.proc = None
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def _serve(self, conn):
+        # The sacrificial subprocess must not be interrupted by the keyboard
+        # interrupts of the job, it is killed by its parent.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        while True:
+            try:
+                test = conn.recv()
+            except EOFError:
+                break
+            conn.send(self._run(test))
+
+    def _run(self, test):
+        try:
+            self.target(test)
+        except Exception as e:
+            frames = traceback.extract_tb(e.__traceback__)[-self.id_frames:]
+            return {
+                'exception': type(e).__name__,
+                'message': str(e),
+                'traceback': ''.join(traceback.format_exception(type(e), e, e.__traceback__)),
+                'id': '{exception} {frames}'.format(exception=type(e).__name__,
+                                                    frames=' < '.join('{file}:{line} ({name})'.format(file=os.path.basename(frame.filename), line=frame.lineno, name=frame.name)
+                                                                      for frame in reversed(frames))),
+            }
+        return None
+
+    def __call__(self, test, **kwargs):
+        if not self.subprocess:
+            return self._run(test)
+
+        if not self.alive or (self.recycle and self.proc_tests >= self.recycle):
+            self.start()
+
+        self.proc_tests += 1
+        try:
+            self.conn.send(test)
+            if self.conn.poll(self.timeout):
+                return self.conn.recv()
+            logger.debug('Timeout expired in the sacrificial subprocess of %s.', self.target.__name__)
+            self.stop()
+            return None
+        except (EOFError, OSError):
+            pass
+
+        # The subprocess terminated while running the test.
+        self.proc.join()
+        exit_code = self.proc.exitcode
+        self.stop()
+        reason = 'signal {signal}'.format(signal=signal.Signals(-exit_code).name) if exit_code < 0 else 'exit code {code}'.format(code=exit_code)
+        return {
+            'exit_code': exit_code,
+            'id': 'Crash of {target} with {reason}'.format(target=self.target.__name__, reason=reason),
+        }
@@ -0,0 +1,307 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import asyncio
+import gzip
+import os
+import select
+import selectors
+import subprocess
+import tempfile
+import time
+
+from ..config import parse_size
+
+
+#: Names of the issue properties that hold the paths of spill files.
+spill_properties = ['stdout_file', 'stderr_file']
+
+
+def open_spill_file(path):
+    """
+    Open a spill file (compressed or not) for reading.
+    """
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+
+def search_spill_file(pattern, path, overlap=65536, chunk_size=1048576):
+    """
+    Search a compiled regular expression in a spill file without reading it
+    into memory as a whole. The file is searched in chunks of complete lines,
+    every chunk is searched together with the last ``overlap`` bytes of the
+    previous one, so matches longer than that may be missed.
+
+    :return: the match object or ``None``.
+    """
+    with open_spill_file(path) as f:
+        buffer = bytearray()
+        matched = 0
+        while True:
+            chunk = f.read(chunk_size)
+            buffer += chunk
+            end = len(buffer) if not chunk else buffer.rfind(b'\n', matched) + 1
+            if end > matched:
+                match = pattern.search(buffer, max(matched - overlap, 0), end)
+                if match is not None:
+                    return match
+                matched = end
+            if not chunk:
+                return None
+            # Keep only the overlap window (and the incomplete last line).
+            drop = max(matched - overlap, 0)
+            if drop:
+                del buffer[:drop]
+                matched -= drop
+
+
+class OutputCapture(object):
+    """
+    Bounded capture of an output stream of a SUT. The first and the last
+    ``limit / 2`` bytes of the stream are retained in memory (the latter in a
+    ring buffer), the rest of the stream is omitted. If a spill directory is
+    given, the complete stream is written to a file there (optionally gzip
+    compressed on the fly) once it exceeds the limit.
+    """
+
+    marker = b'\n[... %d bytes omitted ...]\n'
+
+    def __init__(self, name, limit, spill_dir=None, compress=False):
+        """
+        :param str name: name of the stream (used as the prefix of the spill
+            file).
+        :param int limit: number of bytes to retain.
+        :param str spill_dir: directory to write the complete stream to (if
+            it exceeds the limit).
+        :param bool compress: whether to compress the spill file.
+        """
+        self.name = name
+        self.head_size = limit // 2
+        self.tail_size = limit - self.head_size
+        self.spill_dir = spill_dir
+        self.compress = compress
+        self.size = 0
+        self.path = None
+
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._file = None
+
+    def write(self, data):
+        """
+        Capture the next chunk of the stream.
+        """
+        if self._file is None and self.spill_dir and self.size + len(data) > self.head_size + self.tail_size:
+            # Nothing has been omitted yet, so the retained data is the
+            # complete stream so far.
+            os.makedirs(self.spill_dir, exist_ok=True)
+            fd, self.path = tempfile.mkstemp(prefix=self.name + '-', suffix='.gz' if self.compress else '', dir=self.spill_dir)
+            self._file = gzip.open(os.fdopen(fd, 'wb'), 'wb', compresslevel=1) if self.compress else os.fdopen(fd, 'wb')
+            self._file.write(self._head)
+            self._file.write(self._tail)
+        if self._file is not None:
+            self._file.write(data)
+
+        self.size += len(data)
+        if len(self._head) < self.head_size:
+            n = self.head_size - len(self._head)
+            self._head += data[:n]
+            data = data[n:]
+        if data:
+            self._tail += data
+            # Trimming is amortized by letting the tail grow to twice its
+            # size.
+            if len(self._tail) > 2 * self.tail_size:
+                del self._tail[:len(self._tail) - self.tail_size]
+
+    def getvalue(self):
+        """
+        :return: the retained head and tail of the stream (separated by a
+            marker if some of the stream was omitted).
+        """
+        tail = self._tail[len(self._tail) - self.tail_size:] if len(self._tail) > self.tail_size else self._tail
+        omitted = self.size - len(self._head) - len(tail)
+        if not omitted:
+            return bytes(self._head + tail)
+        return bytes(self._head) + self.marker % omitted + bytes(tail)
+
+    def close(self):
+        """
+        Close the spill file (if any).
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        """
+        Close and remove the spill file (if any).
+        """
+        self.close()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+        self.path = None
+
+
+class CapturePolicy(object):
+    """
+    Capture policy of the output streams of a SUT, configured by the
+    ``capture_limit``, ``capture_dir``, and ``capture_compress`` parameters
+    of the SUT calls:
+
+      - ``capture_limit``: number of bytes of a stream to retain in the issue,
+        optionally with a ``K``, ``M``, or ``G`` suffix. If a stream is
+        longer, its head and tail are kept (half of the limit each) and its
+        middle is replaced by a marker. (Unlimited by default.)
+      - ``capture_dir``: directory to write the complete streams to if they
+        exceed the limit. The paths of the files are added to the issue as
+        ``'stdout_file'`` and ``'stderr_file'`` properties.
+      - ``capture_compress``: if it's true, the files are gzip compressed
+        while being written.
+
+    Patterns of :class:`fuzzinator.call.RegexFilter` are matched against the
+    retained head and tail (and may span both of them).
+    """
+
+    chunk_size = 65536
+
+    def __init__(self, limit, spill_dir=None, compress=False):
+        self.limit = limit
+        self.spill_dir = spill_dir
+        self.compress = compress
+
+    @classmethod
+    def from_config(cls, capture_limit=None, capture_dir=None, capture_compress=None):
+        """
+        :return: the policy, or ``None`` if the output is not limited.
+        """
+        if not capture_limit:
+            return None
+        return cls(parse_size(capture_limit), spill_dir=capture_dir, compress=capture_compress in [1, '1', True, 'True', 'true'])
+
+    def capture(self, name):
+        """
+        :return: a new :class:`OutputCapture` of a stream.
+        """
+        return OutputCapture(name, self.limit, spill_dir=self.spill_dir, compress=self.compress)
+
+    @staticmethod
+    def result(captures):
+        """
+        Close the captures.
+
+        :return: tuple of the retained outputs of the ``stdout`` and
+            ``stderr`` captures and the dictionary of the spill files.
+        """
+        files = dict()
+        for name, capture in captures.items():
+            capture.close()
+            if capture.path:
+                files[name + '_file'] = capture.path
+        return captures['stdout'].getvalue(), captures['stderr'].getvalue(), files
+
+    @staticmethod
+    def discard(files):
+        """
+        Remove spill files (e.g., those of a test that did not fail).
+
+        :param dict files: the files as returned by :meth:`result` (or an
+            issue with such properties).
+        """
+        for name in spill_properties:
+            path = files.pop(name, None) if files else None
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    def communicate(self, proc, input=None, timeout=None):
+        """
+        Variant of :meth:`subprocess.Popen.communicate` that captures the
+        output streams according to the policy.
+
+        :return: tuple of the retained stdout and stderr and the dictionary of
+            the spill files.
+        :raises subprocess.TimeoutExpired: if the timeout expires.
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        captures = dict(stdout=self.capture('stdout'), stderr=self.capture('stderr'))
+        input = memoryview(input or b'')
+        offset = 0
+
+        with selectors.DefaultSelector() as selector:
+            if proc.stdin:
+                if input:
+                    selector.register(proc.stdin, selectors.EVENT_WRITE)
+                else:
+                    proc.stdin.close()
+            for name in captures:
+                if getattr(proc, name):
+                    selector.register(getattr(proc, name), selectors.EVENT_READ, captures[name])
+
+            try:
+                while selector.get_map():
+                    remaining = deadline - time.monotonic() if deadline else None
+                    if remaining is not None and remaining <= 0:
+                        raise subprocess.TimeoutExpired(proc.args, timeout)
+
+                    for key, _ in selector.select(remaining):
+                        if key.fileobj is proc.stdin:
+                            try:
+                                offset += os.write(key.fd, input[offset:offset + select.PIPE_BUF])
+                            except BrokenPipeError:
+                                offset = len(input)
+                            if offset >= len(input):
+                                selector.unregister(key.fileobj)
+                                key.fileobj.close()
+                        else:
+                            data = os.read(key.fd, self.chunk_size)
+                            if not data:
+                                selector.unregister(key.fileobj)
+                                key.fileobj.close()
+                            else:
+                                key.data.write(data)
+
+                proc.wait(timeout=deadline - time.monotonic() if deadline else None)
+            except BaseException:
+                for capture in captures.values():
+                    capture.discard()
+                raise
+
+        return self.result(captures)
+
+    async def async_communicate(self, proc, input=None):
+        """
+        Asynchronous variant of :meth:`communicate` for processes created by
+        :func:`asyncio.create_subprocess_exec`.
+        """
+        captures = dict(stdout=self.capture('stdout'), stderr=self.capture('stderr'))
+
+        async def feed():
+            if proc.stdin:
+                try:
+                    if input:
+                        proc.stdin.write(input)
+                        await proc.stdin.drain()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                proc.stdin.close()
+
+        async def pump(stream, capture):
+            if stream:
+                while True:
+                    data = await stream.read(self.chunk_size)
+                    if not data:
+                        break
+                    capture.write(data)
+
+        try:
+            await asyncio.gather(feed(), pump(proc.stdout, captures['stdout']), pump(proc.stderr, captures['stderr']))
+            await proc.wait()
+        except BaseException:
+            # E.g., cancelled by asyncio.wait_for when the timeout expires.
+            for capture in captures.values():
+                capture.discard()
+            raise
+        return self.result(captures)
@@ -28,6 +28,8 @@ class PlatformInfoDecorator(CallableDecorator):
             call.decorate(0)=fuzzinator.call.PlatformInfoDecorator
     """
 
+    issue_filter = True
+
     def decorator(self, **kwargs):
         def wrapper(fn):
             def filter(*args, **kwargs):
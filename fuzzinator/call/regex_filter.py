@@ -10,6 +10,7 @@ import re
 
 from . import CallableDecorator
 from . import NonIssue
+from .output_capture import CapturePolicy, search_spill_file
 
 
 class RegexFilter(CallableDecorator):
@@ -25,6 +26,13 @@ class RegexFilter(CallableDecorator):
     out. The issues that are not filtered out are extended with keys-values from
     the named groups of the matching regex pattern.
 
+    If the SUT call limited its output (see ``capture_limit`` at
+    :func:`fuzzinator.call.SubprocessCall`), the patterns are matched against
+    the retained head and tail of the output first, and against the complete
+    output in the spill file (e.g., ``issue['stdout_file']`` for the
+    ``stdout`` field) if they don't match there. The spill files of filtered
+    out issues are removed.
+
     **Example configuration snippet:**
 
         .. code-block:: ini
@@ -41,6 +49,8 @@ class RegexFilter(CallableDecorator):
             backtrace=["#[0-9]+ +0x[0-9a-f]+ in (?P<path>[^ ]+) .*? at (?P<file>[^:]+):(?P<line>[0-9]+)"]
     """
 
+    issue_filter = True
+
     def decorator(self, **kwargs):
         patterns = dict()
         for (field, patterns_str) in kwargs.items():
@@ -58,11 +68,16 @@ class RegexFilter(CallableDecorator):
                 for field in patterns:
                     for pattern in patterns[field]:
                         match = pattern.search(issue.get(field, b''))
+                        if match is None and issue.get(field + '_file'):
+                            match = search_spill_file(pattern, issue[field + '_file'])
                         if match is not None:
                             issue.update(match.groupdict())
                             updated = True
 
-                return issue if updated else NonIssue(issue)
+                if not updated:
+                    CapturePolicy.discard(issue)
+                    return NonIssue(issue)
+                return issue
 
             return filter
         return wrapper
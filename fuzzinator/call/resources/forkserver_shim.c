@@ -0,0 +1,64 @@
+/*
+ * Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+ *
+ * Licensed under the BSD 3-Clause License
+ * <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+ * This file may not be copied, modified, or distributed except
+ * according to those terms.
+ */
+
+/*
+ * Fork server shim for arbitrary (uninstrumented) SUTs. When preloaded into a
+ * dynamically linked executable (LD_PRELOAD), the constructor below runs after
+ * the dynamic linking and the initialization of the shared libraries but
+ * before main. If the descriptors of the fork server protocol are open, it
+ * implements the protocol of AFL's fork server: it forks an already
+ * initialized child for every command, which continues to main, while the
+ * parent reports the pid and the wait status of the child. Otherwise (e.g.,
+ * in the subprocesses of the SUT), it does nothing.
+ */
+
+#include <fcntl.h>
+#include <stdint.h>
+#include <sys/types.h>
+#include <sys/wait.h>
+#include <unistd.h>
+
+#define CONTROL_FD 198
+#define STATUS_FD 199
+
+static int send_status(uint32_t value) {
+    return write(STATUS_FD, &value, sizeof(value)) == sizeof(value);
+}
+
+__attribute__((constructor))
+static void forkserver(void) {
+    uint32_t command;
+    pid_t child;
+    int status;
+
+    if (fcntl(CONTROL_FD, F_GETFD) == -1 || fcntl(STATUS_FD, F_GETFD) == -1)
+        return;
+
+    if (!send_status(0))
+        _exit(1);
+
+    for (;;) {
+        /* The command (whether the previous child has been killed) is not
+         * needed, the children are always waited for. */
+        if (read(CONTROL_FD, &command, sizeof(command)) != sizeof(command))
+            _exit(0);
+
+        child = fork();
+        if (child < 0)
+            _exit(1);
+        if (child == 0) {
+            close(CONTROL_FD);
+            close(STATUS_FD);
+            return;
+        }
+
+        if (!send_status((uint32_t)child) || waitpid(child, &status, 0) < 0 || !send_status((uint32_t)status))
+            _exit(1);
+    }
+}
@@ -5,20 +5,20 @@
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
-import json
+import asyncio
 import logging
-import os
-import shlex
 import subprocess
-import sys
 
 from .. import Controller
+from ..spawner import command_template, create_subprocess_exec, popen
 from . import NonIssue
+from .output_capture import CapturePolicy
 
 logger = logging.getLogger(__name__)
 
 
-def StdinSubprocessCall(command, cwd=None, env=None, no_exit_code=None, test=None, timeout=None, **kwargs):
+def StdinSubprocessCall(command, cwd=None, env=None, no_exit_code=None, test=None, timeout=None,
+                        capture_limit=None, capture_dir=None, capture_compress=None, **kwargs):
     """
     Subprocess invocation-based call of a SUT that takes a test input on its
     stdin stream.
@@ -36,6 +36,8 @@ def StdinSubprocessCall(command, cwd=None, env=None, no_exit_code=None, test=Non
       - ``no_exit_code``: makes possible to force issue creation regardless of
         the exit code.
       - ``timeout``: run subprocess with timeout.
+      - ``capture_limit``, ``capture_dir``, ``capture_compress``: limit the
+        captured output (see :func:`fuzzinator.call.SubprocessCall`).
 
     **Result of the SUT call:**
 
@@ -43,6 +45,10 @@ def StdinSubprocessCall(command, cwd=None, env=None, no_exit_code=None, test=Non
       - Otherwise, an issue with ``'exit_code'``, ``'stdout'``, and ``'stderr'``
         properties is returned.
 
+    The call has an asynchronous variant, too, which is used by fuzz jobs that
+    run multiple tests concurrently (see ``async_call`` at
+    :class:`fuzzinator.job.FuzzJob`).
+
     **Example configuration snippet:**
 
         .. code-block:: ini
@@ -55,30 +61,77 @@ def StdinSubprocessCall(command, cwd=None, env=None, no_exit_code=None, test=Non
             cwd=/home/alice/foo
             env={"BAR": "1"}
     """
-    env = dict(os.environ, **json.loads(env)) if env else None
     no_exit_code = no_exit_code in [1, '1', True, 'True', 'true']
     timeout = int(timeout) if timeout else None
+    policy = CapturePolicy.from_config(capture_limit, capture_dir, capture_compress)
     issue = {}
 
     try:
-        proc = subprocess.Popen(shlex.split(command, posix=sys.platform != 'win32'),
-                                stdin=subprocess.PIPE,
-                                stdout=subprocess.PIPE,
-                                stderr=subprocess.PIPE,
-                                cwd=cwd or os.getcwd(),
-                                env=env)
-        stdout, stderr = proc.communicate(input=test, timeout=timeout)
+        proc = popen(command_template(command).argv(),
+                     cwd=cwd,
+                     env=env,
+                     stdin=subprocess.PIPE,
+                     stdout=subprocess.PIPE,
+                     stderr=subprocess.PIPE)
+        if policy:
+            stdout, stderr, files = policy.communicate(proc, input=test, timeout=timeout)
+        else:
+            stdout, stderr = proc.communicate(input=test, timeout=timeout)
+            files = {}
         logger.debug('%s\n%s', stdout.decode('utf-8', errors='ignore'), stderr.decode('utf-8', errors='ignore'))
 
         issue = {
             'exit_code': proc.returncode,
             'stdout': stdout,
             'stderr': stderr,
+            **files,
         }
         if no_exit_code or proc.returncode != 0:
             return issue
+        CapturePolicy.discard(issue)
     except subprocess.TimeoutExpired:
         logger.debug('Timeout expired in the SUT\'s stdin subprocess runner.')
         Controller.kill_process_tree(proc.pid)
 
     return NonIssue(issue) if issue else None
+
+
+async def _async_stdin_subprocess_call(command, cwd=None, env=None, no_exit_code=None, test=None, timeout=None,
+                                       capture_limit=None, capture_dir=None, capture_compress=None, **kwargs):
+    # Asynchronous variant of StdinSubprocessCall (see async_call).
+    no_exit_code = no_exit_code in [1, '1', True, 'True', 'true']
+    timeout = int(timeout) if timeout else None
+    policy = CapturePolicy.from_config(capture_limit, capture_dir, capture_compress)
+
+    proc = await create_subprocess_exec(command_template(command).argv(),
+                                        cwd=cwd,
+                                        env=env,
+                                        stdin=asyncio.subprocess.PIPE,
+                                        stdout=asyncio.subprocess.PIPE,
+                                        stderr=asyncio.subprocess.PIPE)
+    try:
+        if policy:
+            stdout, stderr, files = await asyncio.wait_for(policy.async_communicate(proc, input=test), timeout=timeout)
+        else:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(input=test), timeout=timeout)
+            files = {}
+    except asyncio.TimeoutError:
+        logger.debug('Timeout expired in the SUT\'s subprocess runner.')
+        Controller.kill_process_tree(proc.pid)
+        await proc.wait()
+        return None
+    logger.debug('%s\n%s', stdout.decode('utf-8', errors='ignore'), stderr.decode('utf-8', errors='ignore'))
+
+    issue = {
+        'exit_code': proc.returncode,
+        'stdout': stdout,
+        'stderr': stderr,
+        **files,
+    }
+    if no_exit_code or proc.returncode != 0:
+        return issue
+    CapturePolicy.discard(issue)
+    return NonIssue(issue)
+
+
+StdinSubprocessCall.async_call = _async_stdin_subprocess_call
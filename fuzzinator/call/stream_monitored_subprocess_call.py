@@ -5,37 +5,99 @@
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
-import errno
 import fcntl
 import json
 import logging
 import os
 import re
-import shlex
-import select
+import selectors
 import signal
 import subprocess
-import sys
 import time
 
 from .. import Controller
+from ..spawner import command_template, popen
+from .output_capture import CapturePolicy
 
 logger = logging.getLogger(__name__)
 
 
 class StreamMonitoredSubprocessCall(object):
     """
+    Subprocess invocation-based call of a SUT that watches the standard output
+    and error streams of the SUT while it is running and stops it as soon as
+    any of the end patterns appears in any of the streams.
+
+    The streams are matched incrementally: after every read, only the new
+    complete lines (and an overlap window before them) are searched, so the
+    cost of matching is linear in the size of the output. The incomplete last
+    line of a stream is searched, too, if no more output arrives within
+    ``partial_line_wait`` seconds, thus an end pattern is noticed even if the
+    SUT gets stuck in the middle of a line (e.g., in a hang after an
+    assertion message).
+
     .. note::
 
        Not available on platforms without fcntl support (e.g., Windows).
+
+    **Mandatory parameter of the SUT call:**
+
+      - ``command``: string to pass to the child shell as a command to run (all
+        occurrences of ``{test}`` in the string are replaced by the actual
+        test case).
+
+    **Optional parameters of the SUT call:**
+
+      - ``cwd``: if not ``None``, change working directory before the command
+        invocation.
+      - ``env``: if not ``None``, a dictionary of variable names-values to
+        update the environment with.
+      - ``end_patterns``: list of regular expressions to match the streams
+        against (their named groups become the properties of the issue).
+      - ``timeout``: run subprocess with timeout.
+      - ``overlap``: number of already matched bytes of a stream that are
+        searched again together with the new data, i.e., the maximum length of
+        a match that may span multiple reads (4096 by default).
+      - ``capture_limit``, ``capture_dir``, ``capture_compress``: limit the
+        captured output (see :func:`fuzzinator.call.SubprocessCall`). The end
+        patterns are still matched against the complete streams, only the
+        data that has been matched already (and is beyond the overlap window)
+        is handed over to the capture.
+
+    **Result of the SUT call:**
+
+      - If none of the end patterns matched, no issue is returned.
+      - Otherwise, an issue with ``'exit_code'``, ``'stdout'``, and
+        ``'stderr'`` properties (and the named groups of the matching pattern)
+        is returned. The exit code is ``None`` if the SUT was still running
+        when the pattern matched.
+
+    **Example configuration snippet:**
+
+        .. code-block:: ini
+
+            [sut.foo]
+            call=fuzzinator.call.StreamMonitoredSubprocessCall
+
+            [sut.foo.call.init]
+            command=./bin/foo {test}
+            cwd=/home/alice/foo
+            end_patterns=["(?P<msg>Assertion .* failed)"]
+            timeout=10
     """
 
-    def __init__(self, command, cwd=None, env=None, end_patterns=None, timeout=None, **kwargs):
+    chunk_size = 65536
+    partial_line_wait = 0.1
+
+    def __init__(self, command, cwd=None, env=None, end_patterns=None, timeout=None, overlap=None,
+                 capture_limit=None, capture_dir=None, capture_compress=None, **kwargs):
         self.command = command
         self.cwd = cwd or os.getcwd()
         self.end_patterns = [re.compile(pattern.encode('utf-8', errors='ignore'), flags=re.MULTILINE | re.DOTALL) for pattern in json.loads(end_patterns)] if end_patterns else []
-        self.env = dict(os.environ, **json.loads(env)) if env else None
+        self.env = env
         self.timeout = int(timeout) if timeout else None
+        self.overlap = int(overlap) if overlap else 4096
+        self.capture = CapturePolicy.from_config(capture_limit, capture_dir, capture_compress)
 
     def __enter__(self):
         return self
@@ -43,58 +105,157 @@ class StreamMonitoredSubprocessCall(object):
     def __exit__(self, *exc):
         return False
 
+    def _match(self, buffer, start, end):
+        for pattern in self.end_patterns:
+            match = pattern.search(buffer, start, end)
+            if match is not None:
+                return match.groupdict()
+        return None
+
     def __call__(self, test, **kwargs):
-        if self.timeout:
-            start_time = time.time()
+        deadline = time.time() + self.timeout if self.timeout else None
 
-        proc = subprocess.Popen(shlex.split(self.command.format(test=test), posix=sys.platform != 'win32'),
-                                stdout=subprocess.PIPE,
-                                stderr=subprocess.PIPE,
-                                cwd=self.cwd or os.getcwd(),
-                                env=self.env)
+        proc = popen(command_template(self.command).argv(test=test),
+                     cwd=self.cwd,
+                     env=self.env,
+                     stdout=subprocess.PIPE,
+                     stderr=subprocess.PIPE)
 
-        streams = {'stdout': b'', 'stderr': b''}
+        streams = {'stdout': bytearray(), 'stderr': bytearray()}
+        # End of the data of the streams that has been matched already.
+        matched = {'stdout': 0, 'stderr': 0}
+        captures = {stream: self.capture.capture(stream) for stream in streams} if self.capture else None
         issue = None
 
-        select_fds = [stream.fileno() for stream in [proc.stderr, proc.stdout]]
-        for fd in select_fds:
-            fl = fcntl.fcntl(fd, fcntl.F_GETFL)
-            fcntl.fcntl(fd, fcntl.F_SETFL, fl | os.O_NONBLOCK)
+        selector = selectors.DefaultSelector()
+        for stream in streams:
+            fd = getattr(proc, stream).fileno()
+            fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+            selector.register(fd, selectors.EVENT_READ, stream)
+
+        # The termination of the SUT is signalled by a pidfd where available.
+        # Otherwise, the end of the streams is waited for, and the process is
+        # polled only if its streams are kept open by its children.
+        pidfd = None
+        try:
+            pidfd = os.pidfd_open(proc.pid)
+            selector.register(pidfd, selectors.EVENT_READ, None)
+        except (AttributeError, OSError):
+            pass
+
+        def drop_matched(stream):
+            buffer = streams[stream]
+            if captures:
+                # Only the overlap window of the matched data is needed for
+                # matching, the rest is handed over to the capture.
+                drop = max(matched[stream] - self.overlap, 0)
+                if drop:
+                    captures[stream].write(buffer[:drop])
+                    del buffer[:drop]
+                    matched[stream] -= drop
 
-        end_loop = False
-        while not end_loop:
-            try:
+        def read(stream, fd):
+            # Read everything that is available on the stream and match the new
+            # complete lines.
+            nonlocal issue
+            buffer = streams[stream]
+            while True:
                 try:
-                    read_fds = select.select(select_fds, [], select_fds, 0.5)[0]
-                except select.error as e:
-                    if e.args[0] == errno.EINVAL:
-                        continue
-                    raise
-
-                for stream, _ in streams.items():
-                    if getattr(proc, stream).fileno() in read_fds:
-                        while True:
-                            chunk = getattr(proc, stream).read(512)
-                            if not chunk:
-                                break
-                            streams[stream] += chunk
-
-                        for pattern in self.end_patterns:
-                            match = pattern.search(streams[stream])
-                            if match is not None:
-                                end_loop = True
-                                issue = match.groupdict()
-
-                if proc.poll() is not None or (self.timeout and time.time() - start_time > self.timeout):
+                    chunk = os.read(fd, self.chunk_size)
+                except BlockingIOError:
                     break
-            except IOError as e:
-                logger.warning('Exception in stream filtering.', exc_info=e)
+                if not chunk:
+                    selector.unregister(fd)
+                    break
+                buffer += chunk
+
+            end = buffer.rfind(b'\n', matched[stream]) + 1
+            if end > matched[stream]:
+                issue = self._match(buffer, max(matched[stream] - self.overlap, 0), end)
+                matched[stream] = end
+            drop_matched(stream)
+
+        def match_partial_lines():
+            # Match the incomplete last lines of the streams.
+            nonlocal issue
+            for stream, buffer in streams.items():
+                if issue is None and len(buffer) > matched[stream]:
+                    issue = self._match(buffer, max(matched[stream] - self.overlap, 0), len(buffer))
+                    matched[stream] = len(buffer)
+                    drop_matched(stream)
+
+        try:
+            while issue is None:
+                timeout = max(deadline - time.time(), 0) if deadline else None
+                if pidfd is None:
+                    if not any(key.data for key in selector.get_map().values()):
+                        # Both streams are closed, only the process is left.
+                        try:
+                            proc.wait(timeout=timeout)
+                        except subprocess.TimeoutExpired:
+                            pass
+                        break
+                    # The streams may be kept open by the children of the SUT
+                    # after it has terminated.
+                    timeout = min(timeout, 0.5) if timeout is not None else 0.5
+
+                # Wait only a while for the rest of an incomplete line.
+                partial = any(len(buffer) > matched[stream] for stream, buffer in streams.items())
+                if partial:
+                    timeout = min(timeout, self.partial_line_wait) if timeout is not None else self.partial_line_wait
+
+                events = selector.select(timeout)
+                if not events and partial:
+                    match_partial_lines()
+
+                exited = False
+                for key, _ in events:
+                    if key.data is None:
+                        exited = True
+                    elif issue is None:
+                        read(key.data, key.fd)
+
+                if issue is not None:
+                    break
+
+                if exited or (pidfd is None and proc.poll() is not None):
+                    # Collect the output that is still in the pipes.
+                    for key in list(selector.get_map().values()):
+                        if key.data and issue is None:
+                            read(key.data, key.fd)
+                    break
+
+                if deadline and time.time() >= deadline:
+                    break
+        except IOError as e:
+            logger.warning('Exception in stream filtering.', exc_info=e)
+
+        # Match the incomplete last lines, too.
+        match_partial_lines()
+
+        selector.close()
+        if pidfd is not None:
+            os.close(pidfd)
 
+        exit_code = proc.poll()
         Controller.kill_process_tree(proc.pid, sig=signal.SIGKILL)
+        proc.wait()
+        proc.stdout.close()
+        proc.stderr.close()
 
+        files = dict()
+        if captures:
+            for stream, buffer in streams.items():
+                captures[stream].write(buffer)
+            streams['stdout'], streams['stderr'], files = self.capture.result(captures)
+            if not issue:
+                CapturePolicy.discard(files)
+        else:
+            streams = {stream: bytes(buffer) for stream, buffer in streams.items()}
         logger.debug('%s\n%s', streams['stdout'].decode('utf-8', errors='ignore'), streams['stderr'].decode('utf-8', errors='ignore'))
         if issue:
-            issue.update(dict(exit_code=proc.returncode,
+            issue.update(dict(exit_code=exit_code,
                               stderr=streams['stderr'],
-                              stdout=streams['stdout']))
+                              stdout=streams['stdout'],
+                              **files))
         return issue
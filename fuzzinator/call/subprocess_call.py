@@ -5,21 +5,21 @@
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
-import json
+import asyncio
 import logging
-import os
-import shlex
 import subprocess
-import sys
 
 from .. import Controller
+from ..spawner import command_template, create_subprocess_exec, popen
 from . import NonIssue
+from .output_capture import CapturePolicy
 
 logger = logging.getLogger(__name__)
 
 
 def SubprocessCall(command, cwd=None, env=None, no_exit_code=None, test=None,
-                   timeout=None, **kwargs):
+                   timeout=None, capture_limit=None, capture_dir=None,
+                   capture_compress=None, **kwargs):
     """
     Subprocess invocation-based call of a SUT that takes test input on its
     command line. (See :class:`fuzzinator.call.FileWriterDecorator` for SUTs
@@ -40,6 +40,17 @@ def SubprocessCall(command, cwd=None, env=None, no_exit_code=None, test=None,
       - ``no_exit_code``: makes possible to force issue creation regardless of
         the exit code.
       - ``timeout``: run subprocess with timeout.
+      - ``capture_limit``: number of bytes of the ``stdout`` and ``stderr``
+        streams to keep in the issue (optionally with a ``K``, ``M``, or
+        ``G`` suffix, unlimited by default). If a stream is longer, its first
+        and last half of the limit is kept and the rest is replaced by a
+        marker line.
+      - ``capture_dir``: if not ``None``, the streams that exceed
+        ``capture_limit`` are written to files in this directory completely
+        (their paths are added to the issue as ``'stdout_file'`` and
+        ``'stderr_file'`` properties).
+      - ``capture_compress``: if it's true, the files in ``capture_dir`` are
+        gzip compressed while being written.
 
     **Result of the SUT call:**
 
@@ -47,6 +58,10 @@ def SubprocessCall(command, cwd=None, env=None, no_exit_code=None, test=None,
       - Otherwise, an issue with ``'exit_code'``, ``'stdout'``, and ``'stderr'``
         properties is returned.
 
+    The call has an asynchronous variant, too, which is used by fuzz jobs that
+    run multiple tests concurrently (see ``async_call`` at
+    :class:`fuzzinator.job.FuzzJob`).
+
     **Example configuration snippet:**
 
         .. code-block:: ini
@@ -61,29 +76,75 @@ def SubprocessCall(command, cwd=None, env=None, no_exit_code=None, test=None,
             cwd=/home/alice/foo
             env={"BAR": "1"}
     """
-    env = dict(os.environ, **json.loads(env)) if env else None
     no_exit_code = no_exit_code in [1, '1', True, 'True', 'true']
     timeout = int(timeout) if timeout else None
+    policy = CapturePolicy.from_config(capture_limit, capture_dir, capture_compress)
     issue = {}
 
     try:
-        proc = subprocess.Popen(shlex.split(command.format(test=test), posix=sys.platform != 'win32'),
-                                stdout=subprocess.PIPE,
-                                stderr=subprocess.PIPE,
-                                cwd=cwd or os.getcwd(),
-                                env=env)
-        stdout, stderr = proc.communicate(timeout=timeout)
+        proc = popen(command_template(command).argv(test=test),
+                     cwd=cwd,
+                     env=env,
+                     stdout=subprocess.PIPE,
+                     stderr=subprocess.PIPE)
+        if policy:
+            stdout, stderr, files = policy.communicate(proc, timeout=timeout)
+        else:
+            stdout, stderr = proc.communicate(timeout=timeout)
+            files = {}
         logger.debug('%s\n%s', stdout.decode('utf-8', errors='ignore'), stderr.decode('utf-8', errors='ignore'))
 
         issue = {
             'exit_code': proc.returncode,
             'stdout': stdout,
             'stderr': stderr,
+            **files,
         }
         if no_exit_code or proc.returncode != 0:
             return issue
+        CapturePolicy.discard(issue)
     except subprocess.TimeoutExpired:
         logger.debug('Timeout expired in the SUT\'s subprocess runner.')
         Controller.kill_process_tree(proc.pid)
 
     return NonIssue(issue) if issue else None
+
+
+async def _async_subprocess_call(command, cwd=None, env=None, no_exit_code=None, test=None, timeout=None,
+                                 capture_limit=None, capture_dir=None, capture_compress=None, **kwargs):
+    # Asynchronous variant of SubprocessCall (see async_call).
+    no_exit_code = no_exit_code in [1, '1', True, 'True', 'true']
+    timeout = int(timeout) if timeout else None
+    policy = CapturePolicy.from_config(capture_limit, capture_dir, capture_compress)
+
+    proc = await create_subprocess_exec(command_template(command).argv(test=test),
+                                        cwd=cwd,
+                                        env=env,
+                                        stdout=asyncio.subprocess.PIPE,
+                                        stderr=asyncio.subprocess.PIPE)
+    try:
+        if policy:
+            stdout, stderr, files = await asyncio.wait_for(policy.async_communicate(proc), timeout=timeout)
+        else:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+            files = {}
+    except asyncio.TimeoutError:
+        logger.debug('Timeout expired in the SUT\'s subprocess runner.')
+        Controller.kill_process_tree(proc.pid)
+        await proc.wait()
+        return None
+    logger.debug('%s\n%s', stdout.decode('utf-8', errors='ignore'), stderr.decode('utf-8', errors='ignore'))
+
+    issue = {
+        'exit_code': proc.returncode,
+        'stdout': stdout,
+        'stderr': stderr,
+        **files,
+    }
+    if no_exit_code or proc.returncode != 0:
+        return issue
+    CapturePolicy.discard(issue)
+    return NonIssue(issue)
+
+
+SubprocessCall.async_call = _async_subprocess_call
@@ -5,14 +5,11 @@
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
-import json
 import logging
-import os
-import shlex
 import subprocess
-import sys
 
 from .. import Controller
+from ..spawner import command_template, popen
 from . import CallableDecorator
 
 logger = logging.getLogger(__name__)
@@ -55,6 +52,8 @@ class SubprocessPropertyDecorator(CallableDecorator):
             env={"GIT_FLUSH": "1"}
     """
 
+    issue_filter = True
+
     def decorator(self, property, command, cwd=None, env=None, timeout=None, **kwargs):
         def wrapper(fn):
             def filter(*args, **kwargs):
@@ -63,11 +62,11 @@ class SubprocessPropertyDecorator(CallableDecorator):
                     return issue
 
                 try:
-                    proc = subprocess.Popen(shlex.split(command, posix=sys.platform != 'win32'),
-                                            cwd=cwd or os.getcwd(),
-                                            stdout=subprocess.PIPE,
-                                            stderr=subprocess.PIPE,
-                                            env=dict(os.environ, **json.loads(env or '{}')))
+                    proc = popen(command_template(command).argv(),
+                                 cwd=cwd,
+                                 env=env,
+                                 stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE)
                     stdout, stderr = proc.communicate(timeout=timeout)
                     if proc.returncode == 0:
                         issue[property] = stdout
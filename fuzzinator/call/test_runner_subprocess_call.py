@@ -5,115 +5,402 @@
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
-import errno
 import fcntl
 import json
 import logging
 import os
-import select
-import shlex
+import selectors
 import subprocess
-import sys
 import time
 
+from collections import deque
+
 from .. import Controller
+from ..spawner import command_template, popen
 
 logger = logging.getLogger(__name__)
 
 
 class TestRunnerSubprocessCall(object):
     """
+    Call of a long-running test runner SUT that reads tests from its standard
+    input (one per line) and signals the end of the processing of every test
+    by writing one of the end texts to its standard output or error stream.
+
+    The output of the stream up to and including the first end text (but
+    without the line break after it) belongs to the first unacknowledged
+    test, together with the output that has been written to the other stream
+    by then. In pipelined mode (see :meth:`call_batch`), up to ``pipeline``
+    tests are written to the runner before its responses arrive, and the
+    responses are mapped back to the tests by their order. (Then, the output
+    of the stream without end texts may contain the output of the next tests,
+    too.) If the runner crashes or a test times out, the first
+    unacknowledged test is blamed, the runner is restarted, and the tests
+    after the failing one are sent to it again.
+
     .. note::
 
        Not available on platforms without fcntl support (e.g., Windows).
+
+    **Mandatory parameter of the SUT call:**
+
+      - ``command``: string to pass to the child shell as a command to run.
+
+    **Optional parameters of the SUT call:**
+
+      - ``cwd``: if not ``None``, change working directory before the command
+        invocation.
+      - ``env``: if not ``None``, a dictionary of variable names-values to
+        update the environment with.
+      - ``end_texts``: list of strings that signal the end of the processing
+        of a test.
+      - ``init_wait``: if it's true then one of the end texts is waited for
+        after the start of the runner before the first test is sent.
+      - ``timeout_per_test``: timeout of processing a test (in seconds,
+        measured from when the runner finished the previous test). The
+        runner is killed if the timeout expires.
+      - ``pipeline``: number of tests in flight in pipelined mode (integer
+        number, 1 by default).
+
+    **Result of the SUT call:**
+
+      - A dictionary with ``'exit_code'`` (``None`` if the runner is still
+        running), ``'stdout'``, and ``'stderr'`` properties is returned for
+        every test (to be filtered by decorators, e.g.,
+        :class:`fuzzinator.call.RegexFilter`).
+      - If the runner cannot be run (e.g., it cannot be started or its input
+        pipe is broken), no issue is returned.
+
+    **Example configuration snippet:**
+
+        .. code-block:: ini
+
+            [sut.foo]
+            call=fuzzinator.call.TestRunnerSubprocessCall
+            call.decorate(0)=fuzzinator.call.RegexFilter
+
+            [sut.foo.call.init]
+            command=./bin/foo --runner
+            cwd=/home/alice/foo
+            end_texts=["DONE"]
+            init_wait=True
+            timeout_per_test=5
+            pipeline=8
+
+            [sut.foo.call.decorate(0)]
+            stderr=["(?P<msg>Assertion .* failed)"]
+
+            [fuzz.foo-with-random]
+            sut=foo
+            fuzzer=fuzzinator.fuzzer.RandomContent
+            batch=inf
+            sut_batch=64
     """
 
-    def __init__(self, command, cwd=None, env=None, end_texts=None, init_wait=None, timeout_per_test=None, **kwargs):
-        self.end_texts = json.loads(end_texts) if end_texts else []
+    chunk_size = 65536
+
+    def __init__(self, command, cwd=None, env=None, end_texts=None, init_wait=None, timeout_per_test=None, pipeline=None, **kwargs):
+        self.end_texts = [text.encode('utf-8') for text in json.loads(end_texts)] if end_texts else []
+        self._overlap = max(len(text) for text in self.end_texts) - 1 if self.end_texts else 0
         self.init_wait = init_wait in [1, '1', True, 'True', 'true']
         self.timeout_per_test = int(timeout_per_test) if timeout_per_test else None
+        self.pipeline = int(pipeline) if pipeline else 1
         self.cwd = cwd or os.getcwd()
         self.command = command
-        self.env = dict(os.environ, **json.loads(env)) if env else None
+        self.env = env
         self.proc = None
 
+        self._selector = None
+        # The file descriptors of the pipes that are watched by the selector.
+        self._fds = dict()
+        self._pidfd = None
+        self._outgoing = bytearray()
+        self._streams = dict()
+        # The buffers of the streams hold the output that is not assigned to
+        # any test yet. The end of the data that has been searched for end
+        # texts is tracked in _scanned.
+        self._scanned = dict()
+        self._linesep = dict()
+        # The streams whose pipe may still hold data that was written before
+        # the last select (i.e., whose last read returned a full chunk).
+        self._unread = set()
+
     def __enter__(self):
         self.start(self.init_wait)
         return self
 
     def __exit__(self, *exc):
-        if self.proc and self.proc.poll() is None:
-            Controller.kill_process_tree(self.proc.pid)
+        self.stop()
         return False
 
-    def __call__(self, test, **kwargs):
-        if not self.proc or self.proc.poll() is not None:
-            self.start(self.init_wait)
+    @property
+    def alive(self):
+        """
+        Whether the SUT process is still running (if it is not, it is
+        restarted by the next call or context entry).
+        """
+        return self.proc is not None and self.proc.poll() is None
 
+    def __call__(self, test, **kwargs):
         try:
-            self.proc.stdin.write((test + '\n').encode('utf-8'))
-            self.proc.stdin.flush()
-            issue = self.wait_til_end()
-            return issue
-        except Exception:
+            return self.call_batch(tests=[test], **kwargs)[0]
+        except Exception as e:
+            # A failing runner is not an issue of the test, and it is
+            # restarted by the next call.
+            logger.debug('Exception in the SUT\'s test runner.', exc_info=e)
+            self.stop()
             return None
 
+    def call_batch(self, tests, **kwargs):
+        """
+        Run the tests with up to ``pipeline`` tests in flight.
+
+        :param list tests: the tests to run the SUT on.
+        :return: list of the issues of the tests in the order of ``tests``.
+        """
+        issues = [None] * len(tests)
+        unsent = deque(range(len(tests)))
+        # Tests sent to the runner but not acknowledged, and the time when
+        # the runner has started working on the first of them.
+        in_flight = deque()
+        started = None
+
+        while unsent or in_flight:
+            # A runner that terminated with tests in flight is restarted only
+            # after the failing test has been identified.
+            if not in_flight and not self.alive:
+                self.start(self.init_wait)
+                if not self.alive:
+                    # The runner died during its initialization, skip the test.
+                    unsent.popleft()
+                    continue
+
+            while unsent and len(in_flight) < self.pipeline:
+                index = unsent.popleft()
+                self._outgoing += (tests[index] + '\n').encode('utf-8')
+                in_flight.append(index)
+            if started is None:
+                started = time.time()
+
+            deadline = started + self.timeout_per_test if self.timeout_per_test else None
+            response = self._wait(deadline)
+            if response is None:
+                # The runner crashed or timed out, the first unacknowledged
+                # test is blamed. The rest of the tests in flight are sent
+                # again to the restarted runner.
+                exit_code = self.proc.poll()
+                if exit_code is None:
+                    logger.debug('Timeout expired in the SUT\'s test runner.')
+                    self.stop()
+                issues[in_flight.popleft()] = self._response(None, exit_code=exit_code)
+                unsent.extendleft(reversed(in_flight))
+                in_flight.clear()
+                started = None
+                continue
+
+            issues[in_flight.popleft()] = response
+            started = time.time() if in_flight else None
+
+        return issues
+
     def start(self, init_wait=True):
-        self.proc = subprocess.Popen(shlex.split(self.command, posix=sys.platform != 'win32'),
-                                     stdout=subprocess.PIPE,
-                                     stderr=subprocess.PIPE,
-                                     stdin=subprocess.PIPE,
-                                     cwd=self.cwd,
-                                     env=self.env)
+        self.stop()
+        self.proc = popen(command_template(self.command).argv(),
+                          cwd=self.cwd,
+                          env=self.env,
+                          stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE,
+                          stdin=subprocess.PIPE)
+
+        self._selector = selectors.DefaultSelector()
+        self._fds = dict()
+        for stream in ['stdout', 'stderr']:
+            fd = getattr(self.proc, stream).fileno()
+            fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+            self._selector.register(fd, selectors.EVENT_READ, stream)
+            self._fds[stream] = fd
+            self._streams[stream] = bytearray()
+            self._scanned[stream] = 0
+            self._linesep[stream] = False
+        fd = self.proc.stdin.fileno()
+        fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+        self._outgoing = bytearray()
+        self._unread = set()
+
+        # The termination of the runner is signalled by a pidfd where
+        # available, otherwise the runner is polled.
+        try:
+            self._pidfd = os.pidfd_open(self.proc.pid)
+            self._selector.register(self._pidfd, selectors.EVENT_READ, None)
+        except (AttributeError, OSError):
+            self._pidfd = None
+
         if init_wait:
             self.wait_til_end()
 
+    def stop(self):
+        if self.proc:
+            if self.proc.poll() is None:
+                Controller.kill_process_tree(self.proc.pid)
+            self.proc.wait()
+            for stream in [self.proc.stdin, self.proc.stdout, self.proc.stderr]:
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+        if self._selector:
+            self._selector.close()
+            self._selector = None
+        if self._pidfd is not None:
+            os.close(self._pidfd)
+            self._pidfd = None
+
     def wait_til_end(self):
-        streams = {'stdout': b'', 'stderr': b''}
+        """
+        Wait for the end of the processing of the current test (or the
+        initialization of the runner).
 
-        select_fds = [stream.fileno() for stream in [self.proc.stderr, self.proc.stdout]]
-        for fd in select_fds:
-            fl = fcntl.fcntl(fd, fcntl.F_GETFL)
-            fcntl.fcntl(fd, fcntl.F_SETFL, fl | os.O_NONBLOCK)
+        :return: the response of the runner.
+        """
+        deadline = time.time() + self.timeout_per_test if self.timeout_per_test else None
+        response = self._wait(deadline)
+        if response is None:
+            exit_code = self.proc.poll()
+            if exit_code is None:
+                self.stop()
+            response = self._response(None, exit_code=exit_code)
+        return response
 
-        end_loop = False
-        start_time = time.time()
-        while not end_loop:
-            try:
-                time_left = self.timeout_per_test - (time.time() - start_time) if self.timeout_per_test else 0.5
-                if time_left <= 0:
-                    # Avoid waiting for the current test in the next iteration.
-                    Controller.kill_process_tree(self.proc.pid)
-                    break
+    def _response(self, end, exit_code=None):
+        # Assign the output of the runner up to the end text (or all the
+        # remaining output) to a test.
+        if end is not None:
+            # Whatever the runner has written to the other stream before the
+            # end text has been read already, or it is in the pipe if the
+            # last read of the stream was not short (but in pipelined mode,
+            # the output of the next tests may be there, too).
+            for stream in list(self._unread):
+                if stream != end[0]:
+                    self._read(stream, self._fds[stream])
 
-                try:
-                    read_fds = select.select(select_fds, [], select_fds, time_left)[0]
-                except select.error as e:
-                    if e.args[0] == errno.EINVAL:
-                        continue
-                    raise
-
-                for stream, _ in streams.items():
-                    if getattr(self.proc, stream).fileno() in read_fds:
-                        while True:
-                            stdout_chunk = getattr(self.proc, stream).read(512)
-                            if not stdout_chunk:
-                                break
-                            streams[stream] += stdout_chunk
-
-                        for end_pattern in self.end_texts:
-                            if end_pattern.encode('utf-8') in streams[stream]:
-                                end_loop = True
-                                break
-
-                if self.proc.poll() is not None:
-                    break
-            except IOError as e:
-                logger.warning('Exception in stream filtering.', exc_info=e)
-
-        logger.debug('%s\n%s', streams['stdout'].decode('utf-8', errors='ignore'), streams['stderr'].decode('utf-8', errors='ignore'))
-        return {
-            'exit_code': self.proc.returncode,
-            'stderr': streams['stderr'],
-            'stdout': streams['stdout'],
-        }
+        response = {'exit_code': exit_code if end is None else self.proc.returncode}
+        for stream, buffer in self._streams.items():
+            stop = end[1] if end is not None and end[0] == stream else len(buffer)
+            response[stream] = bytes(buffer[:stop])
+            del buffer[:stop]
+            self._scanned[stream] = max(self._scanned[stream] - stop, 0)
+            self._linesep[stream] = end is not None and end[0] == stream
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%s\n%s', response['stdout'].decode('utf-8', errors='ignore'), response['stderr'].decode('utf-8', errors='ignore'))
+        return response
+
+    def _find_end(self):
+        # Find the first end text in the output that is not assigned to any
+        # test yet, searching only the new data and an overlap window.
+        for stream, buffer in self._streams.items():
+            if len(buffer) == self._scanned[stream]:
+                continue
+
+            # The line break after an end text (which may arrive later than
+            # the end text itself) belongs to neither of the tests.
+            if self._linesep[stream] and buffer:
+                linesep = b'\r\n' if buffer.startswith(b'\r\n') else b'\n' if buffer.startswith(b'\n') else b''
+                if buffer != b'\r':
+                    del buffer[:len(linesep)]
+                    self._scanned[stream] = max(self._scanned[stream] - len(linesep), 0)
+                    self._linesep[stream] = False
+
+            start = max(self._scanned[stream] - self._overlap, 0)
+            ends = []
+            for text in self.end_texts:
+                pos = buffer.find(text, start)
+                if pos != -1:
+                    ends.append(pos + len(text))
+            if ends:
+                self._scanned[stream] = min(ends)
+                return stream, min(ends)
+            self._scanned[stream] = len(buffer)
+        return None
+
+    def _wait(self, deadline):
+        # Write the outgoing tests and read the output of the runner until an
+        # end text is found (returning the response of the first
+        # unacknowledged test), or the runner terminates or the deadline
+        # expires (returning None).
+        while True:
+            end = self._find_end()
+            if end is not None:
+                return self._response(end)
+
+            # Tests are written eagerly, the runner's input is watched only
+            # if its pipe is full.
+            if self._outgoing:
+                self._write()
+
+            timeout = max(deadline - time.time(), 0) if deadline else None
+            if self._pidfd is None:
+                timeout = min(timeout, 0.5) if timeout is not None else 0.5
+
+            exited = False
+            for key, _ in self._selector.select(timeout):
+                if key.data is None:
+                    exited = True
+                elif key.data == 'stdin':
+                    self._write()
+                else:
+                    self._read(key.data, key.fd, drain=False)
+
+            if exited or (self._pidfd is None and self.proc.poll() is not None):
+                # Collect the output that is still in the pipes.
+                for stream, fd in list(self._fds.items()):
+                    if stream in self._streams:
+                        self._read(stream, fd)
+                end = self._find_end()
+                if end is not None:
+                    return self._response(end)
+                self.proc.wait()
+                return None
+
+            if deadline and time.time() >= deadline:
+                return None
+
+    def _write(self):
+        fd = self.proc.stdin.fileno()
+        try:
+            written = os.write(fd, self._outgoing)
+            del self._outgoing[:written]
+        except BlockingIOError:
+            pass
+        except OSError:
+            # The runner closed its input, it's about to exit.
+            self._outgoing = bytearray()
+
+        if self._outgoing and 'stdin' not in self._fds:
+            self._selector.register(fd, selectors.EVENT_WRITE, 'stdin')
+            self._fds['stdin'] = fd
+        elif not self._outgoing and 'stdin' in self._fds:
+            self._selector.unregister(self._fds.pop('stdin'))
+
+    def _read(self, stream, fd, drain=True):
+        # Read the available output of the runner from a stream (all of it if
+        # drain is true, at most one chunk otherwise).
+        buffer = self._streams[stream]
+        while True:
+            try:
+                chunk = os.read(fd, self.chunk_size)
+            except BlockingIOError:
+                self._unread.discard(stream)
+                break
+            if not chunk:
+                self._selector.unregister(self._fds.pop(stream))
+                self._unread.discard(stream)
+                break
+            buffer += chunk
+            if not drain:
+                # A short read has emptied the pipe.
+                if len(chunk) == self.chunk_size:
+                    self._unread.add(stream)
+                else:
+                    self._unread.discard(stream)
+                break
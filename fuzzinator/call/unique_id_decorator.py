@@ -38,6 +38,8 @@ class UniqueIdDecorator(CallableDecorator):
            properties=["msg", "file", "func"]
     """
 
+    issue_filter = True
+
     def decorator(self, properties, **kwargs):
         properties = json.loads(properties) if properties else None
 
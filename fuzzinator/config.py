@@ -12,6 +12,7 @@ from collections import OrderedDict
 from configparser import ConfigParser, ExtendedInterpolation
 from inspect import isclass
 from io import StringIO
+from weakref import finalize
 
 
 def import_entity(name):
@@ -26,6 +27,10 @@ def config_get_kwargs(config, section):
 class CallableContextManager(object):
     def __init__(self, callable):
         self._callable = callable
+        # Expose the batch protocols of fuzzers and SUT calls (if any).
+        for batch_name in ['generate_batch', 'call_batch', 'async_call']:
+            if hasattr(callable, batch_name):
+                setattr(self, batch_name, getattr(callable, batch_name))
 
     def __enter__(self):
         return self
@@ -37,54 +42,107 @@ class CallableContextManager(object):
         return self._callable(*args, **kwargs)
 
 
+# Per-process cache of the callables, i.e., the imported entities already
+# decorated (classes or functions ready to be instantiated or wrapped), and the
+# arguments read from the config. The keys contain the (interpolated) values of
+# all the config options that the callable depends on, thus changed configs
+# never hit stale entries, while equal configs (e.g., the copies of the config
+# passed to the jobs) share the entries. The least recently used entries are
+# evicted above _callable_cache_size.
+_callable_cache = OrderedDict()
+_callable_cache_size = 128
+
+# Per-config cache of the keys of _callable_cache. Interpolating the options is
+# the most expensive part of a cache lookup, so the key is only recomputed if
+# a raw value of the options changes (i.e., once per config generation).
+# (Values interpolated from other sections, e.g., ${fuzzinator:work_dir}, are
+# expected to be set before the first resolution.) Configs are not hashable,
+# the entries are indexed by their id and dropped when they are collected.
+_callable_keys = dict()
+
+
+def _config_get_callable_sections(config, section, option, decorator_options):
+    sections = [section, section + '.' + option, section + '.' + option + '.init']
+    sections += [section + '.' + decopt for decopt in decorator_options]
+    return [name for name in sections if config.has_section(name)]
+
+
+def _config_get_callable_key(config, section, option, decorator_options):
+    sections = _config_get_callable_sections(config, section, option, decorator_options)
+    raw = tuple((name, tuple(config.items(name, raw=True))) for name in sections)
+
+    keys = _callable_keys.get(id(config))
+    if keys is None:
+        keys = _callable_keys[id(config)] = dict()
+        finalize(config, _callable_keys.pop, id(config), None)
+    generation, key = keys.get((section, option), (None, None))
+    if generation != raw:
+        key = (section, option, tuple((name, tuple(config.items(name))) for name in sections))
+        keys[(section, option)] = (raw, key)
+    return key
+
+
+def _config_get_callable_factory(config, section, option, decorator_options):
+    # get the python entity (function or callable context manager class) named
+    # in $(section:option) and its call arguments given in $(section.option:*)
+    entity = import_entity(config.get(section, option))
+    entity_kwargs = config_get_kwargs(config, section + '.' + option)
+
+    # apply the decorator classes named in $(section:option.decorate(*)) with
+    # their arguments given in $(section.option.decorate(*):*)
+    for decopt in decorator_options:
+        decorator = import_entity(config.get(section, decopt))(**config_get_kwargs(config, section + '.' + decopt))
+        entity = decorator(entity)
+
+    init_kwargs = config_get_kwargs(config, section + '.' + option + '.init')
+    return entity, init_kwargs, entity_kwargs
+
+
 def config_get_callable(config, section, options):
     """
     Return an object that can both act as a context manager and as a callable,
     as well as a dictionary with key-value pairs to be used when calling the
     object.
+
+    The decorated entity is cached (thus, the decorator instances are shared
+    by the callables resolved from equal configs), but every invocation
+    returns a new object and a new dictionary.
     """
     options = options if isinstance(options, list) else [options]
 
-    callable_ctx, entity_kwargs = None, None
     for option in options:
         if not config.has_option(section, option):
             continue
 
-        # get the python entity (function or callable context manager class) named
-        # in $(section:option) and its call arguments given in $(section.option:*)
-        entity = import_entity(config.get(section, option))
-        entity_kwargs = config_get_kwargs(config, section + '.' + option)
-
-        # find decorator classes named in $(section:option.decorate(*)) and apply
-        # them with their arguments given in $(section.option.decorate(*):*)
         opt_prefix = option + '.decorate('
         opt_suffix = ')'
         decorator_options = [opt for opt in config.options(section)
                              if opt.startswith(opt_prefix) and opt.endswith(opt_suffix)]
         decorator_options.sort(key=lambda opt, pre=opt_prefix, suf=opt_suffix: int(opt[len(pre):-len(suf)]))
-        for decopt in decorator_options:
-            decorator_class = import_entity(config.get(section, decopt))
-            decorator_kwargs = config_get_kwargs(config, section + '.' + decopt)
-            decorator = decorator_class(**decorator_kwargs)
-            entity = decorator(entity)
-
-        # if entity is a callable context manager class, instantiate it with
-        # arguments given in $(section.option.init:*)
+
+        key = _config_get_callable_key(config, section, option, decorator_options)
+        if key in _callable_cache:
+            _callable_cache.move_to_end(key)
+        else:
+            _callable_cache[key] = _config_get_callable_factory(config, section, option, decorator_options)
+            while len(_callable_cache) > _callable_cache_size:
+                _callable_cache.popitem(last=False)
+        entity, init_kwargs, entity_kwargs = _callable_cache[key]
+
+        # if entity is a callable context manager class, it will be instantiated
+        # with arguments given in $(section.option.init:*)
         if isclass(entity):
-            init_kwargs = {}
-            if config.has_section(section + '.' + option + '.init'):
-                init_kwargs = config_get_kwargs(config, section + '.' + option + '.init')
-            callable_ctx = entity(**init_kwargs)
-        # if entity is a function, wrap it into a default callable context manager
-        # object
+            entity = entity(**init_kwargs)
+        # if entity is a function, it will be wrapped into a default callable
+        # context manager object
         else:
-            callable_ctx = CallableContextManager(entity)
+            entity = CallableContextManager(entity)
 
-        # break the loop after finding the first matching option.
-        break
+        # return the callable context manager and its call arguments from the
+        # first matching option.
+        return entity, dict(entity_kwargs)
 
-    # return the callable context manager and its call arguments
-    return callable_ctx, entity_kwargs
+    return None, None
 
 
 def config_get_with_writeback(config, section, option, fallback):
@@ -97,6 +155,20 @@ def config_get_with_writeback(config, section, option, fallback):
     return config.get(section, option)
 
 
+def parse_size(value):
+    """
+    Convert a size given in bytes, optionally with a ``K``, ``M``, ``G``, or
+    ``T`` (binary) multiplier suffix, or as ``inf``, to a number.
+    """
+    value = str(value).strip().upper()
+    if value == 'INF':
+        return float('inf')
+    multipliers = dict(K=1 << 10, M=1 << 20, G=1 << 30, T=1 << 40)
+    if value and value[-1] in multipliers:
+        return int(float(value[:-1]) * multipliers[value[-1]])
+    return int(value)
+
+
 def config_get_fuzzers(config):
 
     def filter_available_sections(section_name):
@@ -5,20 +5,31 @@
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
+import logging
 import os
+import queue
 import shutil
 import signal
 import time
 import traceback
 
-from multiprocessing import Lock, Process, Queue
+from multiprocessing import Lock, Pipe, Process, Queue, Value
+from multiprocessing.connection import wait
 
 import psutil
 
-from .config import config_get_callable, config_get_fuzzers, config_get_kwargs, config_get_with_writeback, import_entity
+from .config import config_get_callable, config_get_fuzzers, config_get_kwargs, config_get_with_writeback, import_entity, parse_size
+from .cpu_placement import CpuPlacement
+from .fuzz_selector import ThompsonSamplingSelector
+from .isolation import create_isolation, isolation_modes
 from .job import FuzzJob, ReduceJob, UpdateJob, ValidateJob
+from .job_queue import JobQueue
 from .listener import ListenerManager
 from .mongo_driver import MongoDriver
+from .remote import Coordinator
+from .worker_pool import WorkerPool
+
+logger = logging.getLogger(__name__)
 
 
 class Controller(object):
@@ -44,10 +55,79 @@ class Controller(object):
 
         - Option ``cost_budget``: (Optional, default: number of cpus)
 
+        - Option ``memory_budget``: Memory available for the jobs in bytes,
+          optionally with a ``K``, ``M``, ``G``, or ``T`` suffix. A job is
+          started only if both its cost and its memory cost fit into the free
+          capacity and memory. The memory cost of a job is the maximum of the
+          declared memory cost of its SUT and the peak memory usage (RSS)
+          observed so far for the process trees of the same kind of jobs of
+          the SUT. (Optional, default: ``inf``)
+
+        - Option ``scheduler``: Policy of starting queued jobs, either
+          ``fifo`` (jobs are started strictly in queue order) or ``backfill``
+          (jobs behind a job that does not fit into the free capacity may be
+          started if they fit). (Optional, default: ``fifo``)
+
+        - Option ``backfill_limit``: Number of times a queued job may be
+          overtaken by backfilled jobs before capacity is reserved for it.
+          (Optional, default: 10)
+
+        - Option ``fuzz_selector``: Strategy of selecting the next fuzz job,
+          either ``round_robin`` (fuzz jobs are selected in turn) or
+          ``thompson`` (fuzz jobs that found more new unique issues per
+          executed test in the current session are selected more often,
+          see :class:`fuzzinator.fuzz_selector.ThompsonSamplingSelector`).
+          (Optional, default: ``round_robin``)
+
+        - Option ``fuzz_exploration``: Probability of selecting a uniformly
+          random fuzz job when the ``thompson`` strategy is used.
+          (Optional, default: 0.1)
+
+        - Option ``pool``: Boolean to execute jobs in a pool of long-lived
+          worker processes (sized to ``cost_budget``) instead of starting a
+          new process for every job. (Optional, default: ``False``)
+
+        - Option ``cpu_affinity``: Boolean to dedicate ``cost`` number of CPUs
+          to every running job, preferably from a single NUMA node. The CPU
+          affinity of the job is inherited by the SUT processes it starts.
+          Jobs that do not fit into the free CPUs (e.g., if ``cost_budget``
+          exceeds the number of CPUs) and jobs without cost are not pinned.
+          (Optional, default: ``False``)
+
+        - Option ``isolation``: Isolation of the processes of the jobs,
+          either ``none`` (processes are tracked via the process tree only),
+          ``process_group`` (every job process is put in its own process
+          group), or ``cgroup`` (every job process is put in its own cgroup v2
+          subtree, so that even daemonizing SUTs are killed together with
+          the job; falls back to ``process_group`` if cgroup v2 is not
+          available). Processes left behind by a terminated job (or by a
+          finished job of a pool worker) are killed. With ``cgroup``
+          isolation, the memory usage of the jobs is read from their cgroups
+          (if the memory controller is enabled for them). Isolated jobs are
+          not in the process group of the terminal, so keyboard interrupts
+          received by the controller are forwarded to them.
+          (Optional, default: ``none``)
+
+        - Option ``coordinator_address``: Address (in ``HOST:PORT`` format) to
+          accept connections of remote workers on. Remote workers are started
+          with the ``fuzzinator-worker`` command and execute queued jobs with
+          their own cost budget when the local capacity is exhausted (see
+          :mod:`fuzzinator.remote`). (Optional, no remote workers are accepted
+          if option is missing.)
+
+        - Option ``coordinator_authkey``: Authentication key shared with the
+          remote workers. (Mandatory if ``coordinator_address`` is given.)
+
         - Option ``validate_after_update``: Boolean to enable the validation
           of valid issues of all SUTs after their update.
           (Optional, default: ``False``)
 
+        - Option ``event_throttle``: Minimum interval (in seconds) between two
+          ``job_progress`` or ``update_fuzz_stat`` events of a job sent to the
+          listeners. Events in between are coalesced, only the latest one is
+          sent. Other events are never delayed. (Optional, default: 0.1, 0
+          disables throttling)
+
       - Sections ``sut.NAME``: Definitions of a SUT named *NAME*
 
         - Option ``call``: Fully qualified name of a python callable that must
@@ -63,6 +143,10 @@ class Controller(object):
 
         - Option ``cost``: (Optional, default: 1)
 
+        - Option ``memory_cost``: Expected peak memory usage of the SUT's
+          jobs, in the format of option ``fuzzinator:memory_budget``.
+          (Optional, default: 0)
+
         - Option ``reduce``: Fully qualified name of a python callable that must
           accept ``issue``, ``sut_call``, ``sut_call_kwargs``, ``listener``,
           ``ident``, ``work_dir`` keyword arguments representing an issue to be
@@ -84,6 +168,9 @@ class Controller(object):
         - Option ``reduce_cost``: (Optional, default: the value of option
           ``cost``)
 
+        - Option ``reduce_memory_cost``: (Optional, default: the value of
+          option ``memory_cost``)
+
         - Option ``validate_call``: Fully qualified name of a python callable
           that acts as the SUT's ``call`` option during test case validation.
           (Optional, default: the value of option ``reduce_call`` if defined,
@@ -94,6 +181,9 @@ class Controller(object):
         - Option ``validate_cost``: (Optional, default: the value of option
           ``cost``)
 
+        - Option ``validate_memory_cost``: (Optional, default: the value of
+          option ``memory_cost``)
+
         - Option ``update_condition``: Fully qualified name of a python callable
           that must return ``True`` if and only if the SUT should be updated.
           (Optional, SUT is never updated automatically if option is missing.)
@@ -109,6 +199,9 @@ class Controller(object):
         - Option ``update_cost``: (Optional, default: the value of option
           ``fuzzinator:cost_budget``)
 
+        - Option ``update_memory_cost``: (Optional, default: the value of
+          option ``memory_cost``)
+
         - Option ``validate_after_update``: Boolean to enable the validation
           of the valid issues of the SUT after its update. (Optional, default:
           the value of option ``fuzzinator:validate_after_update``)
@@ -167,6 +260,33 @@ class Controller(object):
         - Option ``refresh``: Statistics update frequency in terms of executed
           test cases. (Optional, default: ``batch`` size)
 
+        - Option ``fuzzer_batch``: Number of tests requested at once from
+          fuzzers that implement the batch protocol (see
+          :class:`fuzzinator.job.FuzzJob`). (Optional, default: 100)
+
+        - Option ``sut_batch``: Number of tests passed at once to SUT calls
+          that implement the batch protocol (see
+          :class:`fuzzinator.job.FuzzJob`). (Optional, default: 1, i.e., SUT
+          calls are not batched)
+
+        - Option ``async_window``: Maximum number of tests run concurrently
+          by SUT calls that implement the asynchronous protocol (see
+          :class:`fuzzinator.job.FuzzJob`), capped by the cost of the SUT.
+          (Optional, default: 1)
+
+        - Option ``prefetch``: Number of tests generated ahead by the fuzzer
+          in a background thread while the SUT is running (see
+          :class:`fuzzinator.job.FuzzJob`). (Optional, default: 0, i.e., no
+          prefetching)
+
+        - Option ``stats_flush_interval``: Maximum number of seconds the
+          statistics of the fuzz job are buffered before they are written to
+          the database. (Optional, default: 1)
+
+        - Option ``stats_flush_count``: Maximum number of tests whose
+          statistics are buffered before they are written to the database.
+          (Optional, default: inf)
+
       - Section ``listeners``: Definitions of custom event listeners.
         This section is optional.
 
@@ -194,6 +314,18 @@ class Controller(object):
         potential decorators.
     """
 
+    # Interval of sampling the memory usage of the running jobs (in seconds)
+    # if memory_budget is set.
+    memory_sample_interval = 1
+
+    # Time to wait for an item announced on the shared queue to arrive (in
+    # seconds).
+    shared_queue_timeout = 1
+
+    # Time to wait for isolated jobs to finish after forwarding a keyboard
+    # interrupt to them (in seconds).
+    interrupt_timeout = 1
+
     def __init__(self, config):
         """
         :param configparser.ConfigParser config: the configuration options of the
@@ -205,23 +337,55 @@ class Controller(object):
         self.config = config
 
         self.capacity = int(config_get_with_writeback(self.config, 'fuzzinator', 'cost_budget', str(os.cpu_count())))
+        self.memory_budget = parse_size(config_get_with_writeback(self.config, 'fuzzinator', 'memory_budget', 'inf'))
         self.work_dir = config_get_with_writeback(self.config, 'fuzzinator', 'work_dir', os.path.join(os.getcwd(), '.fuzzinator-{uid}')).format(uid=os.getpid())
         self.config.set('fuzzinator', 'work_dir', self.work_dir)
         self.fuzzers = config_get_fuzzers(self.config)
         self.validate_after_update = config_get_with_writeback(self.config, 'fuzzinator', 'validate_after_update', fallback=False) in [1, '1', True, 'True', 'true']
+        self.scheduler = config_get_with_writeback(self.config, 'fuzzinator', 'scheduler', 'fifo')
+        self.backfill_limit = int(config_get_with_writeback(self.config, 'fuzzinator', 'backfill_limit', '10'))
+        self.pool = config_get_with_writeback(self.config, 'fuzzinator', 'pool', fallback=False) in [1, '1', True, 'True', 'true']
+        self.cpu_affinity = config_get_with_writeback(self.config, 'fuzzinator', 'cpu_affinity', fallback=False) in [1, '1', True, 'True', 'true']
+        self.isolation_mode = config_get_with_writeback(self.config, 'fuzzinator', 'isolation', 'none')
+        if self.isolation_mode not in isolation_modes:
+            raise ValueError('Unknown isolation mode: {mode}'.format(mode=self.isolation_mode))
+        self.isolation = None
+        self.coordinator_address = self.config.get('fuzzinator', 'coordinator_address', fallback=None)
+        self.coordinator_authkey = self.config.get('fuzzinator', 'coordinator_authkey', fallback=None)
+        if self.coordinator_address and not self.coordinator_authkey:
+            raise ValueError('Option fuzzinator:coordinator_authkey must be specified if remote workers are accepted.')
 
         self.db = MongoDriver(config_get_with_writeback(self.config, 'fuzzinator', 'db_uri', 'mongodb://localhost/fuzzinator'))
         self.db.init_db(self.fuzzers)
         self.session_start = time.time()
         self.session_baseline = self.db.get_stats()
 
-        self.listener = ListenerManager()
+        self.fuzz_selector = None
+        fuzz_selector = config_get_with_writeback(self.config, 'fuzzinator', 'fuzz_selector', 'round_robin')
+        if fuzz_selector == 'thompson':
+            self.fuzz_selector = ThompsonSamplingSelector(db=self.db,
+                                                          fuzzers=self.fuzzers,
+                                                          exploration=float(config_get_with_writeback(self.config, 'fuzzinator', 'fuzz_exploration', '0.1')),
+                                                          session_start=self.session_start,
+                                                          session_baseline=self.session_baseline)
+        elif fuzz_selector != 'round_robin':
+            raise ValueError('Unknown fuzz job selector: {selector}'.format(selector=fuzz_selector))
+
+        self.listener = ListenerManager(throttle=float(config_get_with_writeback(self.config, 'fuzzinator', 'event_throttle', '0.1')))
         for name in config_get_kwargs(self.config, 'listeners'):
             entity = import_entity(self.config.get('listeners', name))
             self.listener += entity(config=config, **config_get_kwargs(config, 'listeners.' + name + '.init'))
 
         self._shared_queue = Queue()
         self._shared_lock = Lock()
+        # Items put on the shared queue are announced through a wakeup pipe
+        # so that the main loop can block until there is something to do.
+        # At most one token is in the pipe at a time, it is sent when the
+        # number of pending items becomes non-zero.
+        self._shared_pending = Value('i', 0, lock=False)
+        # Number of announced items that did not arrive in time.
+        self._shared_undelivered = 0
+        self._wakeup_reader, self._wakeup_writer = Pipe(duplex=False)
 
     def run(self, *, max_cycles=None):
         """
@@ -233,46 +397,151 @@ class Controller(object):
         max_cycles = max_cycles if max_cycles is not None else float('inf')
         cycle = 0
         fuzz_idx = 0
+        fuzz_skips = 0
         fuzz_names = list(self.fuzzers)
         load = 0
+        memory_load = 0
+        memory_peaks = dict()
+        memory_sampled = 0
+        utilization = None
         job_id = 0
-        job_queue = []
+        job_queue = JobQueue(policy=self.scheduler, backfill_limit=self.backfill_limit)
+        job_descriptors = dict()
         running_jobs = dict()
+        pool = WorkerPool(self._run_pooled_job, self.capacity) if self.pool else None
+        placement = CpuPlacement() if self.cpu_affinity else None
+        coordinator = None
+
+        def _is_running(ident):
+            remote = running_jobs[ident].get('remote')
+            if remote:
+                return ident in remote.jobs
+            worker = running_jobs[ident].get('worker')
+            if worker:
+                return worker.ident == ident
+            proc = running_jobs[ident]['proc']
+            # The process may have been reaped by Controller.kill_process_tree
+            # already, in which case is_alive() is unreliable.
+            return proc.is_alive() and (self.isolation.is_alive(proc.pid) if self.isolation else psutil.pid_exists(proc.pid))
+
+        def _instance_limit_reached(fuzzer_name):
+            instances = self.config.get('fuzz.' + fuzzer_name, 'instances', fallback='inf')
+            instances = float(instances) if instances == 'inf' else int(instances)
+            return instances <= sum(1 for job in running_jobs.values() if isinstance(job['job'], FuzzJob) and job['job'].fuzzer_name == fuzzer_name)
+
+        def _sample_memory():
+            # Walking the process trees is expensive, sample them only
+            # periodically.
+            nonlocal memory_sampled
+            if self.memory_budget == float('inf') or time.time() - memory_sampled < self.memory_sample_interval:
+                return
+            memory_sampled = time.time()
+
+            for job in running_jobs.values():
+                if job.get('remote'):
+                    continue
+                pid = job['worker'].proc.pid if job.get('worker') else job['proc'].pid
+                rss = self.isolation.memory_usage(pid) if self.isolation else None
+                job['rss'] = rss if rss is not None else Controller.get_process_tree_rss(pid)
+                key = (type(job['job']), job['job'].sut_name)
+                memory_peaks[key] = max(memory_peaks.get(key, 0), job['rss'])
 
         def _update_load():
+            if pool:
+                pool.poll()
+            if coordinator:
+                # Jobs of disconnected workers are queued again.
+                for job_class, _, job_kwargs in coordinator.poll():
+                    _add_job(job_class, job_kwargs, False)
+
+            _sample_memory()
+
             current_load = 0
+            current_memory_load = 0
             for ident in list(running_jobs):
-                if not running_jobs[ident]['proc'].is_alive() or not psutil.pid_exists(running_jobs[ident]['proc'].pid):
+                if not _is_running(ident):
+                    if self.isolation and not running_jobs[ident].get('remote'):
+                        # A pool worker that survived its job keeps its
+                        # isolation unit for its next job.
+                        worker = running_jobs[ident].get('worker')
+                        if worker:
+                            self.isolation.release(worker.proc.pid, keep=worker.proc.is_alive())
+                        else:
+                            self.isolation.release(running_jobs[ident]['proc'].pid)
+                    if placement:
+                        placement.release(ident)
                     self.listener.remove_job(ident=ident)
                     del running_jobs[ident]
-                else:
+                elif not running_jobs[ident].get('remote'):
+                    # Remote jobs are accounted for by their workers.
                     current_load += running_jobs[ident]['job'].cost
+                    current_memory_load += max(running_jobs[ident]['job'].memory_cost, running_jobs[ident].get('rss', 0))
 
-            nonlocal load
+            nonlocal load, memory_load
+            memory_load = current_memory_load
             if load != current_load:
                 load = current_load
                 self.listener.update_load(load=load)
 
+        def _update_utilization():
+            nonlocal utilization
+            current_utilization = dict(load=load,
+                                       capacity=self.capacity,
+                                       memory_load=memory_load,
+                                       memory_budget=self.memory_budget,
+                                       queued_jobs=len(job_queue),
+                                       queued_cost=job_queue.cost,
+                                       backfilled=job_queue.backfilled,
+                                       duplicates=job_queue.duplicates)
+            if utilization != current_utilization:
+                utilization = current_utilization
+                self.listener.update_utilization(**utilization)
+
         def _poll_jobs():
-            with self._shared_lock:
-                while not self._shared_queue.empty():
-                    job_class, job_kwargs, priority = self._shared_queue.get_nowait()
-                    if job_class is not None:
-                        _add_job(job_class, job_kwargs, priority)
-                    else:
-                        _cancel_job(**job_kwargs)
+            for job_class, job_kwargs, priority in self._get_shared():
+                if job_class is not None:
+                    _add_job(job_class, job_kwargs, priority)
+                else:
+                    _cancel_job(**job_kwargs)
+
+        def _wait_events():
+            _update_utilization()
+
+            # Block until a running job terminates or a new item arrives on the
+            # shared queue.
+            sentinels = [self._wakeup_reader]
+            if coordinator:
+                sentinels.extend(coordinator.sentinels)
+            for job in running_jobs.values():
+                if job.get('worker'):
+                    sentinels.extend(job['worker'].sentinels)
+                elif job.get('proc'):
+                    sentinels.append(job['proc'].sentinel)
+            # With a memory budget, wake up periodically to sample the memory
+            # usage of the running jobs.
+            wait(sentinels, timeout=self.memory_sample_interval if self.memory_budget != float('inf') else None)
 
         def _add_job(job_class, job_kwargs, priority):
             nonlocal job_id
-            next_job = job_class(id=job_id,
-                                 config=self.config,
-                                 db=self.db,
-                                 listener=self.listener,
-                                 **job_kwargs)
+
+            # Validation and reduction of an issue are queued only once.
+            key = None
+            if job_class in (ValidateJob, ReduceJob) and '_id' in job_kwargs['issue']:
+                key = (job_class, job_kwargs['issue']['sut'], job_kwargs['issue']['_id'])
+                if job_queue.merge(key, priority):
+                    return
+
+            next_job = self._create_job(job_class, job_id, job_kwargs)
+            job_descriptors[job_id] = (job_class, job_id, job_kwargs)
             job_id += 1
 
             if priority:
                 next_job.cost = 0
+                next_job.memory_cost = 0
+            else:
+                # Learn from the observed memory usage but never exceed the
+                # budget, otherwise the job could never be started.
+                next_job.memory_cost = min(max(next_job.memory_cost, memory_peaks.get((job_class, next_job.sut_name), 0)), self.memory_budget)
 
             {
                 FuzzJob:
@@ -291,25 +560,63 @@ class Controller(object):
                                                      cost=next_job.cost,
                                                      sut=next_job.sut_name,
                                                      issue_id=next_job.issue['id'],
-                                                     size=len(str(next_job.issue['test']))),
+                                                     size=len(str(next_job.issue['test'])) if 'test' in next_job.issue else next_job.issue.get('test_size')),
                 UpdateJob:
                 lambda: self.listener.new_update_job(ident=next_job.id,
                                                      cost=next_job.cost,
                                                      sut=next_job.sut_name),
             }[job_class]()
 
-            job_queue.insert(0 if priority else len(job_queue), next_job)
+            job_queue.push(next_job, priority, key)
 
         def _cancel_job(ident):
             if ident in running_jobs:
-                Controller.kill_process_tree(running_jobs[ident]['proc'].pid)
+                remote = running_jobs[ident].get('remote')
+                if remote:
+                    remote.cancel(ident)
+                    return
+                worker = running_jobs[ident].get('worker')
+                # Killing a pool worker kills its job only, the pool replaces
+                # the worker on demand.
+                pid = worker.proc.pid if worker else running_jobs[ident]['proc'].pid
+                if self.isolation:
+                    self.isolation.kill(pid)
+                else:
+                    Controller.kill_process_tree(pid)
             else:
-                ident_idx = [job_idx for job_idx, job in enumerate(job_queue) if job.id == ident]
-                if ident_idx:
+                if job_queue.remove(ident):
                     self.listener.remove_job(ident=ident)
-                    del job_queue[ident_idx[0]]
+                    del job_descriptors[ident]
+
+        def _interrupt_jobs():
+            # Isolated jobs do not receive the keyboard interrupts of the
+            # terminal, forward them and let the jobs finish (e.g., flush
+            # their statistics) before they are killed.
+            procs = [job['worker'].proc if job.get('worker') else job['proc'] for job in running_jobs.values() if not job.get('remote')]
+            for proc in procs:
+                self.isolation.kill(proc.pid, signal.SIGINT)
+            deadline = time.time() + self.interrupt_timeout
+            for proc in procs:
+                proc.join(timeout=max(deadline - time.time(), 0))
+
+        def _pop_job():
+            next_job = job_queue.pop(self.capacity - load, self.memory_budget - memory_load)
+            if next_job or not coordinator:
+                return next_job, None
+            # Offload to remote workers if the local capacity is exhausted.
+            for remote in coordinator.workers:
+                next_job = job_queue.pop(remote.capacity - remote.load)
+                if next_job:
+                    return next_job, remote
+            return None, None
 
         try:
+            self.isolation = create_isolation(self.isolation_mode)
+            if pool:
+                pool.start()
+            if self.coordinator_address:
+                coordinator = Coordinator(self, self.coordinator_address, self.coordinator_authkey)
+
             while True:
                 # Update load and poll added jobs (if any).
                 _poll_jobs()
@@ -318,8 +625,8 @@ class Controller(object):
                 if fuzz_idx == 0:
                     cycle += 1
                 if cycle > max_cycles or (not self.fuzzers and max_cycles != float('inf')):
-                    while load > 0:
-                        time.sleep(1)
+                    while load > 0 or any(job.get('remote') for job in running_jobs.values()):
+                        _wait_events()
                         _poll_jobs()  # only to let running jobs cancelled; newly added jobs don't get scheduled
                         _update_load()
                     break
@@ -327,20 +634,38 @@ class Controller(object):
                 # Hunt for new issues only if there is no other work to do.
                 if not job_queue:
                     if not self.fuzzers:
-                        time.sleep(1)
+                        _wait_events()
                         continue
 
-                    # Determine fuzz job to be queued and then update fuzz_idx
-                    # to point to the next job's parameters.
-                    fuzzer_name = fuzz_names[fuzz_idx]
+                    if self.fuzz_selector:
+                        # Select fuzz job from those that have not reached
+                        # their limit on parallel instances. Fuzz_idx is
+                        # updated only to count the cycles.
+                        fuzz_idx = (fuzz_idx + 1) % len(self.fuzzers)
+                        candidates = [name for name in fuzz_names if not _instance_limit_reached(name)]
+                        if not candidates:
+                            _wait_events()
+                            continue
+                        fuzzer_name = self.fuzz_selector.select(candidates)
+                    else:
+                        # Determine fuzz job to be queued and then update
+                        # fuzz_idx to point to the next job's parameters.
+                        fuzzer_name = fuzz_names[fuzz_idx]
+                        fuzz_idx = (fuzz_idx + 1) % len(self.fuzzers)
+
+                        # Skip fuzz job if limit on parallel instances is
+                        # reached.
+                        if _instance_limit_reached(fuzzer_name):
+                            # If all fuzz jobs are at their limit, there is
+                            # nothing to do until a running job terminates or a
+                            # new job arrives.
+                            fuzz_skips += 1
+                            if fuzz_skips >= len(fuzz_names):
+                                fuzz_skips = 0
+                                _wait_events()
+                            continue
+                        fuzz_skips = 0
                     fuzz_section = 'fuzz.' + fuzzer_name
-                    fuzz_idx = (fuzz_idx + 1) % len(self.fuzzers)
-
-                    # Skip fuzz job if limit on parallel instances is reached.
-                    instances = self.config.get(fuzz_section, 'instances', fallback='inf')
-                    instances = float(instances) if instances == 'inf' else int(instances)
-                    if instances <= sum(1 for job in running_jobs.values() if isinstance(job['job'], FuzzJob) and job['job'].fuzzer_name == fuzzer_name):
-                        continue
 
                     # Before queueing a new fuzz job, check if we are working
                     # with the latest version of the SUT and queue an update if
@@ -354,104 +679,225 @@ class Controller(object):
 
                     self.add_fuzz_job(fuzzer_name)
 
-                    # Poll newly added job(s). Looping ensures that jobs will
-                    # eventually arrive.
-                    # (Unfortunately, multiprocessing.Queue.empty() is unreliable.)
-                    while not job_queue:
-                        _poll_jobs()
+                    # Poll newly added job(s).
+                    _poll_jobs()
 
                 # Perform next job as soon as there is enough capacity for it.
                 while True:
                     if not job_queue:
-                        next_job = None
+                        next_job, remote = None, None
                         break
-                    if load + job_queue[0].cost <= self.capacity:
-                        next_job = job_queue.pop(0)
+                    next_job, remote = _pop_job()
+                    if next_job:
                         break
-                    time.sleep(1)
+                    _wait_events()
                     _poll_jobs()
                     _update_load()
                 if not next_job:
                     continue
 
-                proc = Process(target=self._run_job, args=(next_job,))
-                running_jobs[next_job.id] = dict(job=next_job, proc=proc)
-                self.listener.activate_job(ident=next_job.id)
-                proc.start()
+                descriptor = job_descriptors.pop(next_job.id)
+                # Remote jobs are placed by their workers.
+                placed = placement.acquire(next_job.id, next_job.cost) if placement and not remote else None
+                cpus = placed[0] if placed else None
+                if remote:
+                    self.listener.activate_job(ident=next_job.id)
+                    running_jobs[next_job.id] = dict(job=next_job, remote=remote)
+                    remote.submit(descriptor, next_job.cost)
+                elif pool:
+                    self.listener.activate_job(ident=next_job.id)
+                    # Pool workers are reused, so unpinned jobs have to reset
+                    # the affinity of their worker.
+                    if placement and not cpus:
+                        cpus = placement.cpus
+                    running_jobs[next_job.id] = dict(job=next_job, worker=pool.submit(descriptor + (cpus,)))
+                else:
+                    proc = Process(target=self._run_job, args=(next_job, cpus))
+                    running_jobs[next_job.id] = dict(job=next_job, proc=proc)
+                    self.listener.activate_job(ident=next_job.id)
+                    proc.start()
+                if placed:
+                    self.listener.job_placement(ident=next_job.id, cpus=placed[0], nodes=placed[1])
+                _update_utilization()
 
         except KeyboardInterrupt:
-            pass
+            if self.isolation:
+                _interrupt_jobs()
         except Exception as e:
             self.listener.warning(ident=None, msg='Exception in the main controller loop: {exception}\n{trace}'.format(exception=e, trace=traceback.format_exc()))
         finally:
+            if pool:
+                pool.close()
+            if coordinator:
+                coordinator.close()
+            if self.isolation:
+                self.isolation.close()
             Controller.kill_process_tree(os.getpid(), kill_root=False)
             if os.path.exists(self.work_dir):
                 shutil.rmtree(self.work_dir, ignore_errors=True)
 
-    def _run_job(self, job):
+    def _create_job(self, job_class, ident, job_kwargs):
+        return job_class(id=ident,
+                         config=self.config,
+                         db=self.db,
+                         listener=self.listener,
+                         **job_kwargs)
+
+    def _run_pooled_job(self, job_class, ident, job_kwargs, cpus=None):
+        self._run_job(self._create_job(job_class, ident, job_kwargs), cpus)
+
+    def _run_job(self, job, cpus=None):
+        if self.isolation:
+            self.isolation.enter()
+        if cpus:
+            os.sched_setaffinity(0, cpus)
+        Controller.execute_job(job, self)
+
+    @staticmethod
+    def execute_job(job, controller):
+        """
+        Execute a job and queue the reduction or validation of the issues
+        found by it.
+
+        :param job: the job to execute.
+        :param controller: the controller to queue new jobs with (either a
+            :class:`Controller` or a :class:`fuzzinator.remote.RemoteController`).
+        """
         try:
             for issue in job.run():
                 # Automatic reduction and/or validation if the job found something new
-                if not self.add_reduce_job(issue=issue):
-                    self.add_validate_job(issue=issue)
+                if not controller.add_reduce_job(issue=issue):
+                    controller.add_validate_job(issue=issue)
         except Exception as e:
-            self.listener.warning(ident=job.id, msg='Exception in {job}: {exception}\n{trace}'.format(
+            controller.listener.warning(ident=job.id, msg='Exception in {job}: {exception}\n{trace}'.format(
                 job=repr(job),
                 exception=e,
                 trace=traceback.format_exc()))
+        finally:
+            # Deliver the latest progress of the job before it is removed. A
+            # failing delivery (e.g., a broken remote session) must not mask
+            # the exception of the job (if any).
+            try:
+                controller.listener.flush()
+            except Exception as e:
+                logger.warning('Failed to flush the events of job %s.', job.id, exc_info=e)
+
+    def _get_shared(self):
+        """
+        Receive the items announced on the shared queue.
+
+        Items that are announced but do not arrive in time (e.g., because
+        their sender is slow to flush the queue, or it has died) are not
+        waited for again, but they are received by later calls if they arrive
+        eventually.
+        """
+        with self._shared_lock:
+            pending = self._shared_pending.value
+            if pending:
+                self._wakeup_reader.recv_bytes()
+                self._shared_pending.value = 0
+
+        items = []
+        try:
+            while len(items) < pending:
+                items.append(self._shared_queue.get(timeout=self.shared_queue_timeout))
+        except queue.Empty:
+            self._shared_undelivered += pending - len(items)
+            return items
+
+        # Items that were late previously (if they have arrived since).
+        try:
+            while self._shared_undelivered:
+                items.append(self._shared_queue.get_nowait())
+                self._shared_undelivered -= 1
+        except queue.Empty:
+            pass
+        return items
+
+    def _put_shared(self, item):
+        with self._shared_lock:
+            self._shared_queue.put(item)
+            self._shared_pending.value += 1
+            if self._shared_pending.value == 1:
+                self._wakeup_writer.send_bytes(b'\0')
 
     def add_fuzz_job(self, fuzzer_name, priority=False):
         # Added for the sake of completeness and consistency.
         # Should not be used by UI to add fuzz jobs.
-        with self._shared_lock:
-            self._shared_queue.put((FuzzJob, dict(fuzzer_name=fuzzer_name, subconfig_id=self.fuzzers[fuzzer_name]['subconfig']), priority))
+        self._put_shared((FuzzJob, dict(fuzzer_name=fuzzer_name, subconfig_id=self.fuzzers[fuzzer_name]['subconfig']), priority))
         return True
 
     def add_validate_job(self, issue, priority=False):
         if not self.config.has_section('sut.' + issue['sut']):
             return False
 
-        with self._shared_lock:
-            self._shared_queue.put((ValidateJob, dict(issue=issue), priority))
+        self._put_shared((ValidateJob, dict(issue=issue), priority))
         return True
 
     def add_reduce_job(self, issue, priority=False):
         if not self.config.has_option('sut.' + issue['sut'], 'reduce'):
             return False
 
-        with self._shared_lock:
-            self._shared_queue.put((ReduceJob, dict(issue=issue), priority))
+        self._put_shared((ReduceJob, dict(issue=issue), priority))
         return True
 
     def add_update_job(self, sut_name, priority=False):
         if not self.config.has_option('sut.' + sut_name, 'update'):
             return False
 
-        with self._shared_lock:
-            self._shared_queue.put((UpdateJob, dict(sut_name=sut_name), priority))
+        self._put_shared((UpdateJob, dict(sut_name=sut_name), priority))
 
         if self.config.get('sut.' + sut_name, 'validate_after_update', fallback=self.validate_after_update) in [1, '1', True, 'True', 'true']:
             self.validate_all(sut_name)
 
         return True
 
+    # Fields of issues needed to queue validate and reduce jobs. The rest of
+    # the fields (including the test case and the potentially large outputs
+    # of the SUT) are fetched by the jobs when they are started.
+    _issue_projection = {'_id': 1, 'id': 1, 'sut': 1, 'fuzzer': 1, 'subconfig': 1}
+
     def validate_all(self, sut_name=None):
-        sut_name = [sut_name] if sut_name else [section for section in self.config.sections() if section.startswith('sut.') and section.count('.') == 1]
-        for issue in self.db.find_issues_by_suts(sut_name):
-            if not issue.get('invalid'):
-                self.add_validate_job(issue)
+        sut_name = [sut_name] if sut_name else [section.split('.', maxsplit=1)[1] for section in self.config.sections() if section.startswith('sut.') and section.count('.') == 1]
+        for issue in self.db.find_issues_by_suts(sut_name,
+                                                 filter={'invalid': {'$exists': False}},
+                                                 projection=self._issue_projection):
+            self.add_validate_job(issue)
 
     def reduce_all(self, sut_name=None):
-        sut_name = [sut_name] if sut_name else [section for section in self.config.sections() if section.startswith('sut.') and section.count('.') == 1]
-        for issue in self.db.find_issues_by_suts(sut_name):
-            if not issue.get('reported') and not issue.get('reduced'):
-                self.add_reduce_job(issue)
+        sut_name = [sut_name] if sut_name else [section.split('.', maxsplit=1)[1] for section in self.config.sections() if section.startswith('sut.') and section.count('.') == 1]
+        # The size of the test case is needed by the listeners (but the
+        # test case itself is not kept in the queue).
+        for issue in self.db.find_issues_by_suts(sut_name,
+                                                 filter={'reported': {'$in': [None, False, '']}, 'reduced': {'$in': [None, False, '']}},
+                                                 projection=dict(self._issue_projection, test=1)):
+            test = issue.pop('test', None)
+            if test is not None:
+                issue['test_size'] = len(test)
+            self.add_reduce_job(issue)
 
     def cancel_job(self, ident):
-        with self._shared_lock:
-            self._shared_queue.put((None, dict(ident=ident), None))
+        self._put_shared((None, dict(ident=ident), None))
         return True
 
+    @staticmethod
+    def get_process_tree_rss(pid):
+        """
+        Return the total resident set size of a process and all its
+        descendants (in bytes).
+        """
+        rss = 0
+        try:
+            root_proc = psutil.Process(pid)
+            for proc in [root_proc] + root_proc.children(recursive=True):
+                try:
+                    rss += proc.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+        except psutil.NoSuchProcess:
+            pass
+        return rss
+
     @staticmethod
     def kill_process_tree(pid, kill_root=True, sig=signal.SIGTERM):
         try:
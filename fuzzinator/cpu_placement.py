@@ -0,0 +1,103 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import os
+import re
+
+
+class CpuPlacement(object):
+    """
+    Bookkeeping of the CPUs dedicated to running jobs. A job of cost *N* gets
+    *N* CPUs (out of those the controller is allowed to run on), preferably
+    from a single NUMA node, so that the job and the SUT processes it starts
+    (which inherit the CPU affinity of the job) share the caches and the local
+    memory of the node. Jobs without cost (e.g., priority jobs) and jobs that
+    do not fit into the free CPUs are not pinned.
+    """
+
+    def __init__(self, cpus=None, nodes=None):
+        """
+        :param cpus: CPUs to assign to jobs (defaults to the CPU affinity of
+            the current process).
+        :param dict nodes: mapping of NUMA node identifiers to sets of CPUs
+            (defaults to the topology of the system).
+        """
+        self.cpus = sorted(cpus if cpus is not None else os.sched_getaffinity(0))
+        nodes = nodes if nodes is not None else self.numa_nodes()
+        self._node_of = {cpu: node for node, node_cpus in nodes.items() for cpu in node_cpus}
+        self._free = set(self.cpus)
+        self._assigned = dict()
+
+    @staticmethod
+    def numa_nodes():
+        """
+        Read the NUMA topology of the system from sysfs.
+
+        :return: mapping of NUMA node identifiers to sets of CPUs (empty if
+            the topology is not available).
+        """
+        nodes = dict()
+        node_dir = '/sys/devices/system/node'
+        try:
+            entries = os.listdir(node_dir)
+        except OSError:
+            return nodes
+
+        for entry in entries:
+            match = re.fullmatch(r'node(\d+)', entry)
+            if not match:
+                continue
+            cpus = set()
+            with open(os.path.join(node_dir, entry, 'cpulist')) as f:
+                for cpu_range in f.read().strip().split(','):
+                    if cpu_range:
+                        first, _, last = cpu_range.partition('-')
+                        cpus.update(range(int(first), int(last or first) + 1))
+            nodes[int(match.group(1))] = cpus
+        return nodes
+
+    def acquire(self, ident, cost):
+        """
+        Dedicate CPUs to a job.
+
+        :param int ident: unique identifier of the job.
+        :param int cost: cost of the job, i.e., the number of CPUs to dedicate.
+        :return: tuple of the sorted lists of the dedicated CPUs and their NUMA
+            nodes, or ``None`` if the job is not pinned.
+        """
+        if cost <= 0 or cost > len(self._free):
+            return None
+
+        free_by_node = dict()
+        for cpu in self._free:
+            free_by_node.setdefault(self._node_of.get(cpu), []).append(cpu)
+
+        # Best fit: the node with the least free CPUs that can still host the
+        # whole job. Otherwise, spread the job over the least number of nodes.
+        fitting = [node for node, cpus in free_by_node.items() if len(cpus) >= cost]
+        if fitting:
+            node = min(fitting, key=lambda node: len(free_by_node[node]))
+            cpus = sorted(free_by_node[node])[:cost]
+        else:
+            cpus = []
+            for node in sorted(free_by_node, key=lambda node: len(free_by_node[node]), reverse=True):
+                cpus.extend(sorted(free_by_node[node])[:cost - len(cpus)])
+                if len(cpus) == cost:
+                    break
+            cpus.sort()
+
+        self._free.difference_update(cpus)
+        self._assigned[ident] = cpus
+        return cpus, sorted({self._node_of[cpu] for cpu in cpus if cpu in self._node_of})
+
+    def release(self, ident):
+        """
+        Release the CPUs dedicated to a job (if any).
+
+        :param int ident: unique identifier of the job.
+        """
+        self._free.update(self._assigned.pop(ident, []))
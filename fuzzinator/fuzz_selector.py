@@ -0,0 +1,83 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import logging
+import random
+import time
+
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class ThompsonSamplingSelector(object):
+    """
+    Adaptive selector of fuzz jobs. The selector treats the fuzz jobs as arms
+    of a multi-armed bandit, where the reward of executing a test is finding a
+    new unique issue. The yield of every fuzz job is modelled with a beta
+    distribution based on the ``exec`` and ``unique`` counters of its
+    subconfig in the current session (as aggregated by
+    :meth:`fuzzinator.mongo_driver.MongoDriver.get_stats`), and the fuzz job
+    with the highest sampled yield is selected.
+
+    To keep exploring, a uniformly random fuzz job is selected with
+    ``exploration`` probability.
+    """
+
+    refresh_interval = 10
+
+    def __init__(self, db, fuzzers, exploration=0.1, session_start=None, session_baseline=None):
+        """
+        :param fuzzinator.mongo_driver.MongoDriver db: the database to read the
+            statistics from.
+        :param dict fuzzers: description of the fuzz jobs (as returned by
+            :func:`fuzzinator.config.config_get_fuzzers`).
+        :param float exploration: probability of selecting a fuzz job
+            uniformly randomly (between 0 and 1).
+        :param float session_start: timestamp of the start of the session.
+        :param list session_baseline: statistics at the start of the session.
+        """
+        self.db = db
+        self.fuzzers = fuzzers
+        self.exploration = exploration
+        self.session_start = datetime.utcfromtimestamp(session_start) if session_start else None
+        self.session_baseline = session_baseline
+        self._stats = dict()
+        self._refreshed = None
+
+    def _refresh(self):
+        now = time.time()
+        if self._refreshed is not None and now - self._refreshed < self.refresh_interval:
+            return
+
+        self._stats = dict()
+        for stat in self.db.get_stats(session_start=self.session_start, session_baseline=self.session_baseline):
+            for subconfig in stat['subconfigs']:
+                self._stats[(stat['fuzzer'], subconfig['subconfig'])] = (max(subconfig['exec'], 0), max(subconfig['unique'], 0))
+        self._refreshed = now
+
+    def select(self, candidates):
+        """
+        Select a fuzz job from the candidates.
+
+        :param list candidates: names of the fuzz jobs to select from.
+        :return: the name of the selected fuzz job.
+        """
+        if random.random() < self.exploration:
+            selected = random.choice(candidates)
+            logger.debug('Selected fuzz job %s for exploration.', selected)
+            return selected
+
+        self._refresh()
+        samples = dict()
+        for name in candidates:
+            executed, unique = self._stats.get((name, self.fuzzers[name]['subconfig']), (0, 0))
+            samples[name] = random.betavariate(1 + unique, 1 + max(executed - unique, 0))
+
+        selected = max(candidates, key=lambda name: samples[name])
+        logger.debug('Selected fuzz job %s (sampled yield: %s).', selected, ', '.join('{name}={sample:.3g}'.format(name=name, sample=samples[name]) for name in candidates))
+        return selected
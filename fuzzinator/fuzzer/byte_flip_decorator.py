@@ -49,22 +49,41 @@ class ByteFlipDecorator(CallableDecorator):
             max_byte=255
     """
 
-    def decorator(self, frequency, min_byte='32', max_byte='126', **kwargs):
+    @staticmethod
+    def _flipper(frequency, min_byte='32', max_byte='126', **kwargs):
         frequency = int(frequency)
         min_byte = int(min_byte)
         max_byte = int(max_byte)
 
+        def flip(test):
+            test = bytearray(test)
+            for pos in random.sample(range(len(test)), math.ceil(len(test) / frequency)):
+                test[pos] = random.randint(min_byte, max_byte)
+
+            return bytes(test)
+
+        return flip
+
+    def decorator(self, **kwargs):
+        flip = self._flipper(**kwargs)
+
         def wrapper(fn):
             def filter(*args, **kwargs):
                 test = fn(*args, **kwargs)
                 if test is None:
                     return None
 
-                test = bytearray(test)
-                for pos in random.sample(range(len(test)), math.ceil(len(test) / frequency)):
-                    test[pos] = random.randint(min_byte, max_byte)
+                return flip(test)
+
+            return filter
+        return wrapper
+
+    def batch_decorator(self, batch_name, **kwargs):
+        flip = self._flipper(**kwargs)
 
-                return bytes(test)
+        def wrapper(fn):
+            def filter(*args, **kwargs):
+                return [flip(test) for test in fn(*args, **kwargs)]
 
             return filter
         return wrapper
@@ -38,5 +38,21 @@ def RandomContent(*, min_length='1', max_length='1', **kwargs):
             max_length=1000
     """
 
-    return ''.join(random.SystemRandom().choice(string.ascii_uppercase + string.digits)
-                   for _ in range(random.randint(int(min_length), int(max_length)))).encode('utf-8', errors='ignore')
+    return _generate(random.SystemRandom(), int(min_length), int(max_length))
+
+
+def _generate(rnd, min_length, max_length):
+    return ''.join(rnd.choices(_alphabet, k=rnd.randint(min_length, max_length))).encode('utf-8', errors='ignore')
+
+
+def _generate_batch(*, index, n, min_length='1', max_length='1', **kwargs):
+    rnd = random.SystemRandom()
+    min_length = int(min_length)
+    max_length = int(max_length)
+    return [_generate(rnd, min_length, max_length) for _ in range(n)]
+
+
+_alphabet = string.ascii_uppercase + string.digits
+
+# Batch protocol of the fuzzer, see fuzzinator.job.FuzzJob.
+RandomContent.generate_batch = _generate_batch
@@ -102,7 +102,14 @@ class SubprocessRunner(object):
         if not self.tests:
             return None
 
-        test = self.tests.pop()
+        return self._read(self.tests.pop())
+
+    def generate_batch(self, *, n, **kwargs):
+        tests = self.tests[:-n - 1:-1] if n > 0 else []
+        del self.tests[len(self.tests) - len(tests):]
+        return [self._read(test) for test in tests]
+
+    def _read(self, test):
         if not self.contents:
             return test
 
@@ -64,6 +64,8 @@ class TornadoDecorator(object):
 
         class Inherited(ancestor):
             decorator = self
+            # Tests must go through __call__ (disable the batch protocol of the ancestor).
+            generate_batch = None
 
             def __init__(self, *args, **kwargs):
                 if hasattr(ancestor, '__init__'):
@@ -72,6 +74,9 @@ class TornadoDecorator(object):
                 self.test = None
                 self.fuzzer_kwargs = dict()
                 self.ioloop = None
+                # The port search starts from the configured port for every
+                # instance (the decorator may be shared).
+                self.port = self.decorator.port
 
             def __call__(self, **kwargs):
                 # Saving fuzzer args to make them available from the RequestHandlers
@@ -80,7 +85,7 @@ class TornadoDecorator(object):
                     return None
 
                 self.fuzzer_kwargs = kwargs
-                return 'http://localhost:{port}?index={index}'.format(port=self.decorator.port, index=self.index)
+                return 'http://localhost:{port}?index={index}'.format(port=self.port, index=self.index)
 
             def __enter__(self, *args, **kwargs):
                 if hasattr(ancestor, '__enter__'):
@@ -93,10 +98,10 @@ class TornadoDecorator(object):
 
                 while True:
                     try:
-                        server = app.listen(self.decorator.port)
+                        server = app.listen(self.port)
                         break
                     except OSError:
-                        self.decorator.port += 1
+                        self.port += 1
 
                 def ioloop_thread():
                     self.ioloop = IOLoop.current()
@@ -0,0 +1,278 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import logging
+import os
+import signal
+import time
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+isolation_modes = ['none', 'process_group', 'cgroup']
+
+
+class ProcessGroupIsolation(object):
+    """
+    Isolates every job process (together with all the processes it starts) in
+    its own process group, so that the whole job can be signalled with a
+    single ``killpg`` call. The process group is identified by the pid of the
+    job process.
+
+    Processes that start a new session (e.g., daemonizing SUTs) escape the
+    process group, use :class:`CgroupIsolation` to catch those, too.
+    """
+
+    def enter(self):
+        """
+        Put the calling (job) process into its own isolation unit. Must be
+        called in the job process before it starts any other processes.
+        """
+        os.setpgid(0, 0)
+
+    def kill(self, pid, sig=signal.SIGTERM):
+        """
+        Signal all processes of the isolation unit of the job process ``pid``.
+        """
+        try:
+            os.killpg(pid, sig)
+        except OSError:
+            pass
+
+    def release(self, pid, keep=False):
+        """
+        Kill the processes left behind in the isolation unit of the terminated
+        job process ``pid``.
+
+        :param bool keep: whether to spare the process ``pid`` itself (e.g., a
+            pool worker whose job has finished) and keep its isolation unit
+            for its next job. In this case, only the descendants of ``pid``
+            are killed (processes of the group that have been orphaned are
+            not found, use :class:`CgroupIsolation` to catch those, too).
+        """
+        if not keep:
+            self.kill(pid, signal.SIGKILL)
+            return
+
+        try:
+            children = psutil.Process(pid).children(recursive=True)
+        except psutil.NoSuchProcess:
+            return
+        for proc in children:
+            try:
+                proc.send_signal(signal.SIGKILL)
+            except psutil.NoSuchProcess:
+                pass
+
+    def is_alive(self, pid):
+        """
+        Return whether the isolation unit of the job process ``pid`` has any
+        processes.
+        """
+        try:
+            os.killpg(pid, 0)
+            return True
+        except PermissionError:
+            return True
+        except OSError:
+            return False
+
+    def memory_usage(self, pid):
+        """
+        Return the memory usage of the isolation unit of the job process
+        ``pid`` (in bytes), or ``None`` if it is not accounted for by the
+        isolation.
+        """
+        return None
+
+    def close(self):
+        pass
+
+
+class CgroupIsolation(ProcessGroupIsolation):
+    """
+    Isolates every job process (together with all the processes it starts,
+    even the daemonizing ones) in its own cgroup v2 subtree below ``root``,
+    so that the whole job can be killed with a single write to its
+    ``cgroup.kill`` file. Job processes are put into their own process
+    groups as well, which is used as a fallback if the kernel does not
+    support ``cgroup.kill`` (before Linux 5.14).
+    """
+
+    def __init__(self, root):
+        """
+        :param str root: path of a writable cgroup v2 directory (will be
+            created if it does not exist).
+        """
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+        # Cgroups of released jobs that still had processes to exit.
+        self._released = set()
+
+    @staticmethod
+    def default_root():
+        """
+        Return the path of a cgroup below the cgroup of the current process,
+        or ``None`` if no cgroup v2 hierarchy is mounted.
+        """
+        mount_point = None
+        with open('/proc/self/mountinfo') as f:
+            for line in f:
+                fields = line.split()
+                if fields[fields.index('-') + 1] == 'cgroup2':
+                    mount_point = fields[4]
+                    break
+        if not mount_point:
+            return None
+
+        with open('/proc/self/cgroup') as f:
+            for line in f:
+                hierarchy, _, path = line.rstrip('\n').split(':', maxsplit=2)
+                if hierarchy == '0':
+                    return os.path.join(mount_point, path.lstrip('/'), 'fuzzinator-{pid}'.format(pid=os.getpid()))
+        return None
+
+    def _cgroup(self, pid):
+        return os.path.join(self.root, str(pid))
+
+    def _read(self, pid, name):
+        with open(os.path.join(self._cgroup(pid), name)) as f:
+            return f.read()
+
+    def enter(self):
+        super().enter()
+        cgroup = self._cgroup(os.getpid())
+        # If the pid is reused, the cgroup of its previous job may be removed
+        # by the controller concurrently, so retry with a new cgroup.
+        for _ in range(3):
+            try:
+                os.makedirs(cgroup, exist_ok=True)
+                with open(os.path.join(cgroup, 'cgroup.procs'), 'w') as f:
+                    f.write(str(os.getpid()))
+                return
+            except FileNotFoundError as e:
+                error = e
+            except OSError as e:
+                error = e
+                break
+        logger.warning('Failed to move process %d to cgroup %s: %s', os.getpid(), cgroup, error)
+
+    def kill(self, pid, sig=signal.SIGTERM):
+        cgroup = self._cgroup(pid)
+        if sig == signal.SIGKILL and os.path.exists(os.path.join(cgroup, 'cgroup.kill')):
+            try:
+                with open(os.path.join(cgroup, 'cgroup.kill'), 'w') as f:
+                    f.write('1')
+                return
+            except OSError:
+                pass
+
+        pids = self._procs(pid)
+        if not pids:
+            super().kill(pid, sig)
+        for proc in pids:
+            try:
+                os.kill(proc, sig)
+            except OSError:
+                pass
+
+    def _procs(self, pid):
+        try:
+            return [int(line) for line in self._read(pid, 'cgroup.procs').split()]
+        except OSError:
+            return []
+
+    def release(self, pid, keep=False):
+        if keep:
+            for proc in self._procs(pid):
+                if proc != pid:
+                    try:
+                        os.kill(proc, signal.SIGKILL)
+                    except OSError:
+                        pass
+            return
+
+        self.kill(pid, signal.SIGKILL)
+        self._released.add(pid)
+        self._cleanup()
+
+    def _cleanup(self):
+        # Cgroups can only be removed once all their processes are gone, which
+        # may take a while after killing them. Retry at every release, but
+        # only for the cgroups of released jobs, since the others may just be
+        # being created by their jobs.
+        for pid in list(self._released):
+            try:
+                os.rmdir(self._cgroup(pid))
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            self._released.discard(pid)
+
+    def is_alive(self, pid):
+        try:
+            for line in self._read(pid, 'cgroup.events').splitlines():
+                key, value = line.split()
+                if key == 'populated':
+                    return value == '1'
+        except (OSError, ValueError):
+            pass
+        # The process may have failed to enter its cgroup.
+        return super().is_alive(pid)
+
+    def memory_usage(self, pid):
+        # Available only if the memory controller is enabled for the cgroup.
+        try:
+            return int(self._read(pid, 'memory.current'))
+        except (OSError, ValueError):
+            return None
+
+    def close(self):
+        for entry in os.listdir(self.root):
+            if entry.isdigit():
+                self.kill(int(entry), signal.SIGKILL)
+                self._released.add(int(entry))
+
+        # Give the killed processes some time to terminate.
+        deadline = time.time() + 1
+        while True:
+            self._cleanup()
+            try:
+                os.rmdir(self.root)
+                break
+            except OSError:
+                if time.time() > deadline:
+                    logger.warning('Failed to remove cgroup %s.', self.root)
+                    break
+                time.sleep(0.05)
+
+
+def create_isolation(mode):
+    """
+    Create the isolation layer of the jobs.
+
+    :param str mode: ``none``, ``process_group``, or ``cgroup`` (which falls
+        back to ``process_group`` if no writable cgroup v2 hierarchy is
+        available).
+    :return: the isolation layer or ``None`` if jobs are not isolated.
+    """
+    if mode == 'none':
+        return None
+    if mode == 'cgroup':
+        try:
+            root = CgroupIsolation.default_root()
+            if root:
+                return CgroupIsolation(root)
+            logger.warning('No cgroup v2 hierarchy is mounted, falling back to process group isolation.')
+        except OSError as e:
+            logger.warning('Cgroup isolation is not available (%s), falling back to process group isolation.', e)
+        return ProcessGroupIsolation()
+    if mode == 'process_group':
+        return ProcessGroupIsolation()
+    raise ValueError('Unknown isolation mode: {mode}'.format(mode=mode))
@@ -0,0 +1,123 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import logging
+import os
+import subprocess
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ..spawner import popen
+
+logger = logging.getLogger(__name__)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class BacktraceSymbolizer(object):
+    """
+    Background worker of a job that symbolizes the core dumps of its new
+    issues (see :class:`fuzzinator.call.CoreDumpBacktraceDecorator`). The
+    debugger runs in a background thread, while the results are stored in the
+    database (and announced to the listeners) by the thread of the job, when
+    it calls :meth:`collect` or :meth:`close`.
+    """
+
+    def __init__(self, db, listener, ident):
+        """
+        :param db: the database driver to update the issues with.
+        :param listener: the listener to announce the updated issues to.
+        :param ident: the identifier of the job.
+        """
+        self._db = db
+        self._listener = listener
+        self._ident = ident
+        self._executor = None
+        self._pending = []
+
+    def submit(self, issue, core_dump):
+        """
+        Start symbolizing the core dump of a new issue.
+
+        :param dict issue: the issue (already stored in the database).
+        :param dict core_dump: the ``'core_dump'`` property of the issue.
+        """
+        # Claim the core dump, so that the decorator does not remove it.
+        path = core_dump['path'] + '.symbolizing'
+        try:
+            os.rename(core_dump['path'], path)
+        except OSError:
+            return
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending.append((issue, self._executor.submit(self._symbolize, dict(core_dump, path=path))))
+
+    @staticmethod
+    def discard(core_dump):
+        """
+        Remove the core dump of a known issue.
+        """
+        _remove(core_dump['path'])
+
+    @staticmethod
+    def _symbolize(core_dump):
+        timeout = int(core_dump['timeout']) if core_dump.get('timeout') else None
+        try:
+            proc = popen([arg.format(core=core_dump['path']) for arg in core_dump['command']],
+                         cwd=core_dump['cwd'],
+                         env=core_dump['env'],
+                         stdin=subprocess.DEVNULL,
+                         stdout=subprocess.PIPE,
+                         stderr=subprocess.STDOUT)
+            try:
+                return proc.communicate(timeout=timeout)[0]
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                logger.debug('Timeout expired while symbolizing %s.', core_dump['path'])
+                return None
+        finally:
+            _remove(core_dump['path'])
+
+    def collect(self, wait=False):
+        """
+        Store the backtraces of the core dumps that have been symbolized.
+
+        :param bool wait: whether to wait for all pending core dumps.
+        """
+        pending = []
+        for issue, future in self._pending:
+            if not wait and not future.done():
+                pending.append((issue, future))
+                continue
+
+            try:
+                backtrace = future.result()
+            except Exception as e:
+                logger.debug('Symbolizing the core dump of %s failed.', issue['id'], exc_info=e)
+                continue
+
+            if backtrace:
+                issue['backtrace'] = backtrace
+                self._db.update_issue_by_oid(issue['_id'], {'backtrace': backtrace})
+                self._listener.update_issue(ident=self._ident, issue=issue)
+        self._pending = pending
+
+    def close(self):
+        """
+        Wait for the pending core dumps and stop the background thread.
+        """
+        self.collect(wait=True)
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -7,6 +7,8 @@
 
 import hashlib
 
+from .backtrace_symbolizer import BacktraceSymbolizer
+
 
 class CallJob(object):
     """
@@ -21,9 +23,20 @@ class CallJob(object):
         self.fuzzer_name = fuzzer_name
         self.db = db
         self.listener = listener
+        self.symbolizer = BacktraceSymbolizer(db, listener, id)
 
     def add_issue(self, issue, new_issues):
+        # Imported here, as fuzzinator.call depends on the controller, which
+        # depends on the jobs.
+        from ..call.output_capture import CapturePolicy, spill_properties
+
         test = issue['test']
+        # Core dumps are not stored, only the backtraces of new issues.
+        core_dump = issue.pop('core_dump', None)
+        # The files of the issue have to be noted before it is saved, since
+        # the properties of a known issue are overwritten by those stored in
+        # the database (including the paths of its files).
+        files = {name: issue[name] for name in spill_properties if issue.get(name)}
 
         # Save issue details.
         issue.update(dict(sut=self.sut_name,
@@ -43,5 +56,13 @@ class CallJob(object):
         if self.db.add_issue(issue):
             new_issues.append(issue)
             self.listener.new_issue(ident=self.id, issue=issue)
+            if core_dump:
+                self.symbolizer.submit(issue, core_dump)
         else:
+            # The outputs and the core dump of a known issue are not needed.
+            CapturePolicy.discard(files)
+            if core_dump:
+                self.symbolizer.discard(core_dump)
             self.listener.update_issue(ident=self.id, issue=issue)
+
+        self.symbolizer.collect()
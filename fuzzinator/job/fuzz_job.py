@@ -5,15 +5,63 @@
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
+import asyncio
+import math
 import signal
 
-from ..config import config_get_callable
+from collections import deque
+from contextlib import ExitStack
+
+from ..config import config_get_callable, parse_size
+from ..stats_buffer import StatsBuffer
 from .call_job import CallJob
+from .fuzzer_prefetcher import FuzzerPrefetcher
 
 
 class FuzzJob(CallJob):
     """
     Class for running fuzzer jobs.
+
+    The SUT call is resolved and its context is entered only once per job. If
+    the call has an ``alive`` attribute and it becomes false after an issue
+    (i.e., the process of the SUT died), the context of the call is re-entered
+    to restart the SUT. The number of restarts is counted in ``sut_restarts``
+    and signalled to the listeners (see
+    :meth:`fuzzinator.listener.EventListener.restart_sut`).
+
+    If the fuzzer implements the batch protocol, i.e., it has a
+    ``generate_batch(index, n, **kwargs)`` callable that returns a list of at
+    most ``n`` tests (a shorter list signals that the fuzzer is exhausted),
+    tests are requested in chunks of ``fuzzer_batch`` (100 by default) instead
+    of one call per test. Similarly, if the SUT call implements the batch
+    protocol, i.e., it has a ``call_batch(tests, **kwargs)`` callable that
+    returns the list of the issues of the tests (see
+    :class:`fuzzinator.call.BatchSubprocessCall`), tests are passed to the SUT
+    in chunks of ``sut_batch``. Batching the SUT calls is opt-in, since it
+    changes the granularity of progress and issue reporting (``sut_batch`` is
+    1 by default, i.e., tests are passed to the SUT one by one). Fuzzers that
+    maintain their own ``index`` or ``test``, or expect ``feedback``, are
+    always called in lockstep with the SUT, test by test.
+
+    If the SUT call has an ``async_call`` coroutine function (e.g.,
+    :func:`fuzzinator.call.SubprocessCall` and
+    :func:`fuzzinator.call.StdinSubprocessCall`) and ``async_window`` is
+    greater than 1, up to ``async_window`` tests (but not more than the cost
+    of the job) are run concurrently in an asyncio event loop. The results
+    are still processed (i.e., issues are reported, progress is updated) in
+    the order of the tests.
+
+    If ``prefetch`` is greater than 0, the fuzzer runs in a background thread
+    and keeps up to ``prefetch`` tests ready while the SUT is running (see
+    :class:`fuzzinator.job.fuzzer_prefetcher.FuzzerPrefetcher`). Fuzzers that
+    have their own ``test`` or expect ``feedback`` are not prefetched.
+
+    The statistics of the job are not written to the database at every
+    ``refresh`` but they are buffered (see
+    :class:`fuzzinator.stats_buffer.StatsBuffer`) and written at most every
+    ``stats_flush_interval`` seconds (1 by default) or after every
+    ``stats_flush_count`` tests (unlimited by default), and when the job
+    finishes (or it is interrupted).
     """
 
     def __init__(self, id, config, subconfig_id, fuzzer_name, db, listener):
@@ -22,8 +70,16 @@ class FuzzJob(CallJob):
         super().__init__(id, config, subconfig_id, sut_name, fuzzer_name, db, listener)
 
         self.cost = int(config.get('sut.' + sut_name, 'cost', fallback=1))
+        self.memory_cost = parse_size(config.get('sut.' + sut_name, 'memory_cost', fallback=0))
         self.batch = float(config.get(fuzz_section, 'batch', fallback=1))
         self.refresh = float(config.get(fuzz_section, 'refresh', fallback=self.batch))
+        self.fuzzer_batch = int(config.get(fuzz_section, 'fuzzer_batch', fallback=100))
+        self.sut_batch = int(config.get(fuzz_section, 'sut_batch', fallback=1))
+        self.async_window = int(config.get(fuzz_section, 'async_window', fallback=1))
+        self.prefetch = int(config.get(fuzz_section, 'prefetch', fallback=0))
+        self.stats_flush_interval = float(config.get(fuzz_section, 'stats_flush_interval', fallback=1))
+        self.stats_flush_count = float(config.get(fuzz_section, 'stats_flush_count', fallback='inf'))
+        self.sut_restarts = 0
 
     def run(self):
         fuzzer, fuzzer_kwargs = config_get_callable(self.config, 'fuzz.' + self.fuzzer_name, 'fuzzer')
@@ -39,23 +95,88 @@ class FuzzJob(CallJob):
         issue_count = 0
         stat_updated = 0
         new_issues = []
+        stats = StatsBuffer(self.db, flush_interval=self.stats_flush_interval, flush_count=self.stats_flush_count)
+
+        # Fuzzers that maintain their own index or test, or expect feedback
+        # are called in lockstep with the SUT, test by test.
+        lockstep = any(hasattr(fuzzer, attr) for attr in ['index', 'test', 'feedback'])
+
+        generate_batch = getattr(fuzzer, 'generate_batch', None)
+        if generate_batch and not lockstep:
+            buffer = []
+            exhausted = False
+
+            def next_test(index):
+                nonlocal buffer, exhausted
+                if not buffer and not exhausted:
+                    n = math.ceil(min(self.batch - index, self.fuzzer_batch))
+                    buffer = generate_batch(index=index, n=n, **fuzzer_kwargs)
+                    exhausted = len(buffer) < n
+                    buffer.reverse()
+                return buffer.pop() if buffer else None
+        else:
+            def next_test(index):
+                return fuzzer(index=index, **fuzzer_kwargs)
 
         self.listener.update_fuzz_stat()
-        with fuzzer:
-            while index < self.batch:
-                sut_call, sut_call_kwargs = config_get_callable(self.config, 'sut.' + self.sut_name, 'call')
-                with sut_call:
-                    while index < self.batch:
-                        test = fuzzer(index=index, **fuzzer_kwargs)
+        sut_call, sut_call_kwargs = config_get_callable(self.config, 'sut.' + self.sut_name, 'call')
+        window = min(self.async_window, self.cost)
+        async_call = getattr(sut_call, 'async_call', None) if window > 1 and not lockstep else None
+        call_batch = getattr(sut_call, 'call_batch', None) if self.sut_batch > 1 and not lockstep and not async_call else None
+        loop = asyncio.new_event_loop() if async_call else None
+        if loop:
+            # The child watcher of asyncio subprocesses needs the loop to be
+            # the current one (before Python 3.8).
+            asyncio.set_event_loop(loop)
+        pending = deque()
+
+        # Fuzzers that have their own test or expect feedback cannot generate
+        # tests ahead of the SUT.
+        prefetcher = None
+        if self.prefetch > 0 and not any(hasattr(fuzzer, attr) for attr in ['test', 'feedback']):
+            prefetcher = FuzzerPrefetcher(fuzzer, next_test, self.prefetch, self.batch)
+            next_test = prefetcher.next_test
+
+        try:
+            with fuzzer, sut_call, prefetcher or ExitStack():
+                while index < self.batch:
+                    if async_call:
+                        # Keep the window full, then wait for the oldest test to
+                        # process the results in the order of the tests.
+                        while len(pending) < window and index + len(pending) < self.batch:
+                            test = next_test(index + len(pending))
+                            if test is None:
+                                self.batch = index + len(pending)
+                                break
+                            pending.append((test, loop.create_task(async_call(test=test, **sut_call_kwargs))))
+                        if not pending:
+                            break
+                        test, task = pending.popleft()
+                        tests, issues = [test], [loop.run_until_complete(task)]
+                    elif call_batch:
+                        n = math.ceil(min(self.batch - index, self.sut_batch))
+                        tests = []
+                        while len(tests) < n:
+                            test = next_test(index + len(tests))
+                            if test is None:
+                                # Exhausted fuzzer, stop after this chunk.
+                                self.batch = index + len(tests)
+                                break
+                            tests.append(test)
+                        issues = call_batch(tests=tests, **sut_call_kwargs) if tests else []
+                    else:
+                        test = next_test(index)
                         if test is None:
                             self.batch = index
                             break
-
-                        issue = sut_call(test=test, **sut_call_kwargs)
-
-                        # Check if fuzzer maintains its own index.
-                        if hasattr(fuzzer, 'index') and fuzzer.index > index:
-                            index = fuzzer.index
+                        tests, issues = [test], [sut_call(test=test, **sut_call_kwargs)]
+
+                    for test, issue in zip(tests, issues):
+                        # Check if fuzzer maintains its own index (as of generating
+                        # the test, if it was prefetched).
+                        fuzzer_index = prefetcher.fuzzer_index if prefetcher else getattr(fuzzer, 'index', None)
+                        if fuzzer_index is not None and fuzzer_index > index:
+                            index = fuzzer_index
                         else:
                             index += 1
 
@@ -79,16 +200,36 @@ class FuzzJob(CallJob):
 
                         self.listener.job_progress(ident=self.id, progress=index)
                         if index - stat_updated >= self.refresh:
-                            self.db.update_stat(self.sut_name, self.fuzzer_name, self.subconfig_id, index - stat_updated, issue_count)
-                            self.listener.update_fuzz_stat()
+                            if stats.add(self.sut_name, self.fuzzer_name, self.subconfig_id, index - stat_updated, issue_count):
+                                self.listener.update_fuzz_stat()
                             issue_count = 0
                             stat_updated = index
 
                         if issue:
                             self.add_issue(issue, new_issues=new_issues)
-                            break
 
-        # Update statistics.
-        self.db.update_stat(self.sut_name, self.fuzzer_name, self.subconfig_id, index - stat_updated, issue_count)
-        self.listener.update_fuzz_stat()
+                            # Restart the SUT only if it died with the issue.
+                            if not getattr(sut_call, 'alive', True):
+                                sut_call.__exit__(None, None, None)
+                                sut_call.__enter__()
+                                self.sut_restarts += 1
+                                self.listener.restart_sut(ident=self.id, sut=self.sut_name, restarts=self.sut_restarts)
+        finally:
+            # Cancel the tests still running (e.g., on an exception or
+            # keyboard interrupt) and close the event loop.
+            if loop:
+                tasks = [task for _, task in pending]
+                for task in tasks:
+                    task.cancel()
+                if tasks:
+                    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+                asyncio.set_event_loop(None)
+                loop.close()
+
+            # Final update of the statistics (even on keyboard interrupt).
+            stats.add(self.sut_name, self.fuzzer_name, self.subconfig_id, index - stat_updated, issue_count)
+            stats.flush()
+            self.listener.update_fuzz_stat()
+            self.symbolizer.close()
+
         return new_issues
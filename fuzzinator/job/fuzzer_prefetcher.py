@@ -0,0 +1,97 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import queue
+import threading
+
+
+class FuzzerPrefetcher(object):
+    """
+    Bounded producer/consumer stage that generates tests in a background
+    thread, so that the fuzzer and the SUT can run at the same time. At most
+    ``size`` tests are kept ready. The thread is started when the context of
+    the prefetcher is entered (which must happen after the context of the
+    fuzzer is entered) and it is stopped when the context is exited.
+
+    Tests are generated in the same order and with the same indices as they
+    would be by calling the fuzzer in lockstep with the SUT. For fuzzers that
+    maintain their own ``index``, the value of the index after generating a
+    test is recorded together with the test and is available in
+    :attr:`fuzzer_index` when the test is consumed.
+    """
+
+    def __init__(self, fuzzer, next_test, size, limit):
+        """
+        :param fuzzer: the fuzzer (only its ``index`` attribute is accessed).
+        :param next_test: function that generates the test of a given index
+            (or returns ``None`` if the fuzzer is exhausted).
+        :param int size: maximum number of tests to keep ready.
+        :param limit: number of tests to generate at most.
+        """
+        self.fuzzer_index = None
+        self._fuzzer = fuzzer
+        self._next_test = next_test
+        self._limit = limit
+        self._queue = queue.Queue(maxsize=size)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _produce(self):
+        index = 0
+        while index < self._limit:
+            try:
+                test = self._next_test(index)
+            except BaseException as e:
+                self._put((None, None, e))
+                return
+
+            if test is None:
+                break
+
+            fuzzer_index = getattr(self._fuzzer, 'index', None)
+            if not self._put((test, fuzzer_index, None)):
+                return
+            index = fuzzer_index if fuzzer_index is not None and fuzzer_index > index else index + 1
+        self._put((None, None, None))
+
+    def next_test(self, index):
+        """
+        Return the next prefetched test (or ``None`` if the fuzzer is
+        exhausted). Exceptions raised by the fuzzer are re-raised here.
+        """
+        test, self.fuzzer_index, error = self._queue.get()
+        if error is not None:
+            raise error
+        if test is None:
+            # Keep signalling exhaustion to subsequent calls.
+            self._queue.put((None, None, None))
+        return test
+
+    def close(self):
+        """
+        Stop the background thread (waiting for the fuzzer call in progress,
+        if any).
+        """
+        self._stop.set()
+        self._thread.join()
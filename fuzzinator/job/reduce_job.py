@@ -7,7 +7,7 @@
 
 import os
 
-from ..config import config_get_callable
+from ..config import config_get_callable, parse_size
 from .call_job import CallJob
 from .validate_job import ValidateJob
 
@@ -27,14 +27,26 @@ class ReduceJob(CallJob):
 
         self.issue = issue
         self.cost = int(config.get(sut_section, 'reduce_cost', fallback=config.get(sut_section, 'cost', fallback=1)))
+        self.memory_cost = parse_size(config.get(sut_section, 'reduce_memory_cost', fallback=config.get(sut_section, 'memory_cost', fallback=0)))
         self.work_dir = config.get('fuzzinator', 'work_dir')
 
     def run(self):
-        valid, issues = ValidateJob(id=self.id,
-                                    config=self.config,
-                                    issue=self.issue,
-                                    db=self.db,
-                                    listener=self.listener).validate()
+        try:
+            return self._run()
+        finally:
+            self.symbolizer.close()
+
+    def _run(self):
+        validate_job = ValidateJob(id=self.id,
+                                   config=self.config,
+                                   issue=self.issue,
+                                   db=self.db,
+                                   listener=self.listener)
+        try:
+            valid, issues = validate_job.validate()
+        finally:
+            validate_job.symbolizer.close()
+        self.issue = validate_job.issue
         if not valid:
             return issues
 
@@ -5,7 +5,7 @@
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
-from ..config import config_get_callable
+from ..config import config_get_callable, parse_size
 
 
 class UpdateJob(object):
@@ -17,6 +17,7 @@ class UpdateJob(object):
         self.config = config
         self.sut_name = sut_name
         self.cost = int(config.get('sut.' + sut_name, 'update_cost', fallback=config.get('fuzzinator', 'cost_budget')))
+        self.memory_cost = parse_size(config.get('sut.' + sut_name, 'update_memory_cost', fallback=config.get('sut.' + sut_name, 'memory_cost', fallback=0)))
 
     def run(self):
         update, update_kwargs = config_get_callable(self.config, 'sut.' + self.sut_name, 'update')
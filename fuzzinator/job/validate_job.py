@@ -7,7 +7,7 @@
 
 from datetime import datetime
 
-from ..config import config_get_callable
+from ..config import config_get_callable, parse_size
 from .call_job import CallJob
 
 
@@ -24,12 +24,26 @@ class ValidateJob(CallJob):
 
         self.issue = issue
         self.cost = int(config.get('sut.' + sut_name, 'validate_cost', fallback=config.get('sut.' + sut_name, 'cost', fallback=1)))
+        self.memory_cost = parse_size(config.get('sut.' + sut_name, 'validate_memory_cost', fallback=config.get('sut.' + sut_name, 'memory_cost', fallback=0)))
 
     def run(self):
-        _, new_issues = self.validate()
+        try:
+            _, new_issues = self.validate()
+        finally:
+            self.symbolizer.close()
         return new_issues
 
+    def fetch_issue(self):
+        # Issues may be queued without their test case and other large fields
+        # (see Controller.validate_all), those are fetched only now.
+        if 'test' not in self.issue:
+            self.issue = self.db.find_issue_by_oid(self.issue['_id'])
+        return self.issue is not None
+
     def validate(self):
+        if not self.fetch_issue():
+            return False, []
+
         sut_call, sut_call_kwargs = config_get_callable(self.config, 'sut.' + self.sut_name, ['validate_call', 'reduce_call', 'call'])
 
         with sut_call:
@@ -41,6 +55,9 @@ class ValidateJob(CallJob):
         if issue:
             issue['test'] = self.issue['test']
             if issue['id'] == self.issue['id'] and not self.issue.get('invalid'):
+                core_dump = issue.pop('core_dump', None)
+                if core_dump:
+                    self.symbolizer.discard(core_dump)
                 self.db.update_issue_by_oid(self.issue['_id'], issue)
                 return True, new_issues
 
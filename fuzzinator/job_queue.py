@@ -0,0 +1,114 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+
+class JobQueue(object):
+    """
+    Queue of the jobs waiting for execution.
+
+    With the ``'fifo'`` policy, jobs are started strictly in queue order, i.e.,
+    if the job at the head of the queue does not fit into the free capacity,
+    all jobs behind it have to wait, too. With the ``'backfill'`` policy, jobs
+    behind the head may be started if they fit into the free capacity. To
+    prevent the starvation of expensive jobs, a job that has been overtaken
+    ``backfill_limit`` times gets a reservation, i.e., no other job behind it
+    is started until it is started itself.
+
+    Jobs can be pushed with a key that identifies the work they perform (e.g.,
+    the validation of a given issue). If a job with the same key is already
+    waiting in the queue, the new submission is merged into it and counted in
+    ``duplicates``.
+    """
+
+    policies = ['fifo', 'backfill']
+
+    def __init__(self, policy='fifo', backfill_limit=10):
+        if policy not in self.policies:
+            raise ValueError('Unknown scheduler policy: {policy}'.format(policy=policy))
+
+        self.policy = policy
+        self.backfill_limit = backfill_limit
+        self.backfilled = 0
+        self.duplicates = 0
+        self.cost = 0
+        self._jobs = []
+        self._skips = dict()
+        self._keys = dict()
+        self._job_keys = dict()
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def __iter__(self):
+        return iter(self._jobs)
+
+    def push(self, job, priority=False, key=None):
+        self._jobs.insert(0 if priority else len(self._jobs), job)
+        self._skips[job.id] = 0
+        self.cost += job.cost
+        if key is not None:
+            self._keys[key] = job
+            self._job_keys[job.id] = key
+
+    def merge(self, key, priority=False):
+        """
+        Merge a submission into the queued job with the same key (if any). If
+        the submission has priority, the queued job is moved to the head of
+        the queue and made free of cost and memory cost (like priority jobs
+        are).
+
+        :return: the queued job the submission was merged into, or ``None`` if
+            there is no such job.
+        """
+        job = self._keys.get(key)
+        if job is None:
+            return None
+
+        self.duplicates += 1
+        if priority:
+            self._jobs.remove(job)
+            self._jobs.insert(0, job)
+            self.cost -= job.cost
+            job.cost = 0
+            job.memory_cost = 0
+        return job
+
+    def remove(self, ident):
+        for idx, job in enumerate(self._jobs):
+            if job.id == ident:
+                self._delete(idx)
+                return job
+        return None
+
+    def _delete(self, idx):
+        job = self._jobs.pop(idx)
+        del self._skips[job.id]
+        key = self._job_keys.pop(job.id, None)
+        if key is not None:
+            del self._keys[key]
+        self.cost -= job.cost
+
+    def pop(self, free, free_memory=float('inf')):
+        """
+        Remove and return the next job that can be started with the given free
+        capacity and memory, or ``None`` if there is no such job.
+        """
+        for idx, job in enumerate(self._jobs):
+            if job.cost <= free and job.memory_cost <= free_memory:
+                break
+            if self.policy == 'fifo' or self._skips[job.id] >= self.backfill_limit:
+                return None
+        else:
+            return None
+
+        if idx > 0:
+            self.backfilled += 1
+            for skipped in self._jobs[:idx]:
+                self._skips[skipped.id] += 1
+
+        self._delete(idx)
+        return job
@@ -31,6 +31,27 @@ class EventListener(object):
         """
         pass
 
+    def update_utilization(self, load, capacity, memory_load, memory_budget, queued_jobs, queued_cost, backfilled, duplicates):
+        """
+        Invoked when the utilization of the framework or the state of its job
+        queue changes.
+
+        :param int load: number between 0 and controller's capacity.
+        :param int capacity: the controller's capacity (cost budget).
+        :param int memory_load: memory reserved for or used by the running
+            jobs (in bytes).
+        :param memory_budget: the controller's memory budget (in bytes, may be
+            ``inf``).
+        :type memory_budget: int, float
+        :param int queued_jobs: number of jobs waiting in the queue.
+        :param int queued_cost: total cost of the jobs waiting in the queue.
+        :param int backfilled: number of jobs started so far ahead of earlier
+            queued jobs that did not fit into the free capacity.
+        :param int duplicates: number of job submissions merged so far into
+            identical jobs already waiting in the queue.
+        """
+        pass
+
     def new_fuzz_job(self, ident, cost, sut, fuzzer, batch):
         """
         Invoked when a new (still inactive) fuzz job is instantiated.
@@ -92,6 +113,18 @@ class EventListener(object):
         """
         pass
 
+    def job_placement(self, ident, cpus, nodes):
+        """
+        Invoked when CPUs are dedicated to an activated job.
+
+        :param int ident: unique identifier of the job.
+        :param list cpus: the CPUs the job (and its subprocesses) are
+            restricted to.
+        :param list nodes: the NUMA nodes of the CPUs (empty if the NUMA
+            topology is not known).
+        """
+        pass
+
     def job_progress(self, ident, progress):
         """
         Invoked when an activated job makes progress.
@@ -104,6 +137,18 @@ class EventListener(object):
         """
         pass
 
+    def restart_sut(self, ident, sut, restarts):
+        """
+        Invoked when a fuzz job restarts its SUT, since it died with an issue.
+
+        :param int ident: unique identifier of the job that has restarted the
+            SUT.
+        :param str sut: short name of the restarted SUT (name of the
+            corresponding config section without the "sut." prefix).
+        :param int restarts: number of restarts of the SUT in the job so far.
+        """
+        pass
+
     def remove_job(self, ident):
         """
         Invoked when an active job has finished.
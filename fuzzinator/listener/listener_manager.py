@@ -7,6 +7,8 @@
 
 import inspect
 import logging
+import threading
+import time
 
 from .event_listener import EventListener
 
@@ -27,20 +29,88 @@ class Trampoline(object):
                 logger.warning('Unhandled exception in listener \'%s\'.', self.name, exc_info=e)
 
 
+class Throttle(object):
+    """
+    Rate limiter of a high-frequency event. The event is forwarded to the
+    wrapped trampoline at most once per ``interval`` seconds per job (i.e.,
+    per ``ident`` argument). Events triggered in between are coalesced: only
+    the latest one is kept and it is forwarded when the interval elapses (by a
+    timer thread, even if no further event is triggered), or by
+    :meth:`flush`.
+    """
+
+    def __init__(self, trampoline, interval):
+        self.trampoline = trampoline
+        self.interval = interval
+        self.pending = dict()
+        self.sent = dict()
+        self.timers = dict()
+        # The timers forward the events from their own threads.
+        self.lock = threading.RLock()
+
+    def __call__(self, **kwargs):
+        key = kwargs.get('ident')
+        with self.lock:
+            now = time.monotonic()
+            elapsed = now - self.sent.get(key, float('-inf'))
+            if elapsed < self.interval:
+                self.pending[key] = kwargs
+                if key not in self.timers:
+                    timer = threading.Timer(self.interval - elapsed, self._expire, args=(key, ))
+                    timer.daemon = True
+                    self.timers[key] = timer
+                    timer.start()
+                return
+
+            self.pending.pop(key, None)
+            self.sent[key] = now
+            self.trampoline(**kwargs)
+
+    def _expire(self, key):
+        with self.lock:
+            self.timers.pop(key, None)
+            kwargs = self.pending.pop(key, None)
+            # Forward the pending event if it is due, or wait again if another
+            # event has been forwarded since the timer was started.
+            if kwargs is not None:
+                self(**kwargs)
+
+    def flush(self):
+        """
+        Forward the coalesced events that are still pending.
+        """
+        with self.lock:
+            for timer in self.timers.values():
+                timer.cancel()
+            pending, self.pending, self.sent, self.timers = self.pending, dict(), dict(), dict()
+            for kwargs in pending.values():
+                self.trampoline(**kwargs)
+
+
 class ListenerManager(object):
     """
     Class that registers listeners to various events and executes all of them
     when the event has triggered.
+
+    The events listed in ``throttled_events`` (which may be triggered after
+    every test) are rate-limited per job (see :class:`Throttle`). All other
+    events are forwarded immediately. The jobs have to :meth:`flush` the
+    manager before they finish.
     """
 
-    def __init__(self, listeners=None):
+    throttled_events = ['job_progress', 'update_fuzz_stat']
+
+    def __init__(self, listeners=None, throttle=0.1):
         """
         :param listeners: List of listener objects.
+        :param float throttle: Minimum interval between two throttled events
+            of a job (in seconds, 0 disables throttling).
         """
         self.listeners = listeners or []
 
         for fn, _ in inspect.getmembers(EventListener, predicate=inspect.isfunction):
-            setattr(self, fn, Trampoline(self, fn))
+            trampoline = Trampoline(self, fn)
+            setattr(self, fn, Throttle(trampoline, throttle) if throttle and fn in self.throttled_events else trampoline)
 
     def __iadd__(self, listener):
         """
@@ -58,3 +128,12 @@ class ListenerManager(object):
         :param listener: The new listener to register.
         """
         self.listeners.append(listener)
+
+    def flush(self):
+        """
+        Forward the pending throttled events to the listeners.
+        """
+        for fn in self.throttled_events:
+            trampoline = getattr(self, fn)
+            if isinstance(trampoline, Throttle):
+                trampoline.flush()
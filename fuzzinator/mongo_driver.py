@@ -6,20 +6,29 @@
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
+import os
+
 from datetime import datetime
 
 from bson.objectid import ObjectId
-from pymongo import ASCENDING, MongoClient, ReturnDocument
+from pymongo import ASCENDING, MongoClient, ReturnDocument, UpdateOne
 
 
 class MongoDriver(object):
 
     def __init__(self, uri):
         self.uri = uri
+        self._client = None
+        self._client_pid = None
 
     @property
     def _db(self):
-        return MongoClient(self.uri).get_database()
+        # MongoClient is not fork-safe, so every process needs its own client.
+        # But within a process, the client (and its connection pool) is kept.
+        if self._client is None or self._client_pid != os.getpid():
+            self._client = MongoClient(self.uri)
+            self._client_pid = os.getpid()
+        return self._client.get_database()
 
     def init_db(self, fuzzers):
         """
@@ -118,8 +127,10 @@ class MongoDriver(object):
                     issue['subconfig']['src'] = subconfig['src']
         return issue
 
-    def find_issues_by_suts(self, suts):
-        return list(self._db.fuzzinator_issues.find({'sut': {'$in': suts}}))
+    def find_issues_by_suts(self, suts, filter=None, projection=None):
+        # Returns a cursor instead of a list, which can be iterated without
+        # loading all (potentially huge) issues into memory at once.
+        return self._db.fuzzinator_issues.find(dict(filter or {}, sut={'$in': suts}), projection=projection)
 
     def update_issue_by_oid(self, oid, _set):
         self._db.fuzzinator_issues.update_one({'_id': ObjectId(oid)}, {'$set': _set})
@@ -229,3 +240,19 @@ class MongoDriver(object):
         self._db.fuzzinator_stats.find_one_and_update({'sut': sut, 'fuzzer': fuzzer, 'subconfig': subconfig},
                                                       {'$inc': {'exec': int(batch), 'issues': issues}},
                                                       upsert=True)
+
+    def update_stats(self, stats):
+        """
+        Increment the statistics of multiple fuzz jobs with a single unordered
+        bulk write.
+
+        :param dict stats: mapping of ``(sut, fuzzer, subconfig)`` tuples to
+            ``(batch, issues)`` increments.
+        """
+        if not stats:
+            return
+        self._db.fuzzinator_stats.bulk_write([UpdateOne({'sut': sut, 'fuzzer': fuzzer, 'subconfig': subconfig},
+                                                        {'$inc': {'exec': int(batch), 'issues': issues}},
+                                                        upsert=True)
+                                              for (sut, fuzzer, subconfig), (batch, issues) in stats.items()],
+                                             ordered=False)
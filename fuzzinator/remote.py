@@ -0,0 +1,375 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import inspect
+import logging
+import os
+import shutil
+import sys
+import threading
+import traceback
+
+from argparse import ArgumentParser
+from configparser import ConfigParser, ExtendedInterpolation
+from io import StringIO
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Client, Listener, wait
+
+import psutil
+
+from .listener import EventListener, ListenerManager
+from .listener.listener_manager import Throttle
+
+logger = logging.getLogger(__name__)
+
+
+def parse_address(address):
+    host, port = address.rsplit(':', maxsplit=1)
+    return host, int(port)
+
+
+class RemoteWorkerHandle(object):
+    """
+    Coordinator-side representation of a connected remote worker.
+    """
+
+    def __init__(self, conn, capacity):
+        self.conn = conn
+        self.capacity = capacity
+        self.load = 0
+        self.jobs = dict()
+
+    def submit(self, descriptor, cost):
+        self.conn.send(('run', descriptor))
+        self.jobs[descriptor[1]] = (descriptor, cost)
+        self.load += cost
+
+    def cancel(self, ident):
+        try:
+            self.conn.send(('cancel', ident))
+        except (BrokenPipeError, OSError):
+            pass
+
+
+class Coordinator(object):
+    """
+    Server that lets remote workers (started with ``fuzzinator-worker``)
+    connect to the controller. Every worker has a control connection, on
+    which it receives job descriptors and reports finished jobs. Additionally,
+    every job executed by a worker opens a session connection, through which
+    it accesses the database, notifies the listeners, and queues new jobs (as
+    if it was running in the controller's process).
+    """
+
+    def __init__(self, controller, address, authkey):
+        self.controller = controller
+        self.workers = []
+        self._listener = Listener(parse_address(address), authkey=authkey.encode('utf-8'))
+        self._lock = threading.Lock()
+        self._new_workers = []
+        self._wakeup_reader, self._wakeup_writer = Pipe(duplex=False)
+
+        thread = threading.Thread(target=self._accept, daemon=True)
+        thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                break
+            except Exception as e:
+                logger.warning('Failed to accept remote connection.', exc_info=e)
+                continue
+            threading.Thread(target=self._handshake, args=(conn,), daemon=True).start()
+
+    def _handshake(self, conn):
+        try:
+            msg = conn.recv()
+            if msg[0] == 'hello':
+                config_str = StringIO()
+                self.controller.config.write(config_str)
+                conn.send(('config', config_str.getvalue()))
+                with self._lock:
+                    self._new_workers.append(RemoteWorkerHandle(conn, msg[1]))
+                    self._wakeup_writer.send_bytes(b'\0')
+            elif msg[0] == 'session':
+                self._serve_session(conn)
+        except (EOFError, OSError):
+            conn.close()
+
+    def _serve_session(self, conn):
+        db = self.controller.db
+        handlers = {
+            ('db', 'add_issue'): lambda issue: (db.add_issue(issue), issue),
+            ('db', 'update_stat'): db.update_stat,
+            ('db', 'update_stats'): db.update_stats,
+            ('db', 'update_issue_by_oid'): db.update_issue_by_oid,
+            ('db', 'find_issue_by_oid'): db.find_issue_by_oid,
+            ('controller', 'add_reduce_job'): self.controller.add_reduce_job,
+            ('controller', 'add_validate_job'): self.controller.add_validate_job,
+        }
+
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                break
+
+            if msg[0] == 'event':
+                _, name, kwargs = msg
+                # Events are throttled by the remote listener already.
+                trampoline = getattr(self.controller.listener, name)
+                getattr(trampoline, 'trampoline', trampoline)(**kwargs)
+            elif msg[0] == 'call':
+                _, target, name, args, kwargs = msg
+                try:
+                    conn.send(('ok', handlers[(target, name)](*args, **kwargs)))
+                except Exception as e:
+                    conn.send(('error', '{exception}\n{trace}'.format(exception=e, trace=traceback.format_exc())))
+        conn.close()
+
+    @property
+    def sentinels(self):
+        return [self._wakeup_reader] + [worker.conn for worker in self.workers]
+
+    def poll(self):
+        """
+        Register newly connected workers, process the notifications of the
+        workers about finished jobs, and drop disconnected workers.
+
+        :return: descriptors of the jobs that were running on disconnected
+            workers.
+        """
+        with self._lock:
+            while self._wakeup_reader.poll():
+                self._wakeup_reader.recv_bytes()
+            for worker in self._new_workers:
+                logger.info('Remote worker connected (capacity: %d).', worker.capacity)
+            self.workers.extend(self._new_workers)
+            self._new_workers = []
+
+        lost = []
+        for worker in list(self.workers):
+            try:
+                while worker.conn.poll():
+                    msg = worker.conn.recv()
+                    if msg[0] == 'done' and msg[1] in worker.jobs:
+                        _, cost = worker.jobs.pop(msg[1])
+                        worker.load -= cost
+            except (EOFError, OSError):
+                logger.warning('Remote worker disconnected, re-queueing its %d job(s).', len(worker.jobs))
+                lost.extend(descriptor for descriptor, _ in worker.jobs.values())
+                worker.jobs = dict()
+                worker.conn.close()
+                self.workers.remove(worker)
+        return lost
+
+    def find(self, ident):
+        return next((worker for worker in self.workers if ident in worker.jobs), None)
+
+    def close(self):
+        self._listener.close()
+        for worker in self.workers:
+            worker.conn.close()
+        self.workers = []
+
+
+class RemoteSession(object):
+    """
+    Job-side end of a session connection to the coordinator.
+    """
+
+    def __init__(self, address, authkey):
+        self.conn = Client(parse_address(address), authkey=authkey)
+        self.conn.send(('session',))
+        # Throttled events may be sent by timer threads.
+        self._lock = threading.Lock()
+
+    def call(self, target, name, *args, **kwargs):
+        with self._lock:
+            self.conn.send(('call', target, name, args, kwargs))
+            status, result = self.conn.recv()
+        if status != 'ok':
+            raise RuntimeError('Remote call of {target}.{name} failed: {error}'.format(target=target, name=name, error=result))
+        return result
+
+    def event(self, name, **kwargs):
+        with self._lock:
+            self.conn.send(('event', name, kwargs))
+
+    def close(self):
+        self.conn.close()
+
+
+class RemoteDriver(object):
+    """
+    Drop-in replacement of :class:`fuzzinator.mongo_driver.MongoDriver` for
+    jobs executed by remote workers.
+    """
+
+    def __init__(self, session):
+        self._session = session
+
+    def add_issue(self, issue):
+        new, result = self._session.call('db', 'add_issue', issue)
+        issue.update(result)
+        return new
+
+    def update_stat(self, *args, **kwargs):
+        return self._session.call('db', 'update_stat', *args, **kwargs)
+
+    def update_stats(self, *args, **kwargs):
+        return self._session.call('db', 'update_stats', *args, **kwargs)
+
+    def update_issue_by_oid(self, *args, **kwargs):
+        return self._session.call('db', 'update_issue_by_oid', *args, **kwargs)
+
+    def find_issue_by_oid(self, *args, **kwargs):
+        return self._session.call('db', 'find_issue_by_oid', *args, **kwargs)
+
+
+class RemoteListener(object):
+    """
+    Drop-in replacement of :class:`fuzzinator.listener.ListenerManager` for
+    jobs executed by remote workers. Events are forwarded to the listeners of
+    the coordinator (high-frequency events are throttled the same way as by
+    the listener manager).
+    """
+
+    class Trampoline(object):
+
+        def __init__(self, session, name):
+            self.session = session
+            self.name = name
+
+        def __call__(self, **kwargs):
+            self.session.event(self.name, **kwargs)
+
+    def __init__(self, session, throttle=0.1):
+        for fn, _ in inspect.getmembers(EventListener, predicate=inspect.isfunction):
+            trampoline = self.Trampoline(session, fn)
+            setattr(self, fn, Throttle(trampoline, throttle) if throttle and fn in ListenerManager.throttled_events else trampoline)
+
+    def flush(self):
+        for fn in ListenerManager.throttled_events:
+            trampoline = getattr(self, fn)
+            if isinstance(trampoline, Throttle):
+                trampoline.flush()
+
+
+class RemoteController(object):
+    """
+    The parts of :class:`fuzzinator.Controller` that are needed by jobs
+    executed by remote workers.
+    """
+
+    def __init__(self, session, throttle=0.1):
+        self._session = session
+        self.listener = RemoteListener(session, throttle=throttle)
+
+    def add_reduce_job(self, issue, priority=False):
+        return self._session.call('controller', 'add_reduce_job', issue=issue, priority=priority)
+
+    def add_validate_job(self, issue, priority=False):
+        return self._session.call('controller', 'add_validate_job', issue=issue, priority=priority)
+
+
+class RemoteWorker(object):
+    """
+    Worker that connects to a coordinator, executes the jobs it receives with
+    its own local cost budget, and reports back their results.
+    """
+
+    def __init__(self, address, authkey, capacity, work_dir):
+        self.address = address
+        self.authkey = authkey.encode('utf-8')
+        self.capacity = capacity
+        self.work_dir = work_dir
+        self.config = None
+
+    def _run_job(self, descriptor):
+        # Imported here to avoid circular imports.
+        from .controller import Controller
+
+        job_class, ident, job_kwargs = descriptor
+        session = RemoteSession(self.address, self.authkey)
+        controller = RemoteController(session, throttle=float(self.config.get('fuzzinator', 'event_throttle', fallback=0.1)))
+        job = job_class(id=ident,
+                        config=self.config,
+                        db=RemoteDriver(session),
+                        listener=controller.listener,
+                        **job_kwargs)
+        Controller.execute_job(job, controller)
+        session.close()
+
+    def run(self):
+        from .controller import Controller
+
+        conn = Client(parse_address(self.address), authkey=self.authkey)
+        conn.send(('hello', self.capacity))
+        _, config_src = conn.recv()
+
+        self.config = ConfigParser(interpolation=ExtendedInterpolation(),
+                                   strict=False,
+                                   allow_no_value=True)
+        self.config.read_string(config_src)
+        self.config.set('fuzzinator', 'work_dir', self.work_dir)
+
+        running_jobs = dict()
+        try:
+            while True:
+                wait([conn] + [proc.sentinel for proc in running_jobs.values()])
+
+                for ident, proc in list(running_jobs.items()):
+                    if not proc.is_alive() or not psutil.pid_exists(proc.pid):
+                        del running_jobs[ident]
+                        conn.send(('done', ident))
+
+                while conn.poll():
+                    msg = conn.recv()
+                    if msg[0] == 'run':
+                        descriptor = msg[1]
+                        proc = Process(target=self._run_job, args=(descriptor,))
+                        running_jobs[descriptor[1]] = proc
+                        proc.start()
+                    elif msg[0] == 'cancel' and msg[1] in running_jobs:
+                        Controller.kill_process_tree(running_jobs[msg[1]].pid)
+        except (EOFError, OSError):
+            logger.info('Coordinator disconnected.')
+        except KeyboardInterrupt:
+            pass
+        finally:
+            Controller.kill_process_tree(os.getpid(), kill_root=False)
+            if os.path.exists(self.work_dir):
+                shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+def execute(args=None):
+    parser = ArgumentParser(description='Fuzzinator worker that executes jobs of a remote controller.')
+    parser.add_argument('address', metavar='HOST:PORT',
+                        help='address of the coordinating controller (see option fuzzinator:coordinator_address)')
+    parser.add_argument('--authkey', metavar='KEY', default=os.getenv('FUZZINATOR_AUTHKEY'),
+                        help='authentication key shared with the coordinator (default: FUZZINATOR_AUTHKEY environment variable)')
+    parser.add_argument('--cost-budget', metavar='N', type=int, default=os.cpu_count(),
+                        help='cost budget of the worker (default: %(default)s)')
+    parser.add_argument('--work-dir', metavar='DIR', default=os.path.join(os.getcwd(), '.fuzzinator-worker-{uid}'),
+                        help='pattern of work directory for temporary files (default: %(default)s)')
+    parser.add_argument('-l', '--log-level', metavar='LEVEL', default='INFO',
+                        help='set log level (default: %(default)s)')
+    arguments = parser.parse_args(args)
+    if not arguments.authkey:
+        parser.error('authentication key must be specified')
+
+    logger = logging.getLogger()
+    logger.addHandler(logging.StreamHandler(sys.stdout))
+    logger.setLevel(arguments.log_level)
+
+    RemoteWorker(address=arguments.address,
+                 authkey=arguments.authkey,
+                 capacity=arguments.cost_budget,
+                 work_dir=arguments.work_dir.format(uid=os.getpid())).run()
@@ -0,0 +1,207 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import asyncio
+import json
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import threading
+
+from contextlib import contextmanager
+from functools import lru_cache
+
+# Whether core dumps are enabled for the subprocesses started by the current
+# thread (see core_dumps).
+_state = threading.local()
+
+# Shell that raises the soft limit of the core file size to the hard limit and
+# executes the command given in its positional arguments.
+_core_dump_shell = ['/bin/sh', '-c', 'ulimit -c "$(ulimit -H -c)" 2>/dev/null; exec "$@"', 'sh']
+
+# Characters that shlex.split would interpret if they were substituted into
+# the command before splitting it.
+_shlex_special = re.compile(r'[\s\'"\\]')
+
+
+class CommandTemplate(object):
+    """
+    Command line of a subprocess that is split into arguments only once.
+    Arguments that contain replacement fields (e.g., ``{test}``) are
+    formatted on every use, the rest of the arguments are reused as is.
+
+    The result is the same as formatting the command and splitting it
+    afterwards (as done originally by the subprocess-based calls), unless a
+    substituted value is empty or contains whitespace, quotes, or
+    backslashes. In those cases, the command is formatted and split as a
+    whole to keep the original semantics.
+    """
+
+    def __init__(self, command):
+        self.command = command
+        self.posix = sys.platform != 'win32'
+        self.args = shlex.split(command, posix=self.posix)
+        self.slots = [i for i, arg in enumerate(self.args) if '{' in arg or '}' in arg]
+
+    def argv(self, **fields):
+        """
+        Build the arguments of the command. Without fields, the command is
+        not formatted at all (thus, it may contain braces, e.g.,
+        ``find . -exec echo {} ;`` or ``awk '{print $1}'``).
+
+        :param fields: values of the replacement fields.
+        :return: list of arguments.
+        """
+        if not fields or not self.slots:
+            return list(self.args)
+
+        if not all(isinstance(value, str) and value and not _shlex_special.search(value) for value in fields.values()):
+            return shlex.split(self.command.format(**fields), posix=self.posix)
+
+        args = list(self.args)
+        for i in self.slots:
+            args[i] = args[i].format(**fields)
+        return args
+
+
+@lru_cache(maxsize=128)
+def command_template(command):
+    """
+    Get the (cached) template of a command.
+
+    :param str command: the command line.
+    :return: :class:`CommandTemplate` of the command.
+    """
+    return CommandTemplate(command)
+
+
+@lru_cache(maxsize=128)
+def environ(env):
+    """
+    Get the (cached) environment of a subprocess, i.e., the environment of
+    the current process updated with the given variables. The result must
+    not be modified.
+
+    :param str env: JSON object of variable names-values (or ``None``).
+    :return: the environment dictionary, or ``None`` if ``env`` is ``None``
+        (i.e., the subprocess inherits the environment of the current
+        process).
+    """
+    return dict(os.environ, **json.loads(env)) if env else None
+
+
+@lru_cache(maxsize=128)
+def _which(name, path):
+    return shutil.which(name, path=path)
+
+
+def executable(argv, env=None):
+    """
+    Resolve the program of a command to a path (which is cached), so that
+    the search of ``PATH`` can be spared in the child process. Programs given
+    with a (relative or absolute) path are not resolved, as they may be
+    relative to the working directory of the subprocess.
+
+    :param list argv: arguments of the command.
+    :param dict env: environment of the subprocess.
+    :return: path of the program, or ``None`` if it cannot be resolved.
+    """
+    if not argv or os.path.dirname(argv[0]) or sys.platform == 'win32':
+        return None
+    return _which(argv[0], (env if env is not None else os.environ).get('PATH', os.defpath))
+
+
+@contextmanager
+def core_dumps():
+    """
+    Context manager that enables core dumps for the subprocesses started
+    (with :func:`popen` or :func:`create_subprocess_exec`) in the context,
+    by raising the soft limit of their core file size to the hard limit. The
+    limit of the current process is not changed (so that neither it nor its
+    threads dump core), the command is executed by a shell that raises the
+    limit for itself and the command only. (Setting the limit in the child
+    process between fork and exec is not safe in a multi-threaded process and
+    would prevent the use of ``vfork``.) The setting is local to the current
+    thread.
+    """
+    enabled = getattr(_state, 'core_dumps', False)
+    _state.core_dumps = True
+    try:
+        yield
+    finally:
+        _state.core_dumps = enabled
+
+
+def command_argv(argv):
+    """
+    The arguments to start a command with: the command itself, or the command
+    wrapped in a shell if core dumps are enabled (see :func:`core_dumps`).
+
+    :param list argv: arguments of the command.
+    :return: list of arguments.
+    """
+    return _core_dump_shell + list(argv) if getattr(_state, 'core_dumps', False) and sys.platform != 'win32' else argv
+
+
+def spawn_kwargs(argv, cwd=None, env=None):
+    """
+    Keyword arguments for :class:`subprocess.Popen` (or
+    :func:`asyncio.create_subprocess_exec`) to start a subprocess as cheaply
+    as possible. The program is resolved in advance and the working directory
+    is not changed if it is the current one. This way,
+    :class:`subprocess.Popen` can start the subprocess with ``vfork`` instead
+    of ``fork`` where available. The file descriptors of the current process
+    are still closed in the child (inheritable descriptors opened by
+    third-party code must not leak into the SUT), extra descriptors can be
+    passed with ``pass_fds``.
+
+    :param list argv: arguments of the command.
+    :param str cwd: working directory of the subprocess (``None`` means the
+        current one).
+    :param str env: JSON object of variable names-values to update the
+        environment with (or ``None``).
+    """
+    env = environ(env)
+    return dict(executable=executable(argv, env),
+                cwd=cwd if cwd and cwd != os.getcwd() else None,
+                env=env,
+                close_fds=True)
+
+
+def popen(argv, cwd=None, env=None, **kwargs):
+    """
+    Start a subprocess (see :func:`spawn_kwargs`).
+
+    :param list argv: arguments of the command.
+    :param str cwd: working directory of the subprocess.
+    :param str env: JSON object of variable names-values to update the
+        environment with (or ``None``).
+    :param kwargs: further arguments of :class:`subprocess.Popen` (e.g.,
+        streams).
+    :return: the :class:`subprocess.Popen` object.
+    """
+    argv = command_argv(argv)
+    return subprocess.Popen(argv, **spawn_kwargs(argv, cwd=cwd, env=env), **kwargs)
+
+
+async def create_subprocess_exec(argv, cwd=None, env=None, **kwargs):
+    """
+    Start a subprocess asynchronously (see :func:`spawn_kwargs`).
+
+    :param list argv: arguments of the command.
+    :param str cwd: working directory of the subprocess.
+    :param str env: JSON object of variable names-values to update the
+        environment with (or ``None``).
+    :param kwargs: further arguments of
+        :func:`asyncio.create_subprocess_exec` (e.g., streams).
+    :return: the :class:`asyncio.subprocess.Process` object.
+    """
+    argv = command_argv(argv)
+    return await asyncio.create_subprocess_exec(*argv, **spawn_kwargs(argv, cwd=cwd, env=env), **kwargs)
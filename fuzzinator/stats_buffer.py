@@ -0,0 +1,63 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import time
+
+
+class StatsBuffer(object):
+    """
+    Write-behind buffer of fuzz statistics. Increments are coalesced per
+    ``(sut, fuzzer, subconfig)`` and written to the database with a single
+    :meth:`fuzzinator.mongo_driver.MongoDriver.update_stats` call once
+    ``flush_interval`` seconds have elapsed since the last write or
+    ``flush_count`` tests have been buffered, whichever comes first.
+    """
+
+    def __init__(self, db, flush_interval=1, flush_count=float('inf')):
+        """
+        :param db: the database to write the statistics to.
+        :param float flush_interval: maximum age of buffered increments (in
+            seconds).
+        :param float flush_count: maximum number of buffered tests.
+        """
+        self.db = db
+        self.flush_interval = flush_interval
+        self.flush_count = flush_count
+        self._stats = dict()
+        self._count = 0
+        self._flushed = time.monotonic()
+
+    def add(self, sut, fuzzer, subconfig, batch, issues):
+        """
+        Buffer the increments of the statistics of a fuzz job and write the
+        buffer to the database if it is due.
+
+        :return: ``True`` if the database was updated.
+        """
+        if batch or issues:
+            key = (sut, fuzzer, subconfig)
+            exec_count, issue_count = self._stats.get(key, (0, 0))
+            self._stats[key] = (exec_count + batch, issue_count + issues)
+            self._count += batch
+
+        if self._count >= self.flush_count or time.monotonic() - self._flushed >= self.flush_interval:
+            return self.flush()
+        return False
+
+    def flush(self):
+        """
+        Write the buffered increments to the database.
+
+        :return: ``True`` if the database was updated.
+        """
+        self._flushed = time.monotonic()
+        if not self._stats:
+            return False
+
+        stats, self._stats, self._count = self._stats, dict(), 0
+        self.db.update_stats(stats)
+        return True
@@ -32,6 +32,9 @@ class CliListener(EventListener):
     def activate_job(self, ident):
         logger.debug('#%s: Activate job.', ident)
 
+    def restart_sut(self, ident, sut, restarts):
+        logger.debug('#%s: Restarted %s (%s restarts).', ident, sut, restarts)
+
     def remove_job(self, ident):
         logger.debug('#%s: Remove job.', ident)
 
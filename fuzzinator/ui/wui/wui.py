@@ -113,6 +113,11 @@ class Wui(object):
         self.jobs[kwargs['ident']] = job
         self.send_notification('activate_job', kwargs)
 
+    def job_placement(self, **kwargs):
+        job = self.jobs[kwargs['ident']]
+        job.update(cpus=kwargs['cpus'], nodes=kwargs['nodes'])
+        self.jobs[kwargs['ident']] = job
+
     def job_progress(self, **kwargs):
         job = self.jobs[kwargs['ident']]
         job.update(progress=kwargs['progress'])
@@ -5,14 +5,11 @@
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
-import json
 import logging
-import os
-import shlex
 import subprocess
-import sys
 
 from .. import Controller
+from ..spawner import command_template, popen
 
 logger = logging.getLogger(__name__)
 
@@ -49,11 +46,11 @@ def SubprocessUpdate(command, cwd=None, env=None, timeout=None):
 
     timeout = int(timeout) if timeout else None
     try:
-        proc = subprocess.Popen(shlex.split(command, posix=sys.platform != 'win32'),
-                                stdout=subprocess.PIPE,
-                                stderr=subprocess.PIPE,
-                                cwd=cwd or os.getcwd(),
-                                env=dict(os.environ, **json.loads(env or '{}')))
+        proc = popen(command_template(command).argv(),
+                     cwd=cwd,
+                     env=env,
+                     stdout=subprocess.PIPE,
+                     stderr=subprocess.PIPE)
         stdout, stderr = proc.communicate(timeout=timeout)
         stdout_str = stdout.decode('utf-8', errors='ignore')
         if proc.returncode != 0:
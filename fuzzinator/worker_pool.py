@@ -0,0 +1,121 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import signal
+
+from multiprocessing import Pipe, Process
+
+import psutil
+
+
+class PoolWorker(object):
+    """
+    A long-lived process that executes the jobs sent to it one after the
+    other. Jobs are sent as picklable descriptors, i.e., as tuples of
+    arguments of the worker's target callable, the second element of which
+    must be the unique identifier of the job.
+    """
+
+    def __init__(self, target):
+        self.conn, worker_conn = Pipe()
+        self.proc = Process(target=self._loop, args=(worker_conn, target))
+        self.proc.start()
+        worker_conn.close()
+        self.ident = None
+
+    @staticmethod
+    def _loop(conn, target):
+        sigint_handler = signal.getsignal(signal.SIGINT)
+        while True:
+            try:
+                descriptor = conn.recv()
+            except EOFError:
+                break
+            if descriptor is None:
+                break
+
+            target(*descriptor)
+            # Jobs may install their own handlers, don't let them leak into
+            # the next job.
+            signal.signal(signal.SIGINT, sigint_handler)
+            conn.send(descriptor[1])
+
+    def submit(self, descriptor):
+        self.ident = descriptor[1]
+        self.conn.send(descriptor)
+
+    def poll(self):
+        """
+        Process the notifications of the worker about finished jobs and return
+        whether the worker is still alive.
+        """
+        try:
+            while self.conn.poll():
+                if self.conn.recv() == self.ident:
+                    self.ident = None
+        except (EOFError, OSError):
+            pass
+
+        # The process may have been reaped by Controller.kill_process_tree
+        # already, in which case is_alive() is unreliable.
+        if not self.proc.is_alive() or not psutil.pid_exists(self.proc.pid):
+            self.ident = None
+            return False
+        return True
+
+    @property
+    def sentinels(self):
+        return [self.conn, self.proc.sentinel]
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.conn.close()
+
+
+class WorkerPool(object):
+    """
+    Pool of long-lived worker processes. The pool keeps (at least) ``size``
+    workers alive and grows temporarily if more jobs run in parallel (e.g.,
+    zero-cost priority jobs). Workers that die (e.g., because their job got
+    cancelled) are replaced on demand.
+    """
+
+    def __init__(self, target, size):
+        self.target = target
+        self.size = size
+        self.workers = []
+
+    def start(self):
+        while len(self.workers) < self.size:
+            self.workers.append(PoolWorker(self.target))
+
+    def submit(self, descriptor):
+        worker = next((worker for worker in self.workers if worker.ident is None), None)
+        if worker is None:
+            worker = PoolWorker(self.target)
+            self.workers.append(worker)
+        worker.submit(descriptor)
+        return worker
+
+    def poll(self):
+        for worker in list(self.workers):
+            if not worker.poll():
+                worker.close()
+                self.workers.remove(worker)
+
+        idle = [worker for worker in self.workers if worker.ident is None]
+        for worker in idle[:max(len(self.workers) - self.size, 0)]:
+            worker.close()
+            self.workers.remove(worker)
+
+    def close(self):
+        for worker in self.workers:
+            worker.close()
+        self.workers = []
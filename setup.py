@@ -69,6 +69,7 @@ setup(
         ]
     },
     entry_points={
-        'console_scripts': ['fuzzinator = fuzzinator.executor:execute']
+        'console_scripts': ['fuzzinator = fuzzinator.executor:execute',
+                            'fuzzinator-worker = fuzzinator.remote:execute']
     }
 )
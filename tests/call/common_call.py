@@ -5,13 +5,31 @@
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
+import asyncio
 import os
+import signal
+import time
 
 
 blinesep = str.encode(os.linesep)
 resources_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'resources')
 
 
+def run_async(coro):
+    """
+    Run a coroutine to completion in a new event loop (asyncio.run is not
+    available before Python 3.7). The loop is set as the current one, since
+    the child watcher of subprocesses needs it before Python 3.8.
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
 def mock_always_fail_call(**kwargs):
     """
     Unconditionally return an issue dictionary composed of all the keyword
@@ -52,3 +70,17 @@ class MockNeverFailCall(object):
 
     def __call__(self, **kwargs):
         return None
+
+
+def mock_target(test):
+    """
+    Python function under test for in-process calls: raise an exception if
+    the test contains ``bar``, crash the process if it contains ``crash``, and
+    hang if it contains ``hang``.
+    """
+    if b'crash' in test:
+        os.kill(os.getpid(), signal.SIGSEGV)
+    if b'hang' in test:
+        time.sleep(60)
+    if b'bar' in test:
+        raise ValueError('bar found')
@@ -0,0 +1,58 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import os
+import pytest
+import sys
+
+import fuzzinator
+
+from common_call import resources_dir
+
+
+@pytest.mark.parametrize('command', [
+    '%s %s --fail-if-contains bar {tests}' % (sys.executable, os.path.join(resources_dir, 'mock_tool.py')),
+    '%s %s --fail-if-contains bar --file-list {filelist}' % (sys.executable, os.path.join(resources_dir, 'mock_tool.py')),
+])
+@pytest.mark.parametrize('tests, exp_failing', [
+    (['foo'], []),
+    (['bar'], [0]),
+    (['foo', 'baz', 'qux'], []),
+    (['foo', 'bar', 'baz', 'qux', 'bar'], [1, 4]),
+    ([b'bar', b'bar', b'bar'], [0, 1, 2]),
+])
+def test_batch_subprocess_call(command, tests, exp_failing):
+    with fuzzinator.call.BatchSubprocessCall(command=command) as call:
+        issues = call.call_batch(tests=tests)
+
+    assert len(issues) == len(tests)
+    assert [i for i, issue in enumerate(issues) if issue] == exp_failing
+    for i in exp_failing:
+        assert issues[i]['exit_code'] == 1
+        # The issue comes from the run of the single failing test.
+        assert len(issues[i]['stdout'].splitlines()) == 1
+
+
+@pytest.mark.parametrize('test, exp', [
+    ('foo', False),
+    ('bar', True),
+])
+def test_batch_subprocess_call_single(test, exp):
+    call = fuzzinator.call.BatchSubprocessCall(command='%s %s --fail-if-contains bar {tests}' % (sys.executable, os.path.join(resources_dir, 'mock_tool.py')))
+    assert bool(call(test=test)) == exp
+
+
+def test_batch_subprocess_call_decorated():
+    call_class = fuzzinator.call.RegexFilter(stdout='["(?P<file>test-[0-9]+)"]')(fuzzinator.call.BatchSubprocessCall)
+    with call_class(command='%s %s --fail-if-contains bar {tests}' % (sys.executable, os.path.join(resources_dir, 'mock_tool.py'))) as call:
+        issues = call.call_batch(tests=['foo', 'bar', 'baz'])
+
+    assert not issues[0] and not issues[2]
+    assert issues[1]['file'] == b'test-1'
+
+    # Decorators that may alter the input of the SUT call hide the batch protocol.
+    assert fuzzinator.call.FileWriterDecorator(filename='baz.txt')(fuzzinator.call.BatchSubprocessCall).call_batch is None
@@ -0,0 +1,119 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import os
+import pytest
+import struct
+import sys
+
+import fuzzinator
+
+from fuzzinator.call.core_dump_backtrace_decorator import core_location, is_core_file
+
+try:
+    import resource
+    core_dumps = core_location()[0] is not None and resource.getrlimit(resource.RLIMIT_CORE)[1] != 0
+except ImportError:
+    core_dumps = False
+
+
+def elf_header(e_type, little_endian=True):
+    return b'\x7fELF' + bytes([2, 1 if little_endian else 2, 1]) + b'\0' * 9 + struct.pack('<H' if little_endian else '>H', e_type) + b'\0' * 46
+
+
+@pytest.mark.parametrize('content, exp', [
+    (elf_header(4), True),
+    (elf_header(4, little_endian=False), True),
+    (elf_header(2), False),
+    (elf_header(3), False),
+    (b'core dumped\n', False),
+    (b'\x7fELF', False),
+    (b'', False),
+])
+def test_is_core_file(tmpdir, content, exp):
+    path = str(tmpdir.join('core'))
+    with open(path, 'wb') as f:
+        f.write(content)
+    assert is_core_file(path) == exp
+
+
+@pytest.mark.parametrize('exit_code, issue_cls, exp_core', [
+    (-6, dict, True),
+    (-6, fuzzinator.call.NonIssue, False),
+    (0, fuzzinator.call.NonIssue, False),
+])
+@pytest.mark.parametrize('core_prefix', ['core', ''])
+def test_core_dump_backtrace_decorator(tmpdir, exit_code, issue_cls, exp_core, core_prefix):
+    core_dir = tmpdir.mkdir('cores')
+    # Files that look like core dumps by name only must not be touched.
+    core_dir.join('core.log').write('log')
+    core_dir.mkdir('core_tests').join('core').write('test')
+
+    def mock_crash_call(test, **kwargs):
+        if exit_code:
+            with open(str(core_dir.join('core.42')), 'wb') as f:
+                f.write(elf_header(4))
+        core_dir.join('core.log').write('more log')
+        return issue_cls(exit_code=exit_code)
+
+    dec_kwargs = dict(command='%s -c pass' % sys.executable, dump_dir=str(tmpdir.join('dump')))
+    if core_prefix:
+        # The kernel's pattern is not known in advance, so its prefix is
+        # emulated with the cwd of the SUT (if it's 'core').
+        if core_location()[1] != core_prefix:
+            pytest.skip('core pattern is not "core"')
+        dec_kwargs['cwd'] = str(core_dir)
+    else:
+        dec_kwargs['core_dir'] = str(core_dir)
+
+    call = fuzzinator.call.CoreDumpBacktraceDecorator(**dec_kwargs)(mock_crash_call)
+
+    issue = call(test='foo')
+    assert ('core_dump' in issue) == exp_core
+    assert sorted(os.listdir(str(core_dir))) == ['core.log', 'core_tests']
+    assert core_dir.join('core.log').read() == 'more log'
+    assert os.listdir(str(core_dir.join('core_tests'))) == ['core']
+
+    if exp_core:
+        core_dump = issue['core_dump']
+        assert os.path.dirname(core_dump['path']) == str(tmpdir.join('dump'))
+        assert is_core_file(core_dump['path'])
+        assert core_dump['command'][0] == 'gdb'
+        assert core_dump['command'][-2:] == [sys.executable, '{core}']
+
+        # Core dumps not claimed by a job are removed by the next call.
+        call(test='bar')
+        assert not os.path.exists(core_dump['path'])
+
+
+@pytest.mark.skipif(not core_dumps, reason='core dumps are not available')
+@pytest.mark.parametrize('command, exp_issue, exp_core', [
+    ('%s -c "import os; os.abort()"' % sys.executable, True, True),
+    ('%s -c "import os; os.abort()"' % sys.executable, False, False),
+    ('%s -c "import sys; sys.exit(1)"' % sys.executable, True, False),
+    ('%s -c "pass"' % sys.executable, False, False),
+])
+def test_core_dump_backtrace_decorator_subprocess(tmpdir, command, exp_issue, exp_core):
+    cwd = str(tmpdir.mkdir('cwd'))
+    dump_dir = str(tmpdir.join('dump'))
+    call = fuzzinator.call.CoreDumpBacktraceDecorator(command=command, cwd=cwd, dump_dir=dump_dir)(
+        fuzzinator.call.ExitCodeFilter(exit_codes='[-6, 1]' if exp_issue else '[0]')(fuzzinator.call.SubprocessCall))
+
+    # The limit of the current process is not raised, only that of the SUT.
+    limit = resource.getrlimit(resource.RLIMIT_CORE)
+    resource.setrlimit(resource.RLIMIT_CORE, (0, limit[1]))
+    try:
+        issue = call(command=command, cwd=cwd, test='foo')
+        assert resource.getrlimit(resource.RLIMIT_CORE) == (0, limit[1])
+    finally:
+        resource.setrlimit(resource.RLIMIT_CORE, limit)
+
+    assert bool(issue) == exp_issue
+    assert ('core_dump' in issue) == exp_core
+    assert os.listdir(cwd) == []
+    if exp_core:
+        assert is_core_file(issue['core_dump']['path'])
@@ -5,6 +5,7 @@
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
+import asyncio
 import inspect
 import os
 import pytest
@@ -12,7 +13,7 @@ import re
 
 import fuzzinator
 
-from common_call import mock_always_fail_call, mock_never_fail_call, MockAlwaysFailCall, MockNeverFailCall
+from common_call import mock_always_fail_call, mock_never_fail_call, MockAlwaysFailCall, MockNeverFailCall, run_async
 
 
 @pytest.mark.parametrize('call_init_kwargs, call_kwargs', [
@@ -48,3 +49,21 @@ def test_file_writer_decorator(call, call_init_kwargs, call_kwargs, dec_kwargs,
         del out['test']
 
     assert out == exp
+
+
+def test_file_writer_decorator_async(tmpdir):
+    async def call(**kwargs):
+        with open(kwargs['test'], 'rb') as f:
+            return {'content': f.read(), 'test': kwargs['test']}
+    call.async_call = call
+
+    call = fuzzinator.call.FileWriterDecorator(filename=os.path.join('%s' % tmpdir, 'baz{uid}.txt'))(call)
+
+    async def run():
+        return await asyncio.gather(*[call.async_call(test=test) for test in [b'foo', b'bar', b'qux']])
+
+    outs = run_async(run())
+    assert [out['content'] for out in outs] == [b'foo', b'bar', b'qux']
+    # Concurrent calls use distinct files, which are removed afterwards.
+    assert len({out['test'] for out in outs}) == 3
+    assert not any(os.path.exists(out['test']) for out in outs)
@@ -0,0 +1,81 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import os
+import pytest
+import signal
+import sys
+
+import fuzzinator
+
+from common_call import blinesep, resources_dir
+
+
+@pytest.mark.parametrize('command', [
+    '%s %s {test}' % (sys.executable, os.path.join(resources_dir, 'mock_forkserver.py')),
+    '%s %s' % (sys.executable, os.path.join(resources_dir, 'mock_forkserver.py')),
+])
+@pytest.mark.parametrize('tests, exp', [
+    ([b'foo'], [fuzzinator.call.NonIssue({'exit_code': 0, 'stdout': b'foo' + blinesep, 'stderr': b''})]),
+    ([b'fail'], [{'exit_code': 1, 'stdout': b'fail' + blinesep, 'stderr': b''}]),
+    ([b'foo', b'crash', b'barbaz', 'fail'], [fuzzinator.call.NonIssue({'exit_code': 0, 'stdout': b'foo' + blinesep, 'stderr': b''}),
+                                             {'exit_code': -signal.SIGSEGV, 'stdout': b'crash' + blinesep, 'stderr': b''},
+                                             fuzzinator.call.NonIssue({'exit_code': 0, 'stdout': b'barbaz' + blinesep, 'stderr': b''}),
+                                             {'exit_code': 1, 'stdout': b'fail' + blinesep, 'stderr': b''}]),
+])
+def test_forkserver_call(command, tests, exp):
+    with fuzzinator.call.ForkserverCall(command=command) as call:
+        pid = call.proc.pid
+        assert [call(test=test) for test in tests] == exp
+        # The fork server survives the crashes of its children.
+        assert call.alive and call.proc.pid == pid
+        assert call.execs == len(tests)
+
+
+def test_forkserver_call_timeout():
+    with fuzzinator.call.ForkserverCall(command='%s %s {test}' % (sys.executable, os.path.join(resources_dir, 'mock_forkserver.py')), timeout='0.5') as call:
+        assert call(test=b'hang') is None
+        assert call(test=b'fail') == {'exit_code': 1, 'stdout': b'fail' + blinesep, 'stderr': b''}
+
+
+def test_forkserver_call_restart():
+    with fuzzinator.call.ForkserverCall(command='%s %s {test}' % (sys.executable, os.path.join(resources_dir, 'mock_forkserver.py'))) as call:
+        fuzzinator.Controller.kill_process_tree(call.proc.pid)
+        call.proc.wait()
+        assert not call.alive
+        assert call(test=b'fail') == {'exit_code': 1, 'stdout': b'fail' + blinesep, 'stderr': b''}
+        assert call.alive
+
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self/fd'), reason='requires procfs')
+def test_forkserver_call_fds():
+    with fuzzinator.call.ForkserverCall(command='%s %s {test}' % (sys.executable, os.path.join(resources_dir, 'mock_forkserver.py'))) as call:
+        # Only the standard streams and the descriptors of the protocol are
+        # inherited by the fork server.
+        assert sorted(int(fd) for fd in os.listdir('/proc/{pid}/fd'.format(pid=call.proc.pid))) == [0, 1, 2, 198, 199]
+
+
+def test_forkserver_call_no_forkserver():
+    # SUTs that do not implement the protocol are not supported.
+    with fuzzinator.call.ForkserverCall(command='%s -c pass' % sys.executable, init_timeout='5') as call:
+        assert not call.alive
+        assert call(test=b'foo') is None
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='the shim requires LD_PRELOAD')
+@pytest.mark.parametrize('command', [
+    '%s %s --print-args --fail-if-contains fail {test}' % (sys.executable, os.path.join(resources_dir, 'mock_tool.py')),
+    '%s %s --echo-stdin --exit-code 1' % (sys.executable, os.path.join(resources_dir, 'mock_tool.py')),
+])
+def test_forkserver_call_shim(command):
+    # Arbitrary SUTs are run with the shim.
+    with fuzzinator.call.ForkserverCall(command=command, shim='True') as call:
+        pid = call.proc.pid
+        issues = [call(test=test) for test in [b'foo', b'fail', b'fail']]
+        assert [bool(issue) for issue in issues] == ['{test}' not in command, True, True]
+        assert call.alive and call.proc.pid == pid
+        assert call.execs == 3
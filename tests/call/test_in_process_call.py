@@ -0,0 +1,52 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import pytest
+import signal
+
+import fuzzinator
+
+
+@pytest.mark.parametrize('subprocess', [None, 'True'])
+@pytest.mark.parametrize('test, exp', [
+    (b'foo', None),
+    (b'bar', {'exception': 'ValueError', 'message': 'bar found'}),
+])
+def test_in_process_call(subprocess, test, exp):
+    with fuzzinator.call.InProcessCall(target='common_call.mock_target', subprocess=subprocess) as call:
+        issue = call(test=test)
+
+    if exp is None:
+        assert issue is None
+    else:
+        assert {key: issue[key] for key in exp} == exp
+        assert issue['id'].startswith('ValueError common_call.py:')
+        assert issue['id'].endswith('(mock_target)')
+        assert 'Traceback' in issue['traceback']
+
+
+def test_in_process_call_subprocess():
+    with fuzzinator.call.InProcessCall(target='common_call.mock_target', subprocess='True', recycle='2', timeout='0.5') as call:
+        pid = call.proc.pid
+        assert call(test=b'foo') is None
+        assert call(test=b'bar')['exception'] == 'ValueError'
+        assert call.proc.pid == pid
+
+        # Recycled after 2 tests.
+        assert call(test=b'foo') is None
+        assert call.proc.pid != pid
+
+        # Hard crash.
+        issue = call(test=b'crash')
+        assert issue['exit_code'] == -signal.SIGSEGV
+        assert issue['id'] == 'Crash of mock_target with signal SIGSEGV'
+        assert not call.alive
+        assert call(test=b'bar')['exception'] == 'ValueError'
+
+        # Timeout.
+        assert call(test=b'hang') is None
+        assert call(test=b'foo') is None
@@ -0,0 +1,105 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import gzip
+import os
+import pytest
+import re
+import sys
+
+import fuzzinator
+
+from fuzzinator.call.output_capture import CapturePolicy, OutputCapture, search_spill_file
+
+from common_call import run_async
+
+
+@pytest.mark.parametrize('chunks, limit, exp', [
+    ([b'foo', b'bar'], 6, b'foobar'),
+    ([b'foo', b'bar'], 10, b'foobar'),
+    ([b'foo', b'bar', b'baz'], 6, b'foo\n[... 3 bytes omitted ...]\nbaz'),
+    ([b'0123456789'] * 10, 8, b'0123\n[... 92 bytes omitted ...]\n6789'),
+    ([b'0123456789' * 10], 8, b'0123\n[... 92 bytes omitted ...]\n6789'),
+])
+def test_output_capture(chunks, limit, exp):
+    capture = OutputCapture('stdout', limit)
+    for chunk in chunks:
+        capture.write(chunk)
+    capture.close()
+
+    assert capture.getvalue() == exp
+    assert capture.size == sum(len(chunk) for chunk in chunks)
+    assert capture.path is None
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_output_capture_spill(tmpdir, compress):
+    chunks = [b'line %d\n' % i for i in range(10000)]
+    capture = OutputCapture('stdout', 64, spill_dir=str(tmpdir), compress=compress)
+    for chunk in chunks:
+        capture.write(chunk)
+    capture.close()
+
+    assert capture.path.startswith(str(tmpdir))
+    with (gzip.open if compress else open)(capture.path, 'rb') as f:
+        assert f.read() == b''.join(chunks)
+
+    assert search_spill_file(re.compile(rb'line 5000\n'), capture.path, chunk_size=100).group() == b'line 5000\n'
+    assert search_spill_file(re.compile(rb'line 4999\nline 5000'), capture.path, chunk_size=100) is not None
+    assert search_spill_file(re.compile(rb'line 10000'), capture.path, chunk_size=100) is None
+
+    capture.discard()
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_output_capture_no_spill(tmpdir):
+    capture = OutputCapture('stdout', 64, spill_dir=str(tmpdir))
+    capture.write(b'foo')
+    capture.close()
+
+    assert capture.path is None
+    assert os.listdir(str(tmpdir)) == []
+
+
+@pytest.mark.parametrize('asynchronous', [False, True])
+@pytest.mark.parametrize('call', ['SubprocessCall', 'StdinSubprocessCall'])
+def test_subprocess_call_capture(tmpdir, call, asynchronous):
+    command = '%s -c "import sys; sys.stdout.write(\'x\\\\n\' * 50000 + \'MID\\\\n\' + \'x\\\\n\' * 50000 + \'END\'); sys.stderr.write(\'err\'); sys.exit(1)"' % sys.executable
+    call = getattr(fuzzinator.call, call)
+    call = call.async_call if asynchronous else call
+    out = call(command, test=b'foo', capture_limit='1K', capture_dir=str(tmpdir), capture_compress='True')
+    if asynchronous:
+        out = run_async(out)
+
+    assert out['exit_code'] == 1
+    assert out['stdout'] == b'x\n' * 256 + b'\n[... 198983 bytes omitted ...]\n\n' + b'x\n' * 254 + b'END'
+    assert out['stderr'] == b'err'
+    assert 'stderr_file' not in out
+    with gzip.open(out['stdout_file'], 'rb') as f:
+        assert f.read() == b'x\n' * 50000 + b'MID\n' + b'x\n' * 50000 + b'END'
+
+    out = fuzzinator.call.RegexFilter(stdout='["(?P<msg>x\\\\nMID)"]')(lambda **kwargs: out)()
+    assert out['msg'] == b'x\nMID'
+
+    out = fuzzinator.call.RegexFilter(stdout='["(?P<msg>FOO)"]')(lambda **kwargs: out)()
+    assert not out
+    assert os.listdir(str(tmpdir)) == []
+
+
+@pytest.mark.skipif(not hasattr(fuzzinator.call, 'StreamMonitoredSubprocessCall'),
+                    reason='platform-dependent component')
+def test_stream_monitored_subprocess_call_capture():
+    command = '%s -c "import sys; sys.stdout.write(\'x\\\\n\' * 100000 + \'{test}\\\\n\')"' % sys.executable
+    out = fuzzinator.call.StreamMonitoredSubprocessCall(command, end_patterns='["(?P<bar>x\\\\nfo+)"]', overlap='16', capture_limit='64')(test='foo')
+
+    assert out['bar'] == b'x\nfoo'
+    assert out['stdout'] == b'x\n' * 16 + b'\n[... 199940 bytes omitted ...]\n' + b'x\n' * 14 + b'foo\n'
+
+
+def test_capture_policy():
+    assert CapturePolicy.from_config() is None
+    assert CapturePolicy.from_config(capture_limit='4K').limit == 4096
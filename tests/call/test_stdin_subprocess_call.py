@@ -11,7 +11,7 @@ import sys
 
 import fuzzinator
 
-from common_call import blinesep, resources_dir
+from common_call import blinesep, resources_dir, run_async
 
 
 @pytest.mark.parametrize('command, cwd, env, no_exit_code, test, exp', [
@@ -22,5 +22,10 @@ from common_call import blinesep, resources_dir
     ('%s %s --print-env BAR --echo-stdin --exit-code 1' % (sys.executable, os.path.join('.', 'mock_tool.py')), resources_dir, '{"BAR": "baz"}', None, b'foo', {'stdout': b'baz' + blinesep + b'foo', 'stderr': b'', 'exit_code': 1}),
     ('%s %s --echo-stdin --exit-code 0' % (sys.executable, os.path.join(resources_dir, 'mock_tool.py')), None, None, 'True', b'foo', {'stdout': b'foo', 'stderr': b'', 'exit_code': 0}),
     ])
-def test_stdin_subprocess_call(command, cwd, env, no_exit_code, test, exp):
-    assert fuzzinator.call.StdinSubprocessCall(command, cwd=cwd, env=env, no_exit_code=no_exit_code, test=test) == exp
+@pytest.mark.parametrize('asynchronous', [False, True])
+def test_stdin_subprocess_call(command, cwd, env, no_exit_code, test, exp, asynchronous):
+    call = fuzzinator.call.StdinSubprocessCall.async_call if asynchronous else fuzzinator.call.StdinSubprocessCall
+    out = call(command, cwd=cwd, env=env, no_exit_code=no_exit_code, test=test)
+    if asynchronous:
+        out = run_async(out)
+    assert out == exp
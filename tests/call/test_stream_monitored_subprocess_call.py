@@ -8,6 +8,7 @@
 import os
 import pytest
 import sys
+import time
 
 import fuzzinator
 
@@ -23,6 +24,8 @@ from common_call import blinesep, resources_dir
     ('%s %s --print-args --to-stderr --exit-code 1 42 {test}' % (sys.executable, os.path.join(resources_dir, 'mock_tool.py')), None, None, '["(?P<bar>[a-z]+)"]', 'foo', {'stdout': b'', 'stderr': b'42' + blinesep + b'foo' + blinesep, 'bar': b'foo'}),
     ('%s %s --print-args --print-env FOO --exit-code 1 42 {test}' % (sys.executable, os.path.join('.', 'mock_tool.py')), resources_dir, '{"FOO": "baz"}', '["(?P<bar>[a-z]+)"]', '42', {'stdout': b'42' + blinesep + b'42' + blinesep + b'baz' + blinesep, 'stderr': b'', 'bar': b'baz'}),
     ('%s %s --print-args --exit-code 1 42 {test}' % (sys.executable, os.path.join(resources_dir, 'mock_tool.py')), None, None, '["(?P<bar>[a-z]+)"]', '42', None),
+    ('%s %s --print-args 42 {test}' % (sys.executable, os.path.join(resources_dir, 'mock_tool.py')), None, None, '["(?P<bar>42\\\\s+foo)"]', 'foo', {'stdout': b'42' + blinesep + b'foo' + blinesep, 'stderr': b'', 'bar': b'42' + blinesep + b'foo'}),
+    ('%s -c "import sys; sys.stdout.write(\'x\\\\n\' * 100000 + \'{test}\')"' % sys.executable, None, None, '["(?P<bar>fo+)"]', 'foo', {'stdout': b'x\n' * 100000 + b'foo', 'stderr': b'', 'bar': b'foo'}),
 ])
 def test_stream_monitored_subprocess_call(command, cwd, env, end_patterns, test, exp):
     out = fuzzinator.call.StreamMonitoredSubprocessCall(command, cwd=cwd, env=env, end_patterns=end_patterns)(test=test)
@@ -31,3 +34,15 @@ def test_stream_monitored_subprocess_call(command, cwd, env, end_patterns, test,
         del out['exit_code']
 
     assert out == exp
+
+
+@pytest.mark.skipif(not hasattr(fuzzinator.call, 'StreamMonitoredSubprocessCall'),
+                    reason='platform-dependent component')
+def test_stream_monitored_subprocess_call_partial_line():
+    # The end pattern is matched even if the SUT gets stuck without finishing
+    # the line.
+    command = '%s -c "import sys, time; sys.stdout.write(\'x\\\\n\' * 100000 + \'{test}\'); sys.stdout.flush(); time.sleep(30)"' % sys.executable
+    start = time.time()
+    out = fuzzinator.call.StreamMonitoredSubprocessCall(command, end_patterns='["(?P<bar>fo+)"]', timeout=30)(test='foo')
+    assert time.time() - start < 15
+    assert out == {'exit_code': None, 'stdout': b'x\n' * 100000 + b'foo', 'stderr': b'', 'bar': b'foo'}
@@ -11,7 +11,7 @@ import sys
 
 import fuzzinator
 
-from common_call import blinesep, resources_dir
+from common_call import blinesep, resources_dir, run_async
 
 
 @pytest.mark.parametrize('command, cwd, env, no_exit_code, test, exp', [
@@ -21,6 +21,13 @@ from common_call import blinesep, resources_dir
     ('%s %s --print-args --exit-code 1 {test}' % (sys.executable, os.path.join('.', 'mock_tool.py')), resources_dir, None, None, 'foo', {'stdout': b'foo' + blinesep, 'stderr': b'', 'exit_code': 1}),
     ('%s %s --print-env BAR --print-args --exit-code 1 {test}' % (sys.executable, os.path.join('.', 'mock_tool.py')), resources_dir, '{"BAR": "baz"}', None, 'foo', {'stdout': b'foo' + blinesep + b'baz' + blinesep, 'stderr': b'', 'exit_code': 1}),
     ('%s %s --print-args --exit-code 0 {test}' % (sys.executable, os.path.join(resources_dir, 'mock_tool.py')), None, None, 'True', 'foo', {'stdout': b'foo' + blinesep, 'stderr': b'', 'exit_code': 0}),
+    ('%s %s --print-args --exit-code 1 x{test}x "{test} bar"' % (sys.executable, os.path.join(resources_dir, 'mock_tool.py')), None, None, None, 'foo', {'stdout': b'xfoox' + blinesep + b'foo bar' + blinesep, 'stderr': b'', 'exit_code': 1}),
+    ('%s %s --print-args --exit-code 1 {test}' % (sys.executable, os.path.join(resources_dir, 'mock_tool.py')), None, None, None, 'foo "bar baz"', {'stdout': b'foo' + blinesep + b'bar baz' + blinesep, 'stderr': b'', 'exit_code': 1}),
 ])
-def test_subprocess_call(command, cwd, env, no_exit_code, test, exp):
-    assert fuzzinator.call.SubprocessCall(command, cwd=cwd, env=env, no_exit_code=no_exit_code, test=test) == exp
+@pytest.mark.parametrize('asynchronous', [False, True])
+def test_subprocess_call(command, cwd, env, no_exit_code, test, exp, asynchronous):
+    call = fuzzinator.call.SubprocessCall.async_call if asynchronous else fuzzinator.call.SubprocessCall
+    out = call(command, cwd=cwd, env=env, no_exit_code=no_exit_code, test=test)
+    if asynchronous:
+        out = run_async(out)
+    assert out == exp
@@ -24,6 +24,8 @@ from common_call import blinesep, resources_dir, mock_always_fail_call, mock_nev
     (mock_always_fail_call, {'property': 'baz', 'command': '%s %s --print-env QUX' % (sys.executable, os.path.join('.', 'mock_tool.py')), 'cwd': resources_dir, 'env': '{"QUX": "qux"}'}, {'foo': b'bar', 'baz': b'qux' + blinesep}),
 
     (mock_never_fail_call, {'property': 'baz', 'command': '%s %s --print-env QUX' % (sys.executable, os.path.join('.', 'mock_tool.py')), 'cwd': resources_dir, 'env': '{"QUX": "qux"}'}, None),
+    # Braces in the command are not replacement fields.
+    (mock_always_fail_call, {'property': 'baz', 'command': '%s %s --print-args {qux}' % (sys.executable, os.path.join(resources_dir, 'mock_tool.py'))}, {'foo': b'bar', 'baz': b'{qux}' + blinesep}),
 
     (MockAlwaysFailCall, {'property': 'baz', 'command': '%s %s --print-args qux' % (sys.executable, os.path.join(resources_dir, 'mock_tool.py'))}, {'init_foo': b'init_bar', 'foo': b'bar', 'baz': b'qux' + blinesep}),
     (MockAlwaysFailCall, {'property': 'baz', 'command': '%s %s --print-args qux' % (sys.executable, os.path.join('.', 'mock_tool.py')), 'cwd': resources_dir}, {'init_foo': b'init_bar', 'foo': b'bar', 'baz': b'qux' + blinesep}),
@@ -0,0 +1,64 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import os
+import pytest
+import sys
+
+import fuzzinator
+
+from common_call import blinesep, resources_dir
+
+mock_test_runner = '%s %s' % (sys.executable, os.path.join(resources_dir, 'mock_test_runner.py'))
+
+
+@pytest.mark.skipif(not hasattr(fuzzinator.call, 'TestRunnerSubprocessCall'),
+                    reason='platform-dependent component')
+@pytest.mark.parametrize('pipeline', [None, '1', '4'])
+@pytest.mark.parametrize('command, init_wait, tests, exp_end, exp_failing, exp_crashing', [
+    ('%s --fail-if-contains bar' % mock_test_runner, None, ['foo', 'bar', 'baz', 'bar', 'qux'], b'END', [1, 3], []),
+    ('%s --ready READY --end READY --fail-if-contains bar' % mock_test_runner, 'True', ['bar', 'foo', 'bar'], b'READY', [0, 2], []),
+    ('%s --fail-if-contains bar --crash-if-contains baz' % mock_test_runner, None, ['foo', 'baz', 'bar', 'baz', 'baz', 'qux', 'bar'], b'END', [2, 6], [1, 3, 4]),
+])
+def test_test_runner_subprocess_call(pipeline, command, init_wait, tests, exp_end, exp_failing, exp_crashing):
+    with fuzzinator.call.TestRunnerSubprocessCall(command, end_texts='["END", "READY"]', init_wait=init_wait, pipeline=pipeline) as call:
+        issues = call.call_batch(tests=tests)
+
+    assert len(issues) == len(tests)
+    for i, (test, issue) in enumerate(zip(tests, issues)):
+        # Every test gets its own output on the stream with the end texts.
+        assert issue['stdout'] == test.encode('utf-8') + blinesep + (exp_end if i not in exp_crashing else b'')
+        assert issue['exit_code'] == (1 if i in exp_crashing else None)
+
+    # The output of the other stream can be attributed to the tests exactly
+    # only if they are not pipelined.
+    exp_stderr = [test.encode('utf-8') + blinesep if i in exp_failing else b'' for i, test in enumerate(tests)]
+    if pipeline in [None, '1']:
+        assert [issue['stderr'] for issue in issues] == exp_stderr
+    else:
+        assert b''.join(issue['stderr'] for issue in issues) == b''.join(exp_stderr)
+
+
+@pytest.mark.skipif(not hasattr(fuzzinator.call, 'TestRunnerSubprocessCall'),
+                    reason='platform-dependent component')
+@pytest.mark.parametrize('pipeline', [None, '4'])
+def test_test_runner_subprocess_call_timeout(pipeline):
+    tests = ['foo', 'baz', 'bar', 'qux']
+    with fuzzinator.call.TestRunnerSubprocessCall('%s --hang-if-contains baz --fail-if-contains bar' % mock_test_runner, end_texts='["END"]', timeout_per_test='1', pipeline=pipeline) as call:
+        issues = [call(test=test) for test in tests] if pipeline is None else call.call_batch(tests=tests)
+
+    assert [issue['stdout'] for issue in issues] == [b'foo' + blinesep + b'END', b'baz' + blinesep, b'bar' + blinesep + b'END', b'qux' + blinesep + b'END']
+    assert [issue['stderr'] for issue in issues] == [b'', b'', b'bar' + blinesep, b'']
+
+
+@pytest.mark.skipif(not hasattr(fuzzinator.call, 'TestRunnerSubprocessCall'),
+                    reason='platform-dependent component')
+def test_test_runner_subprocess_call_error(tmpdir):
+    # A runner that cannot be started yields no issue.
+    call = fuzzinator.call.TestRunnerSubprocessCall(str(tmpdir.join('missing_runner')), end_texts='["END"]')
+    assert call(test='foo') is None
+    call.stop()
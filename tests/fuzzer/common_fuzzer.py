@@ -35,3 +35,15 @@ class MockRepeatingFuzzer(object):
 
         self._i += 1
         return self._test
+
+
+class MockRepeatingBatchFuzzer(MockRepeatingFuzzer):
+    """
+    Same as :class:`MockRepeatingFuzzer` but also implements the batch
+    protocol.
+    """
+
+    def generate_batch(self, *, n, **kwargs):
+        n = min(n, self._n - self._i)
+        self._i += n
+        return [self._test] * n
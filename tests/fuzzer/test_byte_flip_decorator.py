@@ -10,7 +10,7 @@ import pytest
 
 import fuzzinator
 
-from common_fuzzer import mock_exhausted_fuzzer, MockRepeatingFuzzer
+from common_fuzzer import mock_exhausted_fuzzer, MockRepeatingBatchFuzzer, MockRepeatingFuzzer
 
 
 @pytest.mark.parametrize('fuzzer, fuzzer_init_kwargs, dec_kwargs, exp_flip_cnt', [
@@ -47,3 +47,26 @@ def test_byte_flip_decorator(fuzzer, fuzzer_init_kwargs, dec_kwargs, exp_flip_cn
         assert len(flips) == exp_flip_cnt
 
         index += 1
+
+
+@pytest.mark.parametrize('fuzzer_init_kwargs, dec_kwargs, n, exp_flip_cnt', [
+    ({'test': b'\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F', 'n': 10}, {'frequency': '4'}, 3, 4),
+    ({'test': b'\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F\x7F', 'n': 10}, {'frequency': '100'}, 20, 1),
+    ({'test': b'  ', 'n': 10}, {'frequency': '2', 'min_byte': '32', 'max_byte': '32'}, 5, 0),
+])
+def test_byte_flip_decorator_batch(fuzzer_init_kwargs, dec_kwargs, n, exp_flip_cnt):
+    fuzzer = fuzzinator.fuzzer.ByteFlipDecorator(**dec_kwargs)(MockRepeatingBatchFuzzer)(**fuzzer_init_kwargs)
+
+    tests = []
+    while True:
+        batch = fuzzer.generate_batch(index=len(tests), n=n)
+        tests.extend(batch)
+        if len(batch) < n:
+            break
+
+    assert len(tests) == fuzzer_init_kwargs['n']
+    orig_test = fuzzer_init_kwargs['test']
+    for test in tests:
+        flips = [i for i in range(len(orig_test)) if orig_test[i] != test[i]]
+        assert len(flips) == exp_flip_cnt
+
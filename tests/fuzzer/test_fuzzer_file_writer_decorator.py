@@ -12,7 +12,7 @@ import re
 
 import fuzzinator
 
-from common_fuzzer import mock_exhausted_fuzzer, MockRepeatingFuzzer
+from common_fuzzer import mock_exhausted_fuzzer, MockRepeatingBatchFuzzer, MockRepeatingFuzzer
 
 
 @pytest.mark.parametrize('fuzzer, fuzzer_init_kwargs, dec_kwargs, exp', [
@@ -42,3 +42,9 @@ def test_file_writer_decorator(fuzzer, fuzzer_init_kwargs, dec_kwargs, exp, tmpd
     else:
         assert re.search(pattern=dec_kwargs['filename'].format(uid='.*') + '$', string=out) is not None
         assert not os.path.exists(out)
+
+
+def test_file_writer_decorator_batch():
+    # Tests of batching fuzzers must go through the decorator, too.
+    fuzzer = fuzzinator.fuzzer.FileWriterDecorator(filename='baz.txt')(MockRepeatingBatchFuzzer)
+    assert fuzzer.generate_batch is None
@@ -36,3 +36,24 @@ def test_list_directory(pattern, contents, exp):
             index += 1
 
     assert tests == exp
+
+
+@pytest.mark.parametrize('pattern, n, exp', [
+    (join(mock_tests, '*'), 1, {b'foo\n', b'bar\n', b'baz\n'}),
+    (join(mock_tests, '*'), 2, {b'foo\n', b'bar\n', b'baz\n'}),
+    (join(mock_tests, '**', '*'), 10, {b'foo\n', b'bar\n', b'baz\n', b'qux\n'}),
+])
+def test_list_directory_batch(pattern, n, exp):
+    fuzzer = fuzzinator.fuzzer.ListDirectory(pattern=pattern)
+    with fuzzer:
+        tests = []
+        index = 0
+        while True:
+            batch = fuzzer.generate_batch(index=index, n=n)
+            tests.extend(batch)
+            index += len(batch)
+            if len(batch) < n:
+                break
+
+    assert len(tests) == len(exp)
+    assert set(tests) == exp
@@ -20,3 +20,15 @@ def test_random_content(fuzzer_kwargs, exp_min_len, exp_max_len):
         out = fuzzinator.fuzzer.RandomContent(index=index, **fuzzer_kwargs)
         out_len = len(out)
         assert out_len >= exp_min_len and out_len <= exp_max_len
+
+
+@pytest.mark.parametrize('fuzzer_kwargs, n, exp_min_len, exp_max_len', [
+    ({}, 100, 1, 1),
+    ({'max_length': '100'}, 100, 1, 100),
+    ({'min_length': '10', 'max_length': '100'}, 10, 10, 100),
+])
+def test_random_content_batch(fuzzer_kwargs, n, exp_min_len, exp_max_len):
+    out = fuzzinator.fuzzer.RandomContent.generate_batch(index=0, n=n, **fuzzer_kwargs)
+    assert len(out) == n
+    for test in out:
+        assert len(test) >= exp_min_len and len(test) <= exp_max_len
@@ -0,0 +1,48 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+
+class MockDriver(object):
+    """
+    In-memory stand-in of the database driver for the jobs.
+    """
+
+    def __init__(self):
+        self.issues = dict()
+        self.updates = []
+        self.stats = []
+
+    def add_issue(self, issue):
+        key = (issue['sut'], issue['id'])
+        new = key not in self.issues
+        if new:
+            self.issues[key] = dict(issue, _id=len(self.issues))
+        issue.update(self.issues[key])
+        return new
+
+    def update_issue_by_oid(self, oid, _set):
+        self.updates.append((oid, _set))
+        for issue in self.issues.values():
+            if issue['_id'] == oid:
+                issue.update(_set)
+
+    def update_stats(self, stats):
+        self.stats.append(stats)
+
+
+class MockListener(object):
+    """
+    Listener that records the events it receives.
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def __getattr__(self, name):
+        def event(**kwargs):
+            self.events.append((name, kwargs))
+        return event
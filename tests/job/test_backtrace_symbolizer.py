@@ -0,0 +1,70 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import os
+import sys
+
+from fuzzinator.job.backtrace_symbolizer import BacktraceSymbolizer
+
+from common_job import MockDriver, MockListener
+
+
+def core_dump(tmpdir, name, script, timeout=None):
+    path = str(tmpdir.join(name))
+    with open(path, 'wb') as f:
+        f.write(b'core of ' + name.encode('utf-8'))
+    return dict(path=path, command=[sys.executable, '-c', script, '{core}'], cwd=str(tmpdir), env=None, timeout=timeout)
+
+
+# Stand-in of a debugger that prints the content of the core dump.
+print_core = 'import sys; sys.stdout.write(open(sys.argv[1]).read())'
+
+
+def test_backtrace_symbolizer(tmpdir):
+    db, listener = MockDriver(), MockListener()
+    symbolizer = BacktraceSymbolizer(db, listener, ident=42)
+
+    issues = [dict(_id=i, id=str(i)) for i in range(3)]
+    symbolizer.submit(issues[0], core_dump(tmpdir, 'core.0', print_core))
+    symbolizer.submit(issues[1], core_dump(tmpdir, 'core.1', 'import time; time.sleep(0.5)'))
+    # Core dumps that disappeared (e.g., removed by the decorator) are skipped.
+    symbolizer.submit(issues[2], dict(core_dump(tmpdir, 'core.2', print_core), path=str(tmpdir.join('missing'))))
+
+    # The core dumps are claimed by the symbolizer.
+    assert sorted(os.listdir(str(tmpdir))) == ['core.0.symbolizing', 'core.1.symbolizing', 'core.2']
+
+    # Nothing is stored before the symbolization is complete.
+    symbolizer.collect()
+    assert all(oid != 1 for oid, _ in db.updates)
+
+    symbolizer.close()
+    assert db.updates == [(0, {'backtrace': b'core of core.0'})]
+    assert issues[0]['backtrace'] == b'core of core.0'
+    assert 'backtrace' not in issues[1]
+    assert listener.events == [('update_issue', dict(ident=42, issue=issues[0]))]
+    assert os.listdir(str(tmpdir)) == ['core.2']
+
+
+def test_backtrace_symbolizer_timeout(tmpdir):
+    db, listener = MockDriver(), MockListener()
+    symbolizer = BacktraceSymbolizer(db, listener, ident=42)
+
+    issue = dict(_id=0, id='0')
+    symbolizer.submit(issue, core_dump(tmpdir, 'core', 'import time; time.sleep(10)', timeout='1'))
+    symbolizer.close()
+
+    assert db.updates == []
+    assert listener.events == []
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_backtrace_symbolizer_discard(tmpdir):
+    symbolizer = BacktraceSymbolizer(MockDriver(), MockListener(), ident=42)
+    symbolizer.discard(core_dump(tmpdir, 'core', print_core))
+    symbolizer.close()
+
+    assert os.listdir(str(tmpdir)) == []
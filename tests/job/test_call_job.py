@@ -0,0 +1,40 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import os
+
+from fuzzinator.job.call_job import CallJob
+
+from common_job import MockDriver, MockListener
+
+
+def test_call_job_spill_files(tmpdir):
+    def issue(name):
+        paths = dict()
+        for stream in ['stdout', 'stderr']:
+            path = str(tmpdir.join('{name}-{stream}'.format(name=name, stream=stream)))
+            with open(path, 'wb') as f:
+                f.write(b'foo')
+            paths[stream + '_file'] = path
+        return dict(id='foo', test=b'foo', **paths)
+
+    job = CallJob(id=0, config=None, subconfig_id=None, sut_name='foo', fuzzer_name='bar', db=MockDriver(), listener=MockListener())
+    new_issues = []
+
+    # The files of a new issue are kept.
+    job.add_issue(issue('first'), new_issues=new_issues)
+    assert len(new_issues) == 1
+    assert sorted(os.listdir(str(tmpdir))) == ['first-stderr', 'first-stdout']
+
+    # The files of a known issue are removed (but not those of the stored
+    # issue, which the properties of the known issue refer to).
+    duplicate = issue('second')
+    job.add_issue(duplicate, new_issues=new_issues)
+    assert len(new_issues) == 1
+    assert duplicate['stdout_file'] == new_issues[0]['stdout_file']
+    assert sorted(os.listdir(str(tmpdir))) == ['first-stderr', 'first-stdout']
+    assert [name for name, _ in job.listener.events] == ['new_issue', 'update_issue']
@@ -0,0 +1,136 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import asyncio
+import signal
+
+from configparser import ConfigParser
+
+import pytest
+
+from fuzzinator.job import FuzzJob
+
+from common_job import MockDriver, MockListener
+
+
+def mock_fuzzer(index):
+    return str(index).encode('utf-8')
+
+
+class MockCall(object):
+    """
+    SUT call with all the protocols of the fuzz jobs, which fails on the test
+    ``b'0'`` and records the tests it has been called with.
+    """
+
+    calls = []
+    batches = []
+    cancelled = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __call__(self, test):
+        MockCall.calls.append(test)
+        return {'id': test} if test == b'0' else None
+
+    def call_batch(self, tests):
+        MockCall.batches.append(tests)
+        return [self(test=test) for test in tests]
+
+    async def async_call(self, test):
+        if test == b'0':
+            raise ValueError('foo')
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            MockCall.cancelled.append(test)
+            raise
+
+
+class DyingCall(object):
+    """
+    SUT call that dies with the issues of the odd tests, and records how many
+    times its context has been entered.
+    """
+
+    entered = 0
+
+    def __init__(self):
+        self.alive = False
+
+    def __enter__(self):
+        DyingCall.entered += 1
+        self.alive = True
+        return self
+
+    def __exit__(self, *exc):
+        self.alive = False
+        return False
+
+    def __call__(self, test):
+        if int(test) % 2 == 1:
+            self.alive = False
+            return {'id': test}
+        return None
+
+
+@pytest.fixture
+def mock_call():
+    for records in [MockCall.calls, MockCall.batches, MockCall.cancelled]:
+        records.clear()
+    sigint_handler = signal.getsignal(signal.SIGINT)
+    yield MockCall
+    signal.signal(signal.SIGINT, sigint_handler)
+
+
+def fuzz_job(call='test_fuzz_job.MockCall', **fuzz_options):
+    config = ConfigParser()
+    config.read_dict({
+        'sut.foo': {'call': call, 'cost': '3'},
+        'fuzz.bar': dict(sut='foo', fuzzer='test_fuzz_job.mock_fuzzer', batch='5', **fuzz_options),
+    })
+    return FuzzJob(id=0, config=config, subconfig_id=None, fuzzer_name='bar', db=MockDriver(), listener=MockListener())
+
+
+def test_fuzz_job(mock_call):
+    job = fuzz_job()
+    issues = job.run()
+    # SUT calls are not batched by default.
+    assert mock_call.batches == []
+    assert mock_call.calls == [b'0', b'1', b'2', b'3', b'4']
+    assert [issue['id'] for issue in issues] == [b'0']
+    assert job.db.stats == [{('foo', 'bar', None): (5, 1)}]
+
+
+def test_fuzz_job_sut_batch(mock_call):
+    fuzz_job(sut_batch='2').run()
+    assert mock_call.batches == [[b'0', b'1'], [b'2', b'3'], [b'4']]
+
+
+def test_fuzz_job_async_exception(mock_call):
+    job = fuzz_job(async_window='3')
+    with pytest.raises(ValueError):
+        job.run()
+    # The tests still running are cancelled.
+    assert sorted(mock_call.cancelled) == [b'1', b'2']
+    assert job.db.stats == []
+
+
+def test_fuzz_job_sut_restart(mock_call):
+    DyingCall.entered = 0
+    job = fuzz_job(call='test_fuzz_job.DyingCall')
+    issues = job.run()
+    assert [issue['id'] for issue in issues] == [b'1', b'3']
+    # The SUT is restarted after both issues it died with.
+    assert DyingCall.entered == 3
+    assert job.sut_restarts == 2
+    assert [kwargs for name, kwargs in job.listener.events if name == 'restart_sut'] == [dict(ident=0, sut='foo', restarts=1),
+                                                                                         dict(ident=0, sut='foo', restarts=2)]
@@ -0,0 +1,98 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import time
+
+import pytest
+
+from fuzzinator.job.fuzzer_prefetcher import FuzzerPrefetcher
+
+
+class MockFuzzer(object):
+    """
+    Fuzzer that records the indices it is called with, skips every second
+    index if ``step`` is 2 (maintaining its own index), and fails at index
+    ``fail``.
+    """
+
+    def __init__(self, exhaust=None, step=1, fail=None):
+        self.exhaust = exhaust
+        self.step = step
+        self.fail = fail
+        self.calls = []
+        if step > 1:
+            self.index = 0
+
+    def __call__(self, index):
+        self.calls.append(index)
+        if index == self.fail:
+            raise ValueError('foo')
+        if index == self.exhaust:
+            return None
+        if self.step > 1:
+            self.index = index + self.step
+        return str(index).encode('utf-8')
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_fuzzer_prefetcher():
+    fuzzer = MockFuzzer()
+    with FuzzerPrefetcher(fuzzer, fuzzer, 2, 5) as prefetcher:
+        # The fuzzer runs ahead of the consumer by at most size tests (and
+        # the one waiting to be queued).
+        wait_for(lambda: len(fuzzer.calls) == 3)
+        time.sleep(0.1)
+        assert fuzzer.calls == [0, 1, 2]
+
+        assert [prefetcher.next_test(index) for index in range(5)] == [b'0', b'1', b'2', b'3', b'4']
+        # The limit of the job is respected and exhaustion is signalled
+        # repeatedly.
+        assert prefetcher.next_test(5) is None
+        assert prefetcher.next_test(5) is None
+        assert prefetcher.fuzzer_index is None
+    assert fuzzer.calls == [0, 1, 2, 3, 4]
+
+
+def test_fuzzer_prefetcher_exhausted():
+    fuzzer = MockFuzzer(exhaust=2)
+    with FuzzerPrefetcher(fuzzer, fuzzer, 10, 5) as prefetcher:
+        assert [prefetcher.next_test(index) for index in range(4)] == [b'0', b'1', None, None]
+    assert fuzzer.calls == [0, 1, 2]
+
+
+def test_fuzzer_prefetcher_fuzzer_index():
+    fuzzer = MockFuzzer(step=2)
+    with FuzzerPrefetcher(fuzzer, fuzzer, 10, 5) as prefetcher:
+        # The index of the fuzzer is recorded with every test.
+        tests = []
+        for _ in range(4):
+            tests.append((prefetcher.next_test(None), prefetcher.fuzzer_index))
+    assert tests == [(b'0', 2), (b'2', 4), (b'4', 6), (None, None)]
+
+
+def test_fuzzer_prefetcher_exception():
+    fuzzer = MockFuzzer(fail=1)
+    with FuzzerPrefetcher(fuzzer, fuzzer, 10, 5) as prefetcher:
+        assert prefetcher.next_test(0) == b'0'
+        with pytest.raises(ValueError):
+            prefetcher.next_test(1)
+
+
+def test_fuzzer_prefetcher_close():
+    fuzzer = MockFuzzer()
+    prefetcher = FuzzerPrefetcher(fuzzer, fuzzer, 1, float('inf'))
+    with prefetcher:
+        wait_for(lambda: len(fuzzer.calls) == 2)
+    # The producer blocked on the full queue is stopped.
+    assert not prefetcher._thread.is_alive()
+    assert fuzzer.calls == [0, 1]
@@ -0,0 +1,63 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+from configparser import ConfigParser
+
+import pytest
+
+from fuzzinator.job import ReduceJob, ValidateJob
+from fuzzinator.job.backtrace_symbolizer import BacktraceSymbolizer
+
+from common_job import MockDriver, MockListener
+
+
+def mock_call(test, **kwargs):
+    return {'id': test}
+
+
+def mock_failing_call(test, **kwargs):
+    raise ValueError('foo')
+
+
+def mock_failing_reduce(**kwargs):
+    raise ValueError('foo')
+
+
+@pytest.fixture
+def closed(monkeypatch):
+    closed = []
+
+    def close(self):
+        closed.append(self)
+
+    monkeypatch.setattr(BacktraceSymbolizer, 'close', close)
+    return closed
+
+
+def config_of(call, **sut_options):
+    config = ConfigParser()
+    config.read_dict({
+        'fuzzinator': {'work_dir': '/tmp'},
+        'sut.foo': dict(call='test_reduce_job.' + call, **sut_options),
+    })
+    return config
+
+
+@pytest.mark.parametrize('call, job_class', [
+    ('mock_failing_call', ValidateJob),
+    ('mock_failing_call', ReduceJob),
+    ('mock_call', ReduceJob),
+])
+def test_job_symbolizer_closed(closed, call, job_class):
+    # The symbolizers of the jobs are closed even if the SUT call or the
+    # reducer fails.
+    issue = dict(_id=0, id=b'foo', sut='foo', fuzzer='bar', test=b'foo')
+    job = job_class(id=0, config=config_of(call, reduce='test_reduce_job.mock_failing_reduce'), issue=issue, db=MockDriver(), listener=MockListener())
+    with pytest.raises(ValueError):
+        job.run()
+    assert len(closed) == (2 if job_class is ReduceJob else 1)
+    assert job.symbolizer in closed
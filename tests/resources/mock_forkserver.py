@@ -0,0 +1,69 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import argparse
+import os
+import signal
+import struct
+import sys
+import time
+
+
+def run_test(test):
+    print(test.decode('utf-8', errors='ignore'), flush=True)
+
+    if b'crash' in test:
+        os.kill(os.getpid(), signal.SIGSEGV)
+
+    if b'hang' in test:
+        time.sleep(60)
+
+    return 1 if b'fail' in test else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock SUT implementing the protocol of the AFL fork server.')
+    parser.add_argument('--init-time', metavar='SEC', type=float, default=0,
+                        help='simulated startup time (default: %(default)s)')
+    parser.add_argument('test', nargs='?', default=None,
+                        help='test file (default: standard input)')
+    args = parser.parse_args()
+
+    time.sleep(args.init_time)
+
+    # Hello message.
+    os.write(199, struct.pack('I', 0))
+    while True:
+        command = os.read(198, 4)
+        if len(command) < 4:
+            break
+
+        pid = os.fork()
+        if pid == 0:
+            os.close(198)
+            os.close(199)
+
+            if args.test:
+                with open(args.test, 'rb') as f:
+                    test = f.read()
+            else:
+                test = b''
+                while True:
+                    chunk = os.read(0, 4096)
+                    if not chunk:
+                        break
+                    test += chunk
+
+            os._exit(run_test(test))
+
+        os.write(199, struct.pack('I', pid))
+        _, status = os.waitpid(pid, 0)
+        os.write(199, struct.pack('I', status))
+
+
+if __name__ == '__main__':
+    main()
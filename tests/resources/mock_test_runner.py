@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import argparse
+import sys
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock test runner that reads tests from its standard input (one per line).')
+    parser.add_argument('--ready', metavar='TEXT', type=str, default=None,
+                        help='print text after startup')
+    parser.add_argument('--end', metavar='TEXT', type=str, default='END',
+                        help='print text after every test (default: %(default)s)')
+    parser.add_argument('--fail-if-contains', metavar='TEXT', type=str, default=None,
+                        help='print the test to standard error if it contains text')
+    parser.add_argument('--crash-if-contains', metavar='TEXT', type=str, default=None,
+                        help='exit with code 1 if the test contains text')
+    parser.add_argument('--hang-if-contains', metavar='TEXT', type=str, default=None,
+                        help='sleep forever if the test contains text')
+    args = parser.parse_args()
+
+    if args.ready:
+        print(args.ready, flush=True)
+
+    for line in sys.stdin:
+        test = line.rstrip('\n')
+        print(test, flush=True)
+        if args.crash_if_contains is not None and args.crash_if_contains in test:
+            sys.exit(1)
+        if args.hang_if_contains is not None and args.hang_if_contains in test:
+            while True:
+                time.sleep(1)
+        if args.fail_if_contains is not None and args.fail_if_contains in test:
+            print(test, file=sys.stderr, flush=True)
+        print(args.end, flush=True)
+
+
+if __name__ == '__main__':
+    main()
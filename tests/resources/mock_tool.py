@@ -27,10 +27,18 @@ def main():
                         help='crash process after output')
     parser.add_argument('--exit-code', metavar='N', type=int, default=0,
                         help='terminate process with given exit code (default: %(default)s)')
+    parser.add_argument('--fail-if-contains', metavar='TEXT', type=str, default=None,
+                        help='treat the (non-option) arguments as files and exit with code 1 (printing their paths) if any of them contains text')
+    parser.add_argument('--file-list', metavar='FILE', type=str, default=None,
+                        help='read further (non-option) arguments from a file (one per line)')
     parser.add_argument('args', nargs='*',
                         help='arbitrary command line arguments')
     args = parser.parse_args()
 
+    if args.file_list:
+        with open(args.file_list) as f:
+            args.args.extend(line.rstrip('\n') for line in f)
+
     out = sys.stderr if args.to_stderr else sys.stdout
 
     if args.print_args:
@@ -44,6 +52,16 @@ def main():
         for line in sys.stdin:
             print(line, file=out, end='', flush=True)
 
+    if args.fail_if_contains is not None:
+        failed = False
+        for arg in args.args:
+            with open(arg) as f:
+                if args.fail_if_contains in f.read():
+                    print(arg, file=out, flush=True)
+                    failed = True
+        if failed:
+            sys.exit(1)
+
     if args.crash:
         os.kill(os.getpid(), signal.SIGSEGV)
 
@@ -0,0 +1,76 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+from collections import OrderedDict
+from configparser import ConfigParser, ExtendedInterpolation
+
+import fuzzinator.config
+
+from fuzzinator.call import CallableDecorator
+from fuzzinator.config import config_get_callable
+
+
+def mock_call(test, **kwargs):
+    return {'id': test}
+
+
+class MockDecorator(CallableDecorator):
+    """
+    Decorator that tags the issues with the decorator instance that has
+    produced them.
+    """
+
+    def decorator(self, tag, **kwargs):
+        def wrapper(fn):
+            def tagger(*args, **kwargs):
+                issue = fn(*args, **kwargs)
+                issue[tag] = self
+                return issue
+            return tagger
+        return wrapper
+
+
+def config_of(**call_kwargs):
+    config = ConfigParser(interpolation=ExtendedInterpolation())
+    config.read_dict({
+        'fuzzinator': {'tag': 'bar'},
+        'sut.foo': {'call': 'test_config.mock_call', 'call.decorate(0)': 'test_config.MockDecorator'},
+        'sut.foo.call': call_kwargs,
+        'sut.foo.call.decorate(0)': {'tag': '${fuzzinator:tag}'},
+    })
+    return config
+
+
+def test_config_get_callable():
+    config = config_of(baz='qux')
+    call, call_kwargs = config_get_callable(config, 'sut.foo', 'call')
+    assert call_kwargs == {'baz': 'qux'}
+    call_kwargs['baz'] = 'quux'
+
+    other_call, other_call_kwargs = config_get_callable(config, 'sut.foo', 'call')
+    assert other_call_kwargs == {'baz': 'qux'}
+    assert other_call is not call
+    # The decorated entity is cached, even for equal configs.
+    assert call(test='foo')['bar'] is other_call(test='foo')['bar']
+    assert config_get_callable(config_of(baz='qux'), 'sut.foo', 'call')[0](test='foo')['bar'] is call(test='foo')['bar']
+
+    # Changed configs are resolved again, the keys are interpolated.
+    config.set('sut.foo.call.decorate(0)', 'tag', 'baz')
+    assert 'baz' in config_get_callable(config, 'sut.foo', 'call')[0](test='foo')
+    other_config = config_of(baz='qux')
+    other_config.set('fuzzinator', 'tag', 'baz')
+    assert 'baz' in config_get_callable(other_config, 'sut.foo', 'call')[0](test='foo')
+
+    assert config_get_callable(config, 'sut.foo', ['foo', 'bar']) == (None, None)
+
+
+def test_config_get_callable_cache_size(monkeypatch):
+    monkeypatch.setattr(fuzzinator.config, '_callable_cache', OrderedDict())
+    monkeypatch.setattr(fuzzinator.config, '_callable_cache_size', 2)
+    for idx in range(5):
+        config_get_callable(config_of(baz=str(idx)), 'sut.foo', 'call')
+    assert len(fuzzinator.config._callable_cache) == 2
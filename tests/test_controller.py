@@ -0,0 +1,227 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import os
+import signal
+import sys
+import threading
+import time
+
+from configparser import ConfigParser, ExtendedInterpolation
+
+import pytest
+
+import fuzzinator.controller
+
+from fuzzinator.controller import Controller
+from fuzzinator.job import FuzzJob, ReduceJob, ValidateJob
+from fuzzinator.job.call_job import CallJob
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='jobs are started by forking the controller')
+
+
+class MockDriver(object):
+    """
+    Database driver that stores nothing.
+    """
+
+    def __init__(self, uri):
+        pass
+
+    def init_db(self, fuzzers):
+        pass
+
+    def get_stats(self, **kwargs):
+        return dict()
+
+    def add_issue(self, issue):
+        return True
+
+    def update_stats(self, stats):
+        pass
+
+
+class MemoryDriver(MockDriver):
+    """
+    Database driver that stores the issues in memory and understands the
+    filters of the queries of the controller.
+    """
+
+    def __init__(self, uri):
+        super().__init__(uri)
+        self.issues = []
+
+    def add_issue(self, issue):
+        self.issues.append(dict(issue, _id=len(self.issues)))
+        issue['_id'] = len(self.issues) - 1
+        return True
+
+    @staticmethod
+    def _match(issue, filter):
+        for field, condition in filter.items():
+            if '$in' in condition and issue.get(field) not in condition['$in']:
+                return False
+            if '$exists' in condition and (field in issue) != condition['$exists']:
+                return False
+        return True
+
+    def find_issues_by_suts(self, suts, filter=None, projection=None):
+        return [{field: value for field, value in issue.items() if field in projection}
+                for issue in self.issues if issue['sut'] in suts and self._match(issue, filter or {})]
+
+
+class MockListener(object):
+    """
+    Listener that records the events of the jobs.
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def __getattr__(self, name):
+        def event(**kwargs):
+            self.events.append((name, kwargs.get('ident')))
+        return event
+
+    def select(self, *names):
+        return [event for event in self.events if event[0] in names]
+
+
+def mock_fuzzer(index):
+    return b'foo'
+
+
+def mock_call(test, **kwargs):
+    return None
+
+
+# Path of the file where slow_fuzzer notes that it has been interrupted.
+interrupted_path = None
+
+
+def slow_fuzzer(index):
+    try:
+        time.sleep(0.05)
+    except KeyboardInterrupt:
+        with open(interrupted_path, 'w') as f:
+            f.write(str(os.getpgid(0)))
+        raise
+    return b'foo'
+
+
+@pytest.fixture
+def controller(tmpdir, monkeypatch):
+    monkeypatch.setattr(fuzzinator.controller, 'MongoDriver', MockDriver)
+
+    config = ConfigParser(interpolation=ExtendedInterpolation(), strict=False, allow_no_value=True)
+    config.read_dict({
+        'fuzzinator': {'work_dir': str(tmpdir.join('work')), 'cost_budget': '1'},
+        'sut.foo': {'call': 'test_controller.mock_call'},
+        'fuzz.foo-a': {'sut': 'foo', 'fuzzer': 'test_controller.mock_fuzzer', 'batch': '2'},
+        'fuzz.foo-b': {'sut': 'foo', 'fuzzer': 'test_controller.mock_fuzzer', 'batch': '2'},
+    })
+    controller = Controller(config=config)
+    controller.listener += MockListener()
+    return controller
+
+
+def test_controller_run(controller):
+    controller.run(max_cycles=1)
+
+    listener = controller.listener.listeners[0]
+    assert listener.select('new_fuzz_job') == [('new_fuzz_job', 0), ('new_fuzz_job', 1)]
+    # The cost budget allows only one job at a time, so the second job is
+    # started only after the first one has terminated.
+    assert listener.select('activate_job', 'remove_job') == [('activate_job', 0), ('remove_job', 0),
+                                                             ('activate_job', 1), ('remove_job', 1)]
+
+
+def test_controller_run_duplicates(controller):
+    issue = dict(_id=42, id='foo', sut='foo', fuzzer='foo-a', test=b'foo')
+    assert controller.add_validate_job(issue)
+    assert controller.add_validate_job(issue)
+    assert controller.add_validate_job(dict(issue, _id=43))
+    # The cycle counter advances at every scheduled job until a fuzz job is
+    # queued, so the two validations take two cycles.
+    controller.run(max_cycles=3)
+
+    listener = controller.listener.listeners[0]
+    # The second validation of the same issue is merged into the first one.
+    assert listener.select('new_validate_job') == [('new_validate_job', 0), ('new_validate_job', 1)]
+    # Queued jobs are executed before new fuzz jobs are queued.
+    assert listener.select('new_fuzz_job') == [('new_fuzz_job', 2), ('new_fuzz_job', 3)]
+    assert [ident for _, ident in listener.select('activate_job')] == [0, 1, 2, 3]
+
+
+def test_controller_shared_queue(controller):
+    controller.shared_queue_timeout = 0.1
+
+    item = (FuzzJob, dict(fuzzer_name='foo-a'), False)
+    controller._put_shared(item)
+    assert controller._get_shared() == [item]
+    assert controller._get_shared() == []
+
+    # An item announced by a sender that has not flushed it yet is received
+    # once it arrives.
+    late_item = (ValidateJob, dict(issue=dict(id='foo', sut='foo')), False)
+    with controller._shared_lock:
+        controller._shared_pending.value += 1
+        controller._wakeup_writer.send_bytes(b'\0')
+    assert controller._get_shared() == []
+
+    controller._shared_queue.put(late_item)
+    controller._put_shared(item)
+    assert sorted(controller._get_shared(), key=lambda item: item[0].__name__) == [item, late_item]
+    assert controller._get_shared() == []
+    assert not controller._wakeup_reader.poll()
+
+
+def test_controller_reduce_all(controller):
+    controller.db = MemoryDriver(None)
+    controller.config.set('sut.foo', 'reduce', 'test_controller.mock_call')
+
+    # New issues are stored as not reported and not reduced.
+    job = CallJob(id=0, config=controller.config, subconfig_id=None, sut_name='foo', fuzzer_name='foo-a', db=controller.db, listener=MockListener())
+    for test in [b'foo', b'barbaz']:
+        job.add_issue(dict(test=test), new_issues=[])
+    controller.db.issues[1]['reported'] = True
+    job.add_issue(dict(test=b'qux', invalid=True), new_issues=[])
+
+    controller.reduce_all()
+    queued = controller._get_shared()
+    assert [(job_class, job_kwargs['issue']['_id']) for job_class, job_kwargs, _ in queued] == [(ReduceJob, 0), (ReduceJob, 2)]
+    # Only the size of the test case is queued.
+    assert [job_kwargs['issue']['test_size'] for _, job_kwargs, _ in queued] == [3, 3]
+    assert not any('test' in job_kwargs['issue'] for _, job_kwargs, _ in queued)
+
+    controller.validate_all()
+    assert [(job_class, job_kwargs['issue']['_id']) for job_class, job_kwargs, _ in controller._get_shared()] == [(ValidateJob, 0), (ValidateJob, 1)]
+
+
+def test_controller_interrupt_isolated(tmpdir, monkeypatch):
+    monkeypatch.setattr(fuzzinator.controller, 'MongoDriver', MockDriver)
+    monkeypatch.setattr(sys.modules[__name__], 'interrupted_path', str(tmpdir.join('interrupted')))
+
+    config = ConfigParser(interpolation=ExtendedInterpolation(), strict=False, allow_no_value=True)
+    config.read_dict({
+        'fuzzinator': {'work_dir': str(tmpdir.join('work')), 'cost_budget': '1', 'isolation': 'process_group'},
+        'sut.foo': {'call': 'test_controller.mock_call'},
+        'fuzz.foo-a': {'sut': 'foo', 'fuzzer': 'test_controller.slow_fuzzer', 'batch': 'inf'},
+    })
+    controller = Controller(config=config)
+
+    # The keyboard interrupt of the terminal reaches the controller only, the
+    # job is in its own process group.
+    timer = threading.Timer(1, os.kill, (os.getpid(), signal.SIGINT))
+    timer.start()
+    try:
+        controller.run()
+    finally:
+        timer.cancel()
+
+    # The interrupt is forwarded to the isolated job.
+    assert int(tmpdir.join('interrupted').read()) != os.getpgid(0)
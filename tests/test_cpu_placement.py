@@ -0,0 +1,58 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import os
+import sys
+
+import pytest
+
+from fuzzinator.cpu_placement import CpuPlacement
+
+
+def test_cpu_placement_best_fit():
+    placement = CpuPlacement(cpus=range(8), nodes={0: {0, 1, 2, 3}, 1: {4, 5, 6, 7}})
+
+    assert placement.acquire(0, 3) == ([0, 1, 2], [0])
+    # The node with the least free CPUs that can host the job is preferred.
+    assert placement.acquire(1, 1) == ([3], [0])
+    assert placement.acquire(2, 2) == ([4, 5], [1])
+
+    # Jobs without cost and jobs that do not fit are not pinned.
+    assert placement.acquire(3, 0) is None
+    assert placement.acquire(4, 3) is None
+
+    placement.release(0)
+    placement.release(0)
+    placement.release(3)
+    assert placement.acquire(5, 3) == ([0, 1, 2], [0])
+
+
+def test_cpu_placement_spread():
+    placement = CpuPlacement(cpus=range(8), nodes={0: {0, 1, 2, 3}, 1: {4, 5, 6, 7}})
+    assert placement.acquire(0, 3) == ([0, 1, 2], [0])
+    assert placement.acquire(1, 2) == ([4, 5], [1])
+
+    # A job that fits into no single node is spread over the least number of
+    # nodes, starting with the node with the most free CPUs.
+    assert placement.acquire(2, 3) == ([3, 6, 7], [0, 1])
+    assert placement.acquire(3, 1) is None
+
+
+def test_cpu_placement_no_topology():
+    # CPUs of unknown nodes are assigned, but no nodes are reported.
+    placement = CpuPlacement(cpus=[3, 1, 2], nodes={})
+    assert placement.cpus == [1, 2, 3]
+    assert placement.acquire(0, 2) == ([1, 2], [])
+
+
+@pytest.mark.skipif(not hasattr(os, 'sched_getaffinity') or sys.platform != 'linux', reason='platform-dependent component')
+def test_cpu_placement_system():
+    placement = CpuPlacement()
+    assert placement.cpus == sorted(os.sched_getaffinity(0))
+    for node, cpus in CpuPlacement.numa_nodes().items():
+        assert isinstance(node, int)
+        assert cpus
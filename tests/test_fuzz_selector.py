@@ -0,0 +1,74 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import random
+
+from collections import Counter
+
+from fuzzinator.fuzz_selector import ThompsonSamplingSelector
+
+
+class MockDriver(object):
+    """
+    Database driver that returns the given statistics and counts the
+    queries.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.queries = []
+
+    def get_stats(self, **kwargs):
+        self.queries.append(kwargs)
+        return [dict(fuzzer=fuzzer, subconfigs=[dict(subconfig=fuzzer + '-cfg', exec=executed, unique=unique)])
+                for fuzzer, (executed, unique) in self.stats.items()]
+
+
+fuzzers = {name: dict(sut='foo', subconfig=name + '-cfg') for name in ['foo', 'bar', 'baz']}
+
+
+def test_thompson_sampling_selector():
+    random.seed(42)
+    db = MockDriver({'foo': (1000, 100), 'bar': (1000, 1), 'baz': (-1, -1)})
+    selector = ThompsonSamplingSelector(db, fuzzers, exploration=0)
+
+    # The fuzz job with the highest yield is selected most of the time.
+    selected = Counter(selector.select(['foo', 'bar']) for _ in range(1000))
+    assert selected['foo'] > 990
+    # Fuzz jobs without statistics (or with invalid ones) are sampled from
+    # the uniform prior.
+    selected = Counter(selector.select(['foo', 'baz']) for _ in range(1000))
+    assert 800 < selected['baz'] < 950
+    assert selector.select(['bar']) == 'bar'
+
+    # The statistics are not queried at every selection.
+    assert len(db.queries) == 1
+
+
+def test_thompson_sampling_selector_refresh():
+    db = MockDriver({'foo': (1000, 0), 'bar': (1000, 1000)})
+    selector = ThompsonSamplingSelector(db, fuzzers, exploration=0, session_start=1, session_baseline=[])
+    assert selector.select(['foo', 'bar']) == 'bar'
+    assert db.queries[0]['session_start'] is not None
+    assert db.queries[0]['session_baseline'] == []
+
+    db.stats = {'foo': (1000, 1000), 'bar': (1000, 0)}
+    assert selector.select(['foo', 'bar']) == 'bar'
+    selector.refresh_interval = 0
+    assert selector.select(['foo', 'bar']) == 'foo'
+    assert len(db.queries) == 2
+
+
+def test_thompson_sampling_selector_exploration():
+    random.seed(42)
+    db = MockDriver({'foo': (1000, 1000), 'bar': (1000, 0)})
+    selector = ThompsonSamplingSelector(db, fuzzers, exploration=1)
+
+    # Exploration selects uniformly, without querying the statistics.
+    selected = Counter(selector.select(['foo', 'bar']) for _ in range(1000))
+    assert selected['bar'] > 400
+    assert db.queries == []
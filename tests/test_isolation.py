@@ -0,0 +1,164 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from fuzzinator.isolation import CgroupIsolation, ProcessGroupIsolation, create_isolation
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='isolation is not supported on Windows')
+
+# A job process that enters its isolation unit, starts a daemon-like child,
+# reports its pid, and exits or keeps running.
+job_script = '''
+import os, subprocess, sys
+os.setpgid(0, 0)
+child = subprocess.Popen(['sleep', '60'])
+print(child.pid, flush=True)
+if sys.argv[1] == 'wait':
+    child.wait()
+'''
+
+
+def start_job(mode):
+    proc = subprocess.Popen([sys.executable, '-c', job_script, mode], stdout=subprocess.PIPE)
+    child = int(proc.stdout.readline())
+    return proc, child
+
+
+def wait_exit(pid, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            # Reap the process if it is ours, otherwise check its existence.
+            if os.waitpid(pid, os.WNOHANG)[0] == pid:
+                return True
+        except ChildProcessError:
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                return True
+        time.sleep(0.01)
+    return False
+
+
+def is_running(pid):
+    try:
+        with open('/proc/{pid}/stat'.format(pid=pid)) as f:
+            return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except OSError:
+        return False
+
+
+def test_process_group_release():
+    isolation = ProcessGroupIsolation()
+    proc, child = start_job('exit')
+    proc.wait()
+    assert isolation.is_alive(proc.pid)
+
+    isolation.release(proc.pid)
+    assert wait_exit(child) or not is_running(child)
+    deadline = time.time() + 5
+    while isolation.is_alive(proc.pid) and time.time() < deadline:
+        time.sleep(0.01)
+    assert not isolation.is_alive(proc.pid)
+    assert isolation.memory_usage(proc.pid) is None
+
+
+def test_process_group_release_keep():
+    isolation = ProcessGroupIsolation()
+    proc, child = start_job('wait')
+    try:
+        isolation.release(proc.pid, keep=True)
+        # The job process survives and finishes once its child is killed.
+        assert proc.wait(timeout=5) == 0
+        assert not is_running(child)
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def test_cgroup_release(tmp_path):
+    root = str(tmp_path / 'root')
+    isolation = CgroupIsolation(root)
+
+    # Cgroup files are not available outside of a cgroup file system, so
+    # the job process is signalled via its process group.
+    proc = subprocess.Popen(['sleep', '60'], start_new_session=True)
+    os.mkdir(os.path.join(root, str(proc.pid)))
+    # The cgroup of another job, which is just being created.
+    os.mkdir(os.path.join(root, '999999999'))
+
+    isolation.release(proc.pid)
+    assert proc.wait(timeout=5) != 0
+    assert sorted(os.listdir(root)) == ['999999999']
+
+    isolation.close()
+    assert not os.path.exists(root)
+
+
+def test_cgroup_release_keep(tmp_path):
+    root = str(tmp_path / 'root')
+    isolation = CgroupIsolation(root)
+
+    worker = subprocess.Popen(['sleep', '60'])
+    leftover = subprocess.Popen(['sleep', '60'])
+    try:
+        cgroup = os.path.join(root, str(worker.pid))
+        os.mkdir(cgroup)
+        with open(os.path.join(cgroup, 'cgroup.procs'), 'w') as f:
+            f.write('{worker}\n{leftover}\n'.format(worker=worker.pid, leftover=leftover.pid))
+
+        isolation.release(worker.pid, keep=True)
+        assert leftover.wait(timeout=5) != 0
+        assert worker.poll() is None
+        assert os.path.isdir(cgroup)
+    finally:
+        worker.kill()
+        worker.wait()
+
+
+@pytest.mark.parametrize('events, exp', [
+    ('populated 1\nfrozen 0\n', True),
+    ('populated 0\nfrozen 0\n', False),
+])
+def test_cgroup_is_alive(tmp_path, events, exp):
+    root = str(tmp_path / 'root')
+    isolation = CgroupIsolation(root)
+    os.mkdir(os.path.join(root, '42'))
+    with open(os.path.join(root, '42', 'cgroup.events'), 'w') as f:
+        f.write(events)
+
+    assert isolation.is_alive(42) == exp
+
+
+def test_cgroup_memory_usage(tmp_path):
+    root = str(tmp_path / 'root')
+    isolation = CgroupIsolation(root)
+    os.mkdir(os.path.join(root, '42'))
+    assert isolation.memory_usage(42) is None
+
+    with open(os.path.join(root, '42', 'memory.current'), 'w') as f:
+        f.write('4096\n')
+    assert isolation.memory_usage(42) == 4096
+
+
+@pytest.mark.parametrize('mode, exp', [
+    ('none', type(None)),
+    ('process_group', ProcessGroupIsolation),
+])
+def test_create_isolation(mode, exp):
+    assert isinstance(create_isolation(mode), exp)
+
+
+def test_create_isolation_unknown():
+    with pytest.raises(ValueError):
+        create_isolation('foo')
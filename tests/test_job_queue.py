@@ -0,0 +1,117 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import pytest
+
+from fuzzinator.job_queue import JobQueue
+
+
+class MockJob(object):
+
+    def __init__(self, id, cost=1, memory_cost=0):
+        self.id = id
+        self.cost = cost
+        self.memory_cost = memory_cost
+
+
+def queue_of(policy, costs, backfill_limit=10):
+    queue = JobQueue(policy=policy, backfill_limit=backfill_limit)
+    for ident, cost in enumerate(costs):
+        queue.push(MockJob(ident, cost))
+    return queue
+
+
+def test_job_queue_unknown_policy():
+    with pytest.raises(ValueError):
+        JobQueue(policy='foo')
+
+
+def test_job_queue_priority():
+    queue = queue_of('fifo', [1, 1])
+    queue.push(MockJob(2, 0), priority=True)
+    assert [job.id for job in queue] == [2, 0, 1]
+    assert queue.cost == 2
+
+
+def test_job_queue_fifo():
+    queue = queue_of('fifo', [4, 1, 1])
+    assert queue.cost == 6
+
+    # The head does not fit, so the others have to wait, too.
+    assert queue.pop(2) is None
+    assert queue.pop(4).id == 0
+    assert queue.pop(2).id == 1
+    assert queue.cost == 1
+    assert queue.backfilled == 0
+
+
+def test_job_queue_backfill():
+    queue = queue_of('backfill', [4, 1, 1])
+
+    assert queue.pop(2).id == 1
+    assert queue.pop(1).id == 2
+    assert queue.pop(1) is None
+    assert queue.pop(4).id == 0
+    assert queue.backfilled == 2
+    assert len(queue) == 0
+    assert queue.cost == 0
+
+
+def test_job_queue_reservation():
+    queue = queue_of('backfill', [4] + [1] * 4, backfill_limit=2)
+
+    # The head is overtaken twice, then it is reserved.
+    assert queue.pop(1).id == 1
+    assert queue.pop(1).id == 2
+    assert queue.pop(1) is None
+    assert queue.pop(4).id == 0
+    assert queue.pop(1).id == 3
+
+
+def test_job_queue_remove():
+    queue = queue_of('fifo', [1, 2, 3])
+
+    assert queue.remove(1).id == 1
+    assert queue.remove(1) is None
+    assert [job.id for job in queue] == [0, 2]
+    assert queue.cost == 4
+
+
+def test_job_queue_merge():
+    queue = JobQueue()
+    queue.push(MockJob(0), key='foo')
+    queue.push(MockJob(1, memory_cost=1024), key='bar')
+
+    assert queue.merge('baz') is None
+    assert queue.merge('foo').id == 0
+    assert queue.duplicates == 1
+    assert [job.id for job in queue] == [0, 1]
+
+    # A priority submission moves the queued job to the head for free.
+    job = queue.merge('bar', priority=True)
+    assert job.id == 1
+    assert job.cost == 0
+    assert job.memory_cost == 0
+    assert [job.id for job in queue] == [1, 0]
+    assert queue.cost == 1
+    assert queue.duplicates == 2
+
+    # ... even if the memory budget is exhausted.
+    assert queue.pop(0, 0).id == 1
+
+
+def test_job_queue_merge_released_key():
+    queue = JobQueue()
+    queue.push(MockJob(0), key='foo')
+    queue.push(MockJob(1), key='bar')
+
+    # Once a job leaves the queue, its key is released.
+    assert queue.pop(1).id == 0
+    assert queue.merge('foo') is None
+    assert queue.remove(1).id == 1
+    assert queue.merge('bar') is None
+    assert queue.duplicates == 0
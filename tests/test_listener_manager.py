@@ -0,0 +1,121 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import time
+
+import fuzzinator.listener.listener_manager
+
+from fuzzinator.listener import ListenerManager
+from fuzzinator.listener.listener_manager import Throttle
+
+
+class MockClock(object):
+
+    def __init__(self):
+        self.now = 0
+
+    def monotonic(self):
+        return self.now
+
+
+class MockTrampoline(object):
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, **kwargs):
+        self.events.append(kwargs)
+
+
+class MockListener(object):
+
+    def __init__(self):
+        self.events = []
+
+    def job_progress(self, ident, progress):
+        self.events.append(('job_progress', ident, progress))
+
+    def new_issue(self, ident, issue):
+        self.events.append(('new_issue', ident, issue))
+
+
+def test_throttle(monkeypatch):
+    clock = MockClock()
+    monkeypatch.setattr(fuzzinator.listener.listener_manager, 'time', clock)
+    trampoline = MockTrampoline()
+    throttle = Throttle(trampoline, 1)
+
+    # The first event of every job is forwarded, the rest is coalesced until
+    # the interval elapses.
+    throttle(ident=0, progress=1)
+    throttle(ident=1, progress=1)
+    throttle(ident=0, progress=2)
+    throttle(ident=0, progress=3)
+    assert trampoline.events == [dict(ident=0, progress=1), dict(ident=1, progress=1)]
+
+    clock.now = 1
+    throttle(ident=0, progress=4)
+    assert trampoline.events[-1] == dict(ident=0, progress=4)
+    assert throttle.pending == dict()
+
+    # Pending events are forwarded on flush, and the next events are not
+    # held back after it.
+    throttle(ident=0, progress=5)
+    throttle(ident=1, progress=2)
+    assert trampoline.events[3:] == [dict(ident=1, progress=2)]
+    throttle.flush()
+    assert trampoline.events[4:] == [dict(ident=0, progress=5)]
+    throttle.flush()
+    throttle(ident=0, progress=6)
+    assert trampoline.events[-1] == dict(ident=0, progress=6)
+    assert len(trampoline.events) == 6
+
+
+def test_throttle_trailing():
+    trampoline = MockTrampoline()
+    throttle = Throttle(trampoline, 0.1)
+
+    # The last coalesced event is forwarded when the interval elapses, even
+    # if no further event is triggered.
+    for progress in range(3):
+        throttle(ident=0, progress=progress)
+    assert trampoline.events == [dict(ident=0, progress=0)]
+    deadline = time.time() + 5
+    while len(trampoline.events) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert trampoline.events == [dict(ident=0, progress=0), dict(ident=0, progress=2)]
+    assert throttle.pending == dict() and throttle.timers == dict()
+
+    # Flushed events are not forwarded again by the timer.
+    throttle(ident=0, progress=3)
+    throttle.flush()
+    time.sleep(0.2)
+    assert trampoline.events[2:] == [dict(ident=0, progress=3)]
+
+
+def test_listener_manager_throttle(monkeypatch):
+    monkeypatch.setattr(fuzzinator.listener.listener_manager, 'time', MockClock())
+    listener = MockListener()
+    manager = ListenerManager([listener], throttle=1)
+
+    # Only the throttled events are rate-limited.
+    for progress in range(3):
+        manager.job_progress(ident=0, progress=progress)
+        manager.new_issue(ident=0, issue=progress)
+    manager.flush()
+    assert listener.events == [('job_progress', 0, 0), ('new_issue', 0, 0), ('new_issue', 0, 1), ('new_issue', 0, 2), ('job_progress', 0, 2)]
+
+
+def test_listener_manager_no_throttle():
+    listener = MockListener()
+    manager = ListenerManager([listener], throttle=0)
+    assert not isinstance(manager.job_progress, Throttle)
+
+    for progress in range(3):
+        manager.job_progress(ident=0, progress=progress)
+    manager.flush()
+    assert listener.events == [('job_progress', 0, progress) for progress in range(3)]
@@ -0,0 +1,205 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import os
+import signal
+import sys
+import time
+
+from configparser import ConfigParser
+from multiprocessing import Process
+from multiprocessing.connection import wait
+
+import pytest
+
+from fuzzinator.controller import Controller
+from fuzzinator.remote import Coordinator, RemoteController, RemoteWorker
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='workers are started by forking the test process')
+
+authkey = 'secret'
+
+
+class MockDriver(object):
+    """
+    Coordinator-side database that stores the issues in memory.
+    """
+
+    def __init__(self):
+        self.issues = []
+
+    def add_issue(self, issue):
+        issue['_id'] = len(self.issues)
+        self.issues.append(issue)
+        return True
+
+    def update_stat(self, *args, **kwargs):
+        pass
+
+    def update_stats(self, *args, **kwargs):
+        pass
+
+    def update_issue_by_oid(self, *args, **kwargs):
+        pass
+
+    def find_issue_by_oid(self, *args, **kwargs):
+        return None
+
+
+class MockListener(object):
+
+    def __init__(self):
+        self.events = []
+
+    def __getattr__(self, name):
+        def event(**kwargs):
+            self.events.append((name, kwargs.get('ident')))
+        return event
+
+
+class MockController(object):
+    """
+    The parts of the controller that are used by the coordinator.
+    """
+
+    def __init__(self):
+        self.config = ConfigParser()
+        self.config.read_dict({'fuzzinator': {'event_throttle': '0'}})
+        self.db = MockDriver()
+        self.listener = MockListener()
+        self.validated = []
+
+    def add_reduce_job(self, issue, priority=False):
+        return False
+
+    def add_validate_job(self, issue, priority=False):
+        self.validated.append(issue)
+        return True
+
+
+class MockJob(object):
+    """
+    Job that reports its start and a new issue after sleeping for a while.
+    """
+
+    def __init__(self, id, config, db, listener, sleep=0):
+        self.id = id
+        self.db = db
+        self.listener = listener
+        self.sleep = sleep
+
+    def run(self):
+        self.listener.job_progress(ident=self.id, progress=0)
+        time.sleep(self.sleep)
+        issue = dict(id='foo', sut='foo', test=b'foo')
+        self.db.add_issue(issue)
+        self.listener.new_issue(ident=self.id, issue=issue)
+        return [issue]
+
+
+def poll_until(coordinator, condition, timeout=10):
+    lost = []
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        wait(coordinator.sentinels, timeout=0.1)
+        lost.extend(coordinator.poll())
+    assert condition()
+    return lost
+
+
+@pytest.fixture
+def coordinator(tmpdir):
+    controller = MockController()
+    coordinator = Coordinator(controller, '127.0.0.1:0', authkey)
+    address = '{host}:{port}'.format(host=coordinator._listener.address[0], port=coordinator._listener.address[1])
+
+    # The workers are told apart by their capacity, since they may connect in
+    # any order.
+    workers = []
+    for idx in range(2):
+        worker = RemoteWorker(address, authkey, capacity=idx + 1, work_dir=str(tmpdir.join('worker-{idx}'.format(idx=idx))))
+        proc = Process(target=worker.run)
+        proc.start()
+        workers.append(proc)
+
+    yield coordinator, workers
+
+    coordinator.close()
+    for proc in workers:
+        if proc.is_alive():
+            os.kill(proc.pid, signal.SIGINT)
+        proc.join(timeout=5)
+
+
+def test_coordinator(coordinator):
+    coordinator, workers = coordinator
+    controller = coordinator.controller
+    poll_until(coordinator, lambda: len(coordinator.workers) == 2)
+    remotes = sorted(coordinator.workers, key=lambda worker: worker.capacity)
+    assert [worker.capacity for worker in remotes] == [1, 2]
+
+    # The job is executed by the worker and it accesses the database, the
+    # listeners, and the job queue of the coordinator.
+    remote = remotes[0]
+    remote.submit((MockJob, 0, dict()), 1)
+    assert remote.load == 1
+    assert coordinator.find(0) is remote
+    poll_until(coordinator, lambda: not remote.jobs and controller.validated)
+    assert remote.load == 0
+    assert coordinator.find(0) is None
+    assert [issue['id'] for issue in controller.db.issues] == ['foo']
+    assert [issue['_id'] for issue in controller.validated] == [0]
+    assert ('new_issue', 0) in controller.listener.events
+
+    # The jobs of a disconnected worker are handed back to the controller.
+    remote = remotes[1]
+    descriptor = (MockJob, 1, dict(sleep=60))
+    remote.submit(descriptor, 1)
+    poll_until(coordinator, lambda: ('job_progress', 1) in controller.listener.events)
+    proc = workers[1]
+    os.kill(proc.pid, signal.SIGINT)
+    proc.join(timeout=5)
+    lost = poll_until(coordinator, lambda: len(coordinator.workers) == 1)
+    assert lost == [descriptor]
+    assert coordinator.workers == [remotes[0]]
+
+
+class BrokenSession(object):
+
+    def __init__(self):
+        self.broken = False
+        self.events = []
+
+    def event(self, name, **kwargs):
+        if self.broken:
+            raise BrokenPipeError()
+        self.events.append(name)
+
+
+class InterruptedJob(object):
+
+    def __init__(self, session, listener):
+        self.id = 0
+        self.session = session
+        self.listener = listener
+
+    def run(self):
+        self.listener.job_progress(ident=self.id, progress=1)
+        # Throttled, so it is delivered only when the listener is flushed.
+        self.listener.job_progress(ident=self.id, progress=2)
+        self.session.broken = True
+        raise KeyboardInterrupt()
+
+
+def test_execute_job_broken_session():
+    session = BrokenSession()
+    controller = RemoteController(session, throttle=10)
+
+    # The failing flush does not mask the interruption of the job.
+    with pytest.raises(KeyboardInterrupt):
+        Controller.execute_job(InterruptedJob(session, controller.listener), controller)
+    assert session.events == ['job_progress']
@@ -0,0 +1,125 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import asyncio
+import os
+import pytest
+import shlex
+import subprocess
+import sys
+
+from fuzzinator import spawner
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+@pytest.mark.skipif(resource is None or sys.platform == 'win32', reason='platform-dependent component')
+@pytest.mark.parametrize('asynchronous', [False, True])
+def test_core_dumps(asynchronous):
+    argv = [sys.executable, '-c', 'import resource; print(resource.getrlimit(resource.RLIMIT_CORE)[0])']
+
+    async def async_run():
+        proc = await spawner.create_subprocess_exec(argv, stdout=asyncio.subprocess.PIPE)
+        return (await proc.communicate())[0]
+
+    def run():
+        if asynchronous:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                return loop.run_until_complete(async_run())
+            finally:
+                asyncio.set_event_loop(None)
+                loop.close()
+        return spawner.popen(argv, stdout=subprocess.PIPE).communicate()[0]
+
+    limit = resource.getrlimit(resource.RLIMIT_CORE)
+    resource.setrlimit(resource.RLIMIT_CORE, (0, limit[1]))
+    try:
+        assert int(run()) == 0
+        with spawner.core_dumps():
+            assert int(run()) == limit[1]
+            # The limit of the current process is not changed.
+            assert resource.getrlimit(resource.RLIMIT_CORE) == (0, limit[1])
+        assert int(run()) == 0
+    finally:
+        resource.setrlimit(resource.RLIMIT_CORE, limit)
+
+
+@pytest.mark.parametrize('command, fields', [
+    ('foo --bar {test} baz', dict(test='qux')),
+    ('foo --bar={test} "baz qux"', dict(test='/tmp/qux.txt')),
+    ('foo {test}', dict(test='')),
+    ('foo {test}', dict(test='bar baz')),
+    ('foo {test}', dict(test='"bar"')),
+    ('foo {test}', dict(test='bar\\baz')),
+    ('foo bar', dict(test='baz')),
+])
+def test_command_template(command, fields):
+    # The template is equivalent to formatting and splitting the command.
+    template = spawner.command_template(command)
+    assert template.argv(**fields) == shlex.split(command.format(**fields), posix=template.posix)
+    assert spawner.command_template(command) is template
+
+
+def test_command_template_unchanged():
+    template = spawner.CommandTemplate('foo {test}')
+    template.argv(test='bar').append('baz')
+    assert template.argv(test='qux') == ['foo', 'qux']
+    assert template.args == ['foo', '{test}']
+
+
+@pytest.mark.parametrize('command', [
+    'find . -exec echo {} ;',
+    'awk \'{print $1}\'',
+])
+def test_command_template_no_fields(command):
+    # Without fields, braces are not interpreted as replacement fields.
+    assert spawner.command_template(command).argv() == shlex.split(command)
+
+
+def test_environ(monkeypatch):
+    monkeypatch.setenv('FUZZINATOR_FOO', 'foo')
+    assert spawner.environ(None) is None
+
+    env = spawner.environ('{"FUZZINATOR_BAR": "bar"}')
+    assert env['FUZZINATOR_FOO'] == 'foo'
+    assert env['FUZZINATOR_BAR'] == 'bar'
+    assert 'FUZZINATOR_BAR' not in os.environ
+    assert spawner.environ('{"FUZZINATOR_BAR": "bar"}') is env
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='programs are not resolved on Windows')
+def test_executable(tmpdir):
+    program = tmpdir.join('foo')
+    program.write('')
+    program.chmod(0o755)
+
+    env = dict(PATH=str(tmpdir))
+    assert spawner.executable(['foo', 'bar'], env) == str(program)
+    # Missing programs and programs given with a path are not resolved.
+    assert spawner.executable(['bar'], env) is None
+    assert spawner.executable(['./foo'], env) is None
+    assert spawner.executable([], env) is None
+    assert spawner._which('foo', str(tmpdir)) == str(program)
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='platform-dependent component')
+def test_popen_close_fds():
+    read_fd, write_fd = os.pipe()
+    os.set_inheritable(write_fd, True)
+    try:
+        argv = [sys.executable, '-c', 'import os, sys; os.fstat(int(sys.argv[1]))', str(write_fd)]
+        # Inheritable descriptors do not leak into the subprocess.
+        assert spawner.popen(argv, stderr=subprocess.DEVNULL).wait() != 0
+        assert spawner.popen(argv, pass_fds=(write_fd,)).wait() == 0
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
@@ -0,0 +1,69 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import fuzzinator.stats_buffer
+
+from fuzzinator.stats_buffer import StatsBuffer
+
+
+class MockDriver(object):
+
+    def __init__(self):
+        self.stats = []
+
+    def update_stats(self, stats):
+        self.stats.append(stats)
+
+
+class MockClock(object):
+
+    def __init__(self):
+        self.now = 0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_stats_buffer(monkeypatch):
+    clock = MockClock()
+    monkeypatch.setattr(fuzzinator.stats_buffer, 'time', clock)
+    db = MockDriver()
+    buffer = StatsBuffer(db, flush_interval=1)
+
+    # The increments are coalesced per SUT, fuzzer, and subconfig.
+    assert not buffer.add('foo', 'bar', None, 10, 1)
+    assert not buffer.add('foo', 'bar', None, 5, 0)
+    assert not buffer.add('foo', 'baz', 'qux', 1, 1)
+    assert not buffer.add('foo', 'baz', 'qux', 0, 0)
+    assert db.stats == []
+
+    # All of them are written at once when the interval has elapsed.
+    clock.now = 1
+    assert buffer.add('foo', 'bar', None, 1, 0)
+    assert db.stats == [{('foo', 'bar', None): (16, 1), ('foo', 'baz', 'qux'): (1, 1)}]
+
+    # Nothing is written if nothing is buffered.
+    clock.now = 3
+    assert not buffer.add('foo', 'bar', None, 0, 0)
+    assert not buffer.flush()
+    assert len(db.stats) == 1
+
+    assert not buffer.add('foo', 'bar', None, 2, 0)
+    assert buffer.flush()
+    assert db.stats[1] == {('foo', 'bar', None): (2, 0)}
+
+
+def test_stats_buffer_flush_count(monkeypatch):
+    monkeypatch.setattr(fuzzinator.stats_buffer, 'time', MockClock())
+    db = MockDriver()
+    buffer = StatsBuffer(db, flush_interval=float('inf'), flush_count=10)
+
+    assert not buffer.add('foo', 'bar', None, 6, 0)
+    assert buffer.add('foo', 'bar', None, 4, 2)
+    # The count restarts after the write.
+    assert not buffer.add('foo', 'bar', None, 6, 0)
+    assert db.stats == [{('foo', 'bar', None): (10, 2)}]
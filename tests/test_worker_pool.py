@@ -0,0 +1,102 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import os
+import signal
+import sys
+import time
+
+from multiprocessing.connection import wait
+
+import pytest
+
+from fuzzinator.worker_pool import WorkerPool
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='workers are started by forking the test process')
+
+
+def mock_target(work_dir, ident, action=None):
+    # Record the worker that has run the job and the SIGINT handler it has
+    # found.
+    with open(os.path.join(work_dir, str(ident)), 'w') as f:
+        f.write('{pid} {handler}'.format(pid=os.getpid(), handler=signal.getsignal(signal.SIGINT) == signal.SIG_IGN))
+    if action == 'ignore':
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    elif action == 'sleep':
+        time.sleep(0.5)
+    elif action == 'die':
+        os._exit(1)
+
+
+def result(work_dir, ident):
+    with open(os.path.join(work_dir, str(ident))) as f:
+        pid, ignored = f.read().split()
+    return int(pid), ignored == 'True'
+
+
+def wait_idle(pool, timeout=10):
+    deadline = time.time() + timeout
+    while any(worker.ident is not None for worker in pool.workers) and time.time() < deadline:
+        wait([sentinel for worker in pool.workers for sentinel in worker.sentinels], timeout=0.1)
+        pool.poll()
+    assert all(worker.ident is None for worker in pool.workers)
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(mock_target, 2)
+    pool.start()
+    yield pool
+    pool.close()
+
+
+def test_worker_pool(pool, tmpdir):
+    work_dir = str(tmpdir)
+    pids = sorted(worker.proc.pid for worker in pool.workers)
+    assert len(pids) == 2
+
+    # The jobs are executed by the long-lived workers, and the signal handlers
+    # installed by a job do not leak into the next one.
+    pool.submit((work_dir, 0, 'ignore'))
+    wait_idle(pool)
+    pool.submit((work_dir, 1))
+    pool.submit((work_dir, 2))
+    wait_idle(pool)
+    assert sorted(worker.proc.pid for worker in pool.workers) == pids
+    assert {result(work_dir, ident)[0] for ident in range(3)} == set(pids)
+    assert not any(result(work_dir, ident)[1] for ident in range(1, 3))
+
+
+def test_worker_pool_grow(pool, tmpdir):
+    work_dir = str(tmpdir)
+
+    # The pool grows if more jobs run in parallel than its size, then it
+    # shrinks back once the jobs are finished.
+    workers = [pool.submit((work_dir, ident, 'sleep')) for ident in range(3)]
+    assert len(pool.workers) == 3
+    assert [worker.ident for worker in workers] == [0, 1, 2]
+    wait_idle(pool)
+    pool.poll()
+    assert len(pool.workers) == 2
+
+
+def test_worker_pool_dead_worker(pool, tmpdir):
+    work_dir = str(tmpdir)
+
+    # Dead workers are removed from the pool and replaced on demand.
+    worker = pool.submit((work_dir, 0, 'die'))
+    worker.proc.join(timeout=10)
+    pool.poll()
+    assert worker not in pool.workers
+    assert worker.ident is None
+    assert len(pool.workers) == 1
+
+    pool.submit((work_dir, 1))
+    pool.submit((work_dir, 2))
+    assert len(pool.workers) == 2
+    wait_idle(pool)
+    assert result(work_dir, 2)[0] != worker.proc.pid
@@ -0,0 +1,117 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+"""
+Micro-benchmark of the scheduling overhead of the controller's main loop.
+
+The controller is run with an in-memory stand-in of the database and with a
+stub fuzzer and SUT, so the measured time is spent on starting, polling, and
+reaping the jobs. If the controller has a shared queue with a wakeup pipe,
+the latency of delivering items put on the queue from another process to the
+blocked main loop is measured, too.
+
+Usage (from the root of the repository)::
+
+    python tools/bench_controller.py --jobs 500 --cost-budget 4
+"""
+
+import sys
+import tempfile
+import time
+
+from argparse import ArgumentParser
+from configparser import ConfigParser, ExtendedInterpolation
+from multiprocessing import Process
+from multiprocessing.connection import wait
+
+import fuzzinator.controller
+
+from fuzzinator.controller import Controller
+
+
+class MemoryDriver(object):
+    """
+    Database driver that stores nothing.
+    """
+
+    def __init__(self, uri):
+        pass
+
+    def get_stats(self, **kwargs):
+        return []
+
+    def add_issue(self, issue):
+        return True
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def mock_fuzzer(index):
+    return b'foo'
+
+
+def mock_call(test, **kwargs):
+    return None
+
+
+def controller(work_dir, cost_budget, batch):
+    fuzzinator.controller.MongoDriver = MemoryDriver
+    config = ConfigParser(interpolation=ExtendedInterpolation(), strict=False, allow_no_value=True)
+    config.read_dict({
+        'fuzzinator': {'work_dir': work_dir, 'cost_budget': str(cost_budget)},
+        'sut.foo': {'call': 'bench_controller.mock_call'},
+        'fuzz.foo': {'sut': 'foo', 'fuzzer': 'bench_controller.mock_fuzzer', 'batch': str(batch)},
+    })
+    return Controller(config=config)
+
+
+def bench_latency(ctrl, items):
+    def send():
+        for _ in range(items):
+            ctrl._put_shared((None, dict(sent=time.perf_counter()), None))
+            time.sleep(0.001)
+
+    sender = Process(target=send)
+    sender.start()
+    latencies = []
+    while len(latencies) < items:
+        wait([ctrl._wakeup_reader])
+        now = time.perf_counter()
+        latencies.extend(now - kwargs['sent'] for _, kwargs, _ in ctrl._get_shared())
+    sender.join()
+
+    latencies.sort()
+    print('wakeup latency of {items} items: p50 {p50:.2f} ms, p99 {p99:.2f} ms, max {max:.2f} ms'.format(
+        items=items, p50=latencies[items // 2] * 1e3, p99=latencies[int(items * 0.99)] * 1e3, max=latencies[-1] * 1e3))
+
+
+def bench_run(ctrl, jobs):
+    start = time.perf_counter()
+    ctrl.run(max_cycles=jobs)
+    elapsed = time.perf_counter() - start
+    print('{jobs} fuzz jobs: {elapsed:.2f} s ({per_job:.1f} ms/job, {rate:.0f} jobs/s)'.format(
+        jobs=jobs, elapsed=elapsed, per_job=elapsed / jobs * 1e3, rate=jobs / elapsed))
+
+
+def main():
+    parser = ArgumentParser(description='Measure the scheduling overhead of the controller.')
+    parser.add_argument('--jobs', type=int, default=500, help='number of fuzz jobs to run (default: %(default)s)')
+    parser.add_argument('--cost-budget', type=int, default=4, help='cost budget of the controller (default: %(default)s)')
+    parser.add_argument('--batch', type=int, default=1, help='number of tests per fuzz job (default: %(default)s)')
+    parser.add_argument('--latency-items', type=int, default=2000, help='number of shared queue items to measure the wakeup latency with (default: %(default)s)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        ctrl = controller(work_dir, args.cost_budget, args.batch)
+        if hasattr(ctrl, '_wakeup_reader') and args.latency_items > 0:
+            bench_latency(ctrl, args.latency_items)
+        bench_run(ctrl, args.jobs)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+"""
+Micro-benchmark of the stream matching of StreamMonitoredSubprocessCall.
+
+The SUT writes the given amount of log lines to its standard output, followed
+by an assertion message that matches the end pattern of the call, and the
+time until the call returns the issue is measured.
+
+Usage (from the root of the repository)::
+
+    python tools/bench_stream_monitored_subprocess_call.py --sizes 1 4 10 100
+"""
+
+import sys
+import time
+
+from argparse import ArgumentParser
+
+from fuzzinator.call import StreamMonitoredSubprocessCall
+
+# Script of the SUT. Its argument is the size of the log to write (in MB).
+sut_script = '; '.join([
+    'import sys',
+    'line = b"INFO: processing item 0123456789 abcdefghijklmnopqrstuvwxyz\\n"',
+    'n = int(sys.argv[1]) * 1024 * 1024 // len(line)',
+    '[sys.stdout.buffer.write(line * 1000) for _ in range(n // 1000)]',
+    'sys.stdout.buffer.write(b"ERROR: Assertion `x != 0\' failed\\n")',
+    'sys.stdout.buffer.flush()',
+])
+
+
+def bench_call(size, repeat):
+    command = '{python} -c "{script}" {size}'.format(python=sys.executable, script=sut_script.replace('"', '\\"'), size=size)
+    times = []
+    with StreamMonitoredSubprocessCall(command, end_patterns='["(?P<msg>Assertion .* failed)"]') as call:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            issue = call(test='x')
+            times.append(time.perf_counter() - start)
+            assert issue and issue.get('msg'), 'the end pattern did not match'
+
+    print('{size} MB: best {best:.2f} s, worst {worst:.2f} s (of {repeat})'.format(
+        size=size, best=min(times), worst=max(times), repeat=repeat))
+
+
+def main():
+    parser = ArgumentParser(description='Measure the stream matching of StreamMonitoredSubprocessCall.')
+    parser.add_argument('--sizes', metavar='MB', type=int, nargs='+', default=[1, 4, 10, 100], help='sizes of the output of the SUT (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3, help='number of calls per size (default: %(default)s)')
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        bench_call(size, args.repeat)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+"""
+Micro-benchmark of TestRunnerSubprocessCall.
+
+The mock test runner of the test suite is started once and the given number
+of tests is run with it (every 1000th of them fails), either one by one
+(single mode, i.e., the SUT call is called for every test) or in batches
+(i.e., through ``call_batch``) with the given depth of pipelining.
+
+Usage (from the root of the repository)::
+
+    python tools/bench_test_runner_subprocess_call.py --tests 20000
+    python tools/bench_test_runner_subprocess_call.py --tests 20000 --pipeline 16 --batch 64
+"""
+
+import os
+import sys
+import time
+
+from argparse import ArgumentParser
+
+from fuzzinator.call import TestRunnerSubprocessCall
+
+test_runner = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'resources', 'mock_test_runner.py')
+
+
+def bench_call(tests, pipeline, batch, repeat):
+    command = '{python} {runner} --fail-if-contains A'.format(python=sys.executable, runner=test_runner)
+    tests = ['test{index}{fail}'.format(index=index, fail='A' if index % 1000 == 0 else '') for index in range(tests)]
+
+    times = []
+    for _ in range(repeat):
+        with TestRunnerSubprocessCall(command, end_texts='["END"]', pipeline=str(pipeline)) as call:
+            start = time.perf_counter()
+            if batch:
+                issues = []
+                for index in range(0, len(tests), batch):
+                    issues.extend(call.call_batch(tests=tests[index:index + batch]))
+            else:
+                issues = [call(test=test) for test in tests]
+            times.append(time.perf_counter() - start)
+        assert sum(1 for issue in issues if issue and issue['stderr']) == (len(tests) + 999) // 1000
+
+    print('{tests} tests ({mode}): best {best:.2f} s ({rate:.0f} tests/s), worst {worst:.2f} s (of {repeat})'.format(
+        tests=len(tests), mode='pipeline={pipeline}, batch={batch}'.format(pipeline=pipeline, batch=batch) if batch else 'single',
+        best=min(times), rate=len(tests) / min(times), worst=max(times), repeat=repeat))
+
+
+def main():
+    parser = ArgumentParser(description='Measure the throughput of TestRunnerSubprocessCall.')
+    parser.add_argument('--tests', type=int, default=20000, help='number of tests to run (default: %(default)s)')
+    parser.add_argument('--pipeline', type=int, default=1, help='number of tests written to the runner ahead of its responses (default: %(default)s)')
+    parser.add_argument('--batch', type=int, default=0, help='number of tests per call_batch (default: %(default)s, i.e., call the SUT test by test)')
+    parser.add_argument('--repeat', type=int, default=3, help='number of measurements (default: %(default)s)')
+    args = parser.parse_args()
+
+    bench_call(args.tests, args.pipeline, args.batch, args.repeat)
+
+
+if __name__ == '__main__':
+    sys.exit(main())